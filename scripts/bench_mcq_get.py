@@ -0,0 +1,122 @@
+"""
+Concurrency benchmark for /mcq/get.
+
+Hammers POST /mcq/get from many threads and reports throughput and latency percentiles.
+By default requests go through the in-process ASGI app (one TestClient per thread); pass
+--url to hit a running server instead. --reload-every N drops the MCQ cache every N requests
+per thread, so cold loads (single-flight) happen while other threads are reading.
+
+Usage (from repo root):
+  python -m scripts.bench_mcq_get
+  python -m scripts.bench_mcq_get --threads 32 --requests 500 --reload-every 100
+  python -m scripts.bench_mcq_get --url http://127.0.0.1:8000
+  python -m scripts.bench_mcq_get --store-only   # call mcq_store directly, no HTTP stack
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from services.api.utils import mcq_store  # type: ignore
+
+
+def _caller(url: str | None, store_only: bool) -> Callable[[Dict[str, str]], None]:
+    if store_only:
+        return lambda body: mcq_store.get_mcq_by_id(body["subject"], body["chapter"], body["questionId"])
+    if url:
+        endpoint = url.rstrip("/") + "/mcq/get"
+
+        def call(body: Dict[str, str]) -> None:
+            req = urllib.request.Request(endpoint, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=30) as resp:  # nosec - benchmark against a user-supplied URL
+                resp.read()
+
+        return call
+    from fastapi.testclient import TestClient
+    from services.api.main import app
+
+    client = TestClient(app)
+    return lambda body: client.post("/mcq/get", json=body).raise_for_status()
+
+
+def bench(threads: int, requests: int, subject: str, chapter: str, ids: List[str], url: str | None, store_only: bool, reload_every: int) -> Dict[str, float]:
+    timings: List[float] = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+    errors = [0]
+
+    def worker(n: int) -> None:
+        call = _caller(url, store_only)
+        local: List[float] = []
+        start.wait()
+        for i in range(requests):
+            if reload_every and i and i % reload_every == 0:
+                mcq_store.invalidate_mcq_cache()
+            body = {"subject": subject, "chapter": chapter, "questionId": ids[(n + i) % len(ids)]}
+            t0 = time.perf_counter()
+            try:
+                call(body)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            local.append((time.perf_counter() - t0) * 1000.0)
+        with lock:
+            timings.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - t0
+    timings.sort()
+
+    def pct(p: float) -> float:
+        return timings[min(len(timings) - 1, int(round(p * (len(timings) - 1))))]
+
+    return {
+        "requests": float(len(timings)),
+        "errors": float(errors[0]),
+        "rps": len(timings) / wall if wall else 0.0,
+        "p50": statistics.median(timings),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "max": timings[-1],
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Hammer /mcq/get from many threads")
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=200, help="Requests per thread")
+    ap.add_argument("--subject", default="Economics")
+    ap.add_argument("--chapter", default="1")
+    ap.add_argument("--url", default=None, help="Base URL of a running API (default: in-process app)")
+    ap.add_argument("--store-only", action="store_true", help="Call mcq_store.get_mcq_by_id directly")
+    ap.add_argument("--reload-every", type=int, default=0, help="Invalidate the MCQ cache every N requests per thread")
+    args = ap.parse_args(argv)
+    ids = [str(m.get("id")) for m in mcq_store.get_mcqs(args.subject, args.chapter) if m.get("id")] or ["missing"]
+    r = bench(args.threads, args.requests, args.subject, args.chapter, ids, args.url, args.store_only, args.reload_every)
+    mode = "store" if args.store_only else (args.url or "in-process")
+    print(
+        f"{mode} threads={args.threads} requests={int(r['requests'])} errors={int(r['errors'])} "
+        f"rps={r['rps']:.0f} p50={r['p50']:.3f}ms p95={r['p95']:.3f}ms p99={r['p99']:.3f}ms max={r['max']:.3f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark for extractive answer synthesis.
+
+Builds many large synthetic passages (hundreds of short sentences each, with heavy
+repetition so most ranked candidates are rejected as redundant) and times
+synthesize_answer() for passage counts up to the /ask maximum of k=20.
+
+Usage (from repo root):
+  python -m scripts.bench_synthesize
+  python -m scripts.bench_synthesize --sentences 400 --repeat 30 --max-chars 4000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from services.api.utils.answerer import synthesize_answer  # type: ignore
+
+_VOCAB = (
+    "national income output price level employment market goods services firms households "
+    "capital labour wages profit rent interest saving investment demand supply economy state"
+).split()
+
+
+def make_passages(n: int, sentences: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    # A small pool of sentences reused across passages keeps redundancy high
+    pool = [
+        " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(8, 20))).capitalize() + "."
+        for _ in range(max(sentences // 4, 1))
+    ]
+    out: List[Dict[str, Any]] = []
+    for i in range(n):
+        text = " ".join(rng.choice(pool) for _ in range(sentences))
+        out.append({"text": text, "metadata": {"page_start": i + 1, "page_end": i + 1, "filename": "bench.pdf"}})
+    return out
+
+
+def bench(k: int, sentences: int, repeat: int, max_chars: int) -> Dict[str, float]:
+    passages = make_passages(k, sentences)
+    query = "what is national income and employment in the economy"
+    timings: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        synthesize_answer(query, passages, max_chars=max_chars, subject="__bench__")
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(round(0.95 * (len(timings) - 1)))],
+        "avg": sum(timings) / len(timings),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark synthesize_answer on large passages")
+    ap.add_argument("--ks", default="5,10,20", help="Comma-separated passage counts")
+    ap.add_argument("--sentences", type=int, default=200, help="Sentences per passage")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--max-chars", type=int, default=4000)
+    args = ap.parse_args(argv)
+    for k in [int(x) for x in args.ks.split(",") if x.strip()]:
+        r = bench(k, args.sentences, args.repeat, args.max_chars)
+        print(f"k={k:>3} sentences/passage={args.sentences} p50={r['p50']:.2f}ms p95={r['p95']:.2f}ms avg={r['avg']:.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
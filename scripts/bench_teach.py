@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for /teach outline extraction.
+
+Feeds synthetic chapter-like hits (definitions, "Term: definition" lines, formula lines,
+long explanatory sentences) straight into the outline builder, so only extraction is
+timed (no retrieval, no outline cache).
+
+Usage (from repo root):
+  python -m scripts.bench_teach
+  python -m scripts.bench_teach --k 25 --depth deep --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from services.api.routes import teach as teach_route  # type: ignore
+
+_TERMS = [
+    "National Income", "Gross Domestic Product", "Price Level", "Aggregate Demand", "Fiscal Policy",
+    "Monetary Policy", "Capital Goods", "Final Goods", "Factor Income", "Net Exports",
+]
+_VOCAB = (
+    "the economy output income households firms market goods services price level money "
+    "wages profit rent interest saving investment government spending tax demand supply"
+).split()
+
+
+def make_hits(k: int, lines: int, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    hits: List[Dict[str, Any]] = []
+    for i in range(k):
+        out: List[str] = []
+        for j in range(lines):
+            kind = rng.random()
+            term = rng.choice(_TERMS)
+            if kind < 0.2:
+                out.append(f"{term}: " + " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(6, 14))) + ".")
+            elif kind < 0.3:
+                out.append(f"{term} = C + I + G + (X - M) at {rng.randint(1, 99)}%")
+            elif kind < 0.6:
+                out.append(f"{term} is " + " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(5, 12))) + ".")
+            else:
+                out.append(" ".join(rng.choice(_VOCAB) for _ in range(rng.randint(18, 36))).capitalize() + ". "
+                           + " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(8, 20))) + ".")
+        hits.append({"text": "\n".join(out), "metadata": {"page_start": i + 1, "page_end": i + 1, "filename": "bench.pdf"}})
+    return hits
+
+
+def bench(k: int, depth: str, lines: int, repeat: int) -> Dict[str, float]:
+    hits = make_hits(k, lines)
+    req = teach_route.TeachRequest(subject="__bench__", chapter="1", topics=["national income"], depth=depth, k=k)
+    timings: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        teach_route._outline_from_hits(hits, req, req.topics or ["overview"], depth)
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(round(0.95 * (len(timings) - 1)))],
+        "avg": sum(timings) / len(timings),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark /teach outline extraction")
+    ap.add_argument("--k", type=int, default=25)
+    ap.add_argument("--depth", default="deep")
+    ap.add_argument("--lines", type=int, default=60, help="Lines per synthetic hit")
+    ap.add_argument("--repeat", type=int, default=30)
+    args = ap.parse_args(argv)
+    r = bench(args.k, args.depth, args.lines, args.repeat)
+    print(f"k={args.k} depth={args.depth} lines/hit={args.lines} p50={r['p50']:.2f}ms p95={r['p95']:.2f}ms avg={r['avg']:.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -44,6 +44,7 @@ if str(API_UTILS.parent.parent) not in sys.path:
 from services.api.utils.pdf_parser import extract_text  # type: ignore
 from services.api.utils.chunker import chunk_pages, Chunk  # type: ignore
 from services.api.utils.indexer import DiskIndex  # type: ignore
+from services.api.utils.dedup import dedup_chunks  # type: ignore
 
 
 @dataclass
@@ -58,6 +59,7 @@ class IngestResult:
     index_count: int
     skipped: bool = False
     reason: Optional[str] = None
+    dedup_removed: int = 0
 
 
 def sha256_file(path: Path) -> str:
@@ -178,11 +180,11 @@ def persist_manifest(subject: str, manifest: Dict[str, Any]) -> None:
     manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
 
 
-def ingest_pdf(path: Path, *, subject: str, chapter: str, chunk_size: int, chunk_overlap: int, ocr: bool, force: bool, reset: bool, dry_run: bool, verbose: bool, cache: Dict[str, Any]) -> IngestResult:
+def ingest_pdf(path: Path, *, subject: str, chapter: str, chunk_size: int, chunk_overlap: int, strategy: str, max_tokens: int, overlap_sentences: int, overlap_tokens: int, dedup: bool, dedup_threshold: float, ocr: bool, force: bool, reset: bool, dry_run: bool, verbose: bool, cache: Dict[str, Any]) -> IngestResult:
     sha = sha256_file(path)
     cache_entry = cache.get(sha)
     if cache_entry and not force:
-        return IngestResult(subject=subject, chapter=chapter, pdf=path.name, upload_path=cache_entry.get('upload_path', ''), chunks_path=cache_entry.get('chunks_path'), chunk_count=cache_entry.get('chunk_count', 0), namespace=cache_entry.get('namespace', ''), index_count=cache_entry.get('index_count', 0), skipped=True, reason='cached')
+        return IngestResult(subject=subject, chapter=chapter, pdf=path.name, upload_path=cache_entry.get('upload_path', ''), chunks_path=cache_entry.get('chunks_path'), chunk_count=cache_entry.get('chunk_count', 0), namespace=cache_entry.get('namespace', ''), index_count=cache_entry.get('index_count', 0), skipped=True, reason='cached', dedup_removed=cache_entry.get('dedup_removed', 0))
 
     import uuid
     upload_uuid = str(uuid.uuid4())
@@ -200,7 +202,13 @@ def ingest_pdf(path: Path, *, subject: str, chapter: str, chunk_size: int, chunk
     if not pages:
         return IngestResult(subject=subject, chapter=chapter, pdf=path.name, upload_path=str(upload_dest), chunks_path=None, chunk_count=0, namespace=f"{subject}-ch{chapter}", index_count=0, skipped=True, reason='no_text')
 
-    chunks: List[Chunk] = chunk_pages(pages, chunk_size=chunk_size, chunk_overlap=chunk_overlap, subject=subject, chapter=chapter, filename=path.name, source_path=str(upload_dest))
+    chunks: List[Chunk] = chunk_pages(pages, chunk_size=chunk_size, chunk_overlap=chunk_overlap, subject=subject, chapter=chapter, filename=path.name, source_path=str(upload_dest), strategy=strategy, max_tokens=max_tokens, overlap_sentences=overlap_sentences, overlap_tokens=overlap_tokens)
+    dedup_removed = 0
+    if dedup:
+        chunks, dedup_report = dedup_chunks(chunks, threshold=dedup_threshold)
+        dedup_removed = dedup_report['removed']
+        if verbose:
+            print(f"Dedup removed {dedup_removed} of {dedup_report['input']} chunks")
     chunk_count = len(chunks)
     namespace = f"{subject.replace(' ', '_')}-ch{chapter}"
 
@@ -241,10 +249,11 @@ def ingest_pdf(path: Path, *, subject: str, chapter: str, chunk_size: int, chunk
         'chunk_count': chunk_count,
         'namespace': res['namespace'],
         'index_count': res['count'],
+        'dedup_removed': dedup_removed,
         'timestamp': datetime.now(timezone.utc).isoformat(),
     }
 
-    return IngestResult(subject=subject, chapter=chapter, pdf=path.name, upload_path=str(upload_dest), chunks_path=chunks_file_rel, chunk_count=chunk_count, namespace=res['namespace'], index_count=res['count'])
+    return IngestResult(subject=subject, chapter=chapter, pdf=path.name, upload_path=str(upload_dest), chunks_path=chunks_file_rel, chunk_count=chunk_count, namespace=res['namespace'], index_count=res['count'], dedup_removed=dedup_removed)
 
 
 def iter_pdfs(root: Path) -> Iterable[Path]:
@@ -281,7 +290,7 @@ def process_roots(roots: List[Path], *, subject_override: Optional[str], **kwarg
             if kwargs.get('skip_unknown') and chapter == 'unknown':
                 print(f"Skip unknown chapter for {pdf_path.name}")
                 continue
-            res = ingest_pdf(pdf_path, subject=subject, chapter=chapter, **{k: v for k, v in kwargs.items() if k in {'chunk_size','chunk_overlap','ocr','force','reset','dry_run','verbose'}}, cache=cache)
+            res = ingest_pdf(pdf_path, subject=subject, chapter=chapter, **{k: v for k, v in kwargs.items() if k in {'chunk_size','chunk_overlap','strategy','max_tokens','overlap_sentences','overlap_tokens','dedup','dedup_threshold','ocr','force','reset','dry_run','verbose'}}, cache=cache)
             results.append(res)
             if not res.skipped and not kwargs.get('dry_run'):
                 update_manifest(manifest, subject=subject, chapter=chapter, pdf_filename=pdf_path.name, namespace=res.namespace, chunks_file_rel=res.chunks_path or '', chunk_count=res.chunk_count, upload_ids=[res.upload_path.split('/')[-1].split('_')[0]])
@@ -292,6 +301,7 @@ def process_roots(roots: List[Path], *, subject_override: Optional[str], **kwarg
                     'chapter': chapter,
                     'pdf': pdf_path.name,
                     'chunks': res.chunk_count,
+                    'dedup_removed': res.dedup_removed,
                     'namespace': res.namespace,
                     'chunks_file': res.chunks_path,
                 })
@@ -308,6 +318,12 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     ap.add_argument('--subject', help='Override subject name for all --root dirs')
     ap.add_argument('--chunk-size', type=int, default=1200)
     ap.add_argument('--chunk-overlap', type=int, default=200)
+    ap.add_argument('--strategy', choices=['char', 'sentence', 'token'], default='char', help='Chunking strategy')
+    ap.add_argument('--max-tokens', type=int, default=300, help='Token budget per chunk (sentence/token strategies)')
+    ap.add_argument('--overlap-sentences', type=int, default=1, help='Sentences shared between chunks (sentence strategy)')
+    ap.add_argument('--overlap-tokens', type=int, default=40, help='Tokens shared between chunks (token strategy)')
+    ap.add_argument('--no-dedup', action='store_true', help='Keep near-duplicate chunks (skip MinHash dedup)')
+    ap.add_argument('--dedup-threshold', type=float, default=0.85, help='Estimated Jaccard at or above which a chunk is dropped')
     ap.add_argument('--ocr', action='store_true')
     ap.add_argument('--force', action='store_true', help='Reprocess even if file hash already ingested')
     ap.add_argument('--reset', action='store_true', help='Reset index namespace before upsert')
@@ -331,11 +347,16 @@ def main(argv: Optional[List[str]] = None) -> int:
     if not roots:
         print("No roots specified. Use --root or --all-subjects.")
         return 1
-    results = process_roots(roots, subject_override=args.subject, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, ocr=bool(args.ocr), force=bool(args.force), reset=bool(args.reset), dry_run=bool(args.dry_run), verbose=bool(args.verbose), skip_unknown=bool(args.skip_unknown))
+    results = process_roots(roots, subject_override=args.subject, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, strategy=args.strategy, max_tokens=args.max_tokens, overlap_sentences=args.overlap_sentences, overlap_tokens=args.overlap_tokens, dedup=not args.no_dedup, dedup_threshold=args.dedup_threshold, ocr=bool(args.ocr), force=bool(args.force), reset=bool(args.reset), dry_run=bool(args.dry_run), verbose=bool(args.verbose), skip_unknown=bool(args.skip_unknown))
     # Summary
     ingested = [r for r in results if not r.skipped]
     skipped = [r for r in results if r.skipped]
     print(f"Ingested {len(ingested)} PDFs; skipped {len(skipped)} (cache/empty)")
+    removed_by_ns: Dict[str, int] = {}
+    for r in ingested:
+        removed_by_ns[r.namespace] = removed_by_ns.get(r.namespace, 0) + r.dedup_removed
+    for ns, removed in sorted(removed_by_ns.items()):
+        print(f"  dedup {ns}: removed {removed} near-duplicate chunks")
     if args.verbose:
         for r in ingested:
             print(f"  {r.subject} ch{r.chapter} {r.pdf}: chunks={r.chunk_count} ns={r.namespace}")
@@ -0,0 +1,87 @@
+"""
+Precompute the short-answer gold-point bank.
+
+Collects every curated question and every MCQ question for the chapters listed in
+web/data/subjects/*/manifest.json, builds their gold points against the current index,
+and writes data/runtime/gold_bank.json. /answer/validate then only scores answers for
+these questions. Re-run after re-ingesting a chapter or editing the curated bank; stale
+entries are never served because keys include the index and curated versions.
+
+Usage (from repo root):
+  python -m scripts.precompute_gold_points
+  python -m scripts.precompute_gold_points --subject Economics --chapter 1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from services.api.utils.curated_qa import _combined_entries  # type: ignore
+from services.api.utils.gold_bank import precompute_gold_points  # type: ignore
+from services.api.utils.mcq_store import get_mcqs  # type: ignore
+
+Question = Tuple[str, Optional[str], Optional[str]]
+
+
+def manifest_chapters(pattern: str) -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    for mf in sorted(REPO_ROOT.glob(pattern)):
+        try:
+            data = json.loads(mf.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        subject = data.get("subject") or mf.parent.name
+        for ch in data.get("chapters", []):
+            if ch.get("chapter") is not None:
+                out.append((subject, str(ch["chapter"])))
+    return out
+
+
+def collect_questions(chapters: List[Tuple[str, str]], subject: Optional[str] = None, chapter: Optional[str] = None) -> List[Question]:
+    def wanted(s: str, c: str) -> bool:
+        if subject and s.strip().lower() != subject.strip().lower():
+            return False
+        return not chapter or c.strip().lower() == chapter.strip().lower()
+
+    questions: List[Question] = []
+    for e in _combined_entries():
+        s, c = e.get("subject", ""), str(e.get("chapter", ""))
+        if e.get("q") and wanted(s, c):
+            questions.append((e["q"], s, c))
+    for s, c in chapters:
+        if not wanted(s, c):
+            continue
+        # The MCQ store keys by lowercased subject; gold points use the manifest's spelling
+        for m in get_mcqs(s, c):
+            if m.get("question"):
+                questions.append((m["question"], s, c))
+    return questions
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Precompute gold points for curated and MCQ questions")
+    ap.add_argument("--manifests", default="web/data/subjects/*/manifest.json", help="Glob (relative to repo root) of subject manifests")
+    ap.add_argument("--subject", default=None, help="Only this subject")
+    ap.add_argument("--chapter", default=None, help="Only this chapter")
+    args = ap.parse_args(argv)
+    questions = collect_questions(manifest_chapters(args.manifests), args.subject, args.chapter)
+    if not questions:
+        print("No questions found.")
+        return 1
+    report = precompute_gold_points(questions)
+    print(
+        f"Gold bank: {report['questions']} question(s) "
+        f"(curated={report['curated']} retrieval={report['retrieval']} empty={report['empty']}) -> {report['path']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+"""
+Precompute /teach outlines for every chapter in web/data/subjects/*/manifest.json.
+
+Runs the teach pipeline once per (chapter, depth) with the default request shape so that
+steady-state /teach calls are cache lookups. Outlines built here are always written to disk,
+even for non-default --topics/--k/--retriever (the API only persists the default shape).
+Outlines are keyed by the index and curated bank versions, so re-run after ingestion (stale
+outlines are rebuilt on demand anyway).
+
+Usage (from repo root):
+  python -m scripts.precompute_teach_outlines
+  python -m scripts.precompute_teach_outlines --subject Economics --depths standard,deep --k 12
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.precompute_gold_points import manifest_chapters  # type: ignore
+from services.api.routes.teach import build_teach, TeachRequest  # type: ignore
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Precompute cached /teach outlines for manifest chapters")
+    ap.add_argument("--manifests", default="web/data/subjects/*/manifest.json", help="Glob (relative to repo root) of subject manifests")
+    ap.add_argument("--subject", default=None, help="Only this subject")
+    ap.add_argument("--depths", default="basic,standard,deep")
+    ap.add_argument("--topics", default="overview", help="Comma-separated topics (default matches /teach)")
+    ap.add_argument("--retriever", default="auto")
+    ap.add_argument("--k", type=int, default=10)
+    args = ap.parse_args(argv)
+    depths = [d.strip() for d in args.depths.split(",") if d.strip()]
+    topics = [t.strip() for t in args.topics.split(",") if t.strip()]
+    built = cached = 0
+    for subject, chapter in manifest_chapters(args.manifests):
+        if args.subject and subject.strip().lower() != args.subject.strip().lower():
+            continue
+        for depth in depths:
+            t0 = time.perf_counter()
+            resp = asyncio.run(build_teach(TeachRequest(subject=subject, chapter=chapter, topics=topics, depth=depth, retriever=args.retriever, k=args.k), persist_outline=True))
+            state = resp.meta.get("outlineCache")
+            if state == "hit":
+                cached += 1
+            else:
+                built += 1
+            print(f"{subject} ch{chapter} depth={depth}: {state} ({(time.perf_counter() - t0) * 1000:.1f}ms)")
+    print(f"Outlines: built={built} already-cached={cached}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -1,6 +1,9 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .utils.middleware import ContentLengthLimitMiddleware, RequestTimeoutMiddleware
+from .utils.middleware import ContentLengthLimitMiddleware, RequestMetricsMiddleware, RequestTimeoutMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .routes.health import router as health_router
@@ -16,8 +19,22 @@ from .routes.eval import router as eval_router
 
 from .routes.metrics import router as metrics_router
 from .routes.admin import router as admin_router
+from .utils.practice_sessions import run_session_sweeper
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Expire practice sessions in the background instead of on the request path
+    sweeper = asyncio.create_task(run_session_sweeper())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await sweeper
+
 
-app = FastAPI(title="Commerce GPT5 API", version="0.1.0")
+app = FastAPI(title="Commerce GPT5 API", version="0.1.0", lifespan=lifespan)
 
 # Minimal CORS; tighten later
 app.add_middleware(
@@ -31,6 +48,8 @@ app.add_middleware(
 # Global middlewares for Day 8 hardening
 app.add_middleware(ContentLengthLimitMiddleware)
 app.add_middleware(RequestTimeoutMiddleware)
+# Outermost, so timeouts (504) and oversized payloads (413) are timed and counted too
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(health_router)
 app.include_router(upload_router, prefix="/data", tags=["data"])
@@ -43,6 +62,7 @@ app.include_router(mcq_router, tags=["mcq"])
 app.include_router(practice_router, tags=["practice"]) 
 
 app.include_router(metrics_router)
+app.include_router(admin_router)
 
 # Serve the web app statically at /web
 app.mount("/web", StaticFiles(directory="web", html=True), name="web")
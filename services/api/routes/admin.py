@@ -20,15 +20,11 @@ def _require_admin(request: Request) -> None:
 
 @router.post("/reload/curated")
 def reload_curated(request: Request) -> Dict[str, Any]:
-    """Reload curated Q&A cache by invalidating the LRU key and warming it."""
+    """Reload curated Q&A: drop the parsed/compiled cache and warm it from disk."""
     _require_admin(request)
     from ..utils import curated_qa as cq
     try:
-        # Invalidate cache and warm it
-        try:
-            cq._combined_entries_cache_key.cache_clear()  # type: ignore[attr-defined]
-        except Exception:
-            pass
+        cq.invalidate_curated_cache()
         entries = cq._combined_entries()
         return {"status": "ok", "curated_count": len(entries)}
     except Exception as e:
@@ -47,12 +43,25 @@ def reload_stopwords(request: Request) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"reload_stopwords_failed: {e}")
 
 
+@router.post("/reload/mcq")
+def reload_mcq(request: Request) -> Dict[str, Any]:
+    """Drop loaded MCQ chapters so edited data/mcq files are re-read on next lookup."""
+    _require_admin(request)
+    from ..utils import mcq_store
+    try:
+        cleared = mcq_store.invalidate_mcq_cache()
+        return {"status": "ok", "cleared_chapters": cleared}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"reload_mcq_failed: {e}")
+
+
 @router.post("/reload/all")
 def reload_all(request: Request) -> Dict[str, Any]:
     _require_admin(request)
     out1 = reload_curated(request)
     out2 = reload_stopwords(request)
-    return {"status": "ok", **out1, **out2}
+    out3 = reload_mcq(request)
+    return {"status": "ok", **out1, **out2, **out3}
 
 @router.post("/calibration/short-answer")
 def calibration_short_answer(payload: dict, request: Request):
@@ -7,7 +7,10 @@ import json
 
 from ..utils.pdf_parser import extract_text
 from ..utils.chunker import chunk_pages
+from ..utils.dedup import dedup_chunks
 from ..utils.indexer import DiskIndex
+from ..utils.gold_bank import invalidate_gold_points
+from ..utils.outline_cache import invalidate_outlines
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -22,6 +25,7 @@ class IndexResponse(BaseModel):
     subject: Optional[str] = None
     chapter: Optional[str] = None
     chunks_path: Optional[str] = None
+    dedup_removed: int = 0
 
 
 router = APIRouter()
@@ -35,6 +39,12 @@ async def build_index(
     chapter: Optional[str] = Form(None),
     chunk_size: int = Form(1200),
     chunk_overlap: int = Form(200),
+    strategy: str = Form("char", description="Chunking strategy: char|sentence|token"),
+    max_tokens: int = Form(300, description="Token budget per chunk (sentence/token strategies)"),
+    overlap_sentences: int = Form(1, description="Sentences shared between chunks (sentence strategy)"),
+    overlap_tokens: int = Form(40, description="Tokens shared between chunks (token strategy)"),
+    dedup: bool = Form(True, description="Drop near-duplicate chunks (MinHash) before indexing"),
+    dedup_threshold: float = Form(0.85, ge=0.0, le=1.0, description="Estimated Jaccard at or above which a chunk is a duplicate"),
     model: str = Form("all-MiniLM-L6-v2"),
     reset: bool = Form(False, description="If true, clear existing index for this namespace before upserting"),
     ocr: bool = Form(False, description="Enable OCR fallback for low-text pages"),
@@ -66,15 +76,28 @@ async def build_index(
         raise HTTPException(status_code=500, detail=f"Parse failed: {e}")
 
     # Chunk
-    chunks = chunk_pages(
-        pages_list,
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        subject=subject,
-        chapter=chapter,
-        filename=filename,
-        source_path=str(source_path) if source_path else None,
-    )
+    try:
+        chunks = chunk_pages(
+            pages_list,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            subject=subject,
+            chapter=chapter,
+            filename=filename,
+            source_path=str(source_path) if source_path else None,
+            strategy=strategy,
+            max_tokens=max_tokens,
+            overlap_sentences=overlap_sentences,
+            overlap_tokens=overlap_tokens,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid chunking options: {e}")
+
+    # Near-duplicate suppression
+    dedup_removed = 0
+    if dedup:
+        chunks, dedup_report = dedup_chunks(chunks, threshold=dedup_threshold)
+        dedup_removed = dedup_report["removed"]
 
     # Persist chunks as JSON for the web app (optional but handy)
     chunks_path: Optional[str] = None
@@ -106,6 +129,9 @@ async def build_index(
         res = index.upsert(chunks, subject=subject, chapter=chapter, model=model, reset=reset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Index failed: {e}")
+    # Outlines and gold points are also versioned by the index; drop them so stale entries go right away
+    invalidate_outlines(res.get("namespace") or index._ns(subject, chapter))
+    invalidate_gold_points()
 
     return IndexResponse(
         id=str(uuid.uuid4()),
@@ -114,4 +140,5 @@ async def build_index(
         subject=subject,
         chapter=chapter,
         chunks_path=chunks_path,
+        dedup_removed=dedup_removed,
     )
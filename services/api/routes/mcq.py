@@ -3,7 +3,9 @@ from __future__ import annotations
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
-from services.api.utils.mcq_store import get_mcq_by_id
+import time
+from services.api.utils.mcq_store import get_mcq_by_id, load_chapter
+from services.api.utils.metrics import record as record_metric
 
 router = APIRouter()
 
@@ -69,6 +71,80 @@ def mcq_validate(req: MCQValidateRequest):
     return MCQValidateResponse(result=result, correctIndex=correct, explanation=explanation, citations=citations)
 
 
+class MCQBatchAnswer(BaseModel):
+    questionId: str
+    selectedIndex: Optional[int] = Field(None, ge=0)  # None = unanswered
+
+
+class MCQBatchRequest(BaseModel):
+    subject: str
+    chapter: str
+    answers: List[MCQBatchAnswer] = Field(..., min_length=1, max_length=1000)
+
+
+class MCQBatchResult(BaseModel):
+    questionId: str
+    result: str  # 'correct' | 'incorrect' | 'unanswered' | 'not_found'
+    selectedIndex: Optional[int] = None
+    correctIndex: Optional[int] = None
+    explanation: Optional[str] = None
+    citations: List[Dict[str, Any]] = []
+
+
+class MCQBatchResponse(BaseModel):
+    results: List[MCQBatchResult]
+    correct: int
+    graded: int  # questions found in the bank
+    total: int
+    score: float  # percent correct of graded questions
+
+
+@router.post("/mcq/validate/batch", response_model=MCQBatchResponse)
+def mcq_validate_batch(req: MCQBatchRequest):
+    """Grade a whole quiz in one pass against the chapter's indexed MCQ bank."""
+    t0 = time.perf_counter()
+    by_id = load_chapter(req.subject, req.chapter).by_id
+    results: List[MCQBatchResult] = []
+    correct = graded = 0
+    for ans in req.answers:
+        item = by_id.get(str(ans.questionId))
+        try:
+            correct_index = int(item.get("answerIndex")) if item else None
+        except Exception:
+            correct_index = None
+        if correct_index is None:
+            results.append(MCQBatchResult(questionId=ans.questionId, result="not_found", selectedIndex=ans.selectedIndex))
+            continue
+        graded += 1
+        if ans.selectedIndex is None:
+            result = "unanswered"
+        elif ans.selectedIndex == correct_index:
+            result = "correct"
+            correct += 1
+        else:
+            result = "incorrect"
+        results.append(MCQBatchResult(
+            questionId=ans.questionId,
+            result=result,
+            selectedIndex=ans.selectedIndex,
+            correctIndex=correct_index,
+            explanation=item.get("explanation"),
+            citations=item.get("citations") if isinstance(item.get("citations"), list) else [],
+        ))
+    resp = MCQBatchResponse(
+        results=results,
+        correct=correct,
+        graded=graded,
+        total=len(results),
+        score=round(100.0 * correct / graded, 1) if graded else 0.0,
+    )
+    try:
+        record_metric("mcq_validate_batch_latency_ms", (time.perf_counter() - t0) * 1000.0, {"answers": len(results), "graded": graded})
+    except Exception:
+        pass
+    return resp
+
+
 @router.post("/mcq/get", response_model=MCQGetResponse)
 def mcq_get(req: MCQGetRequest):
     item = get_mcq_by_id(req.subject, req.chapter, req.questionId)
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from ..utils.metrics import export_all
+from ..utils.prometheus import CONTENT_TYPE, render
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
 
 @router.get("/runtime")
 def get_runtime_metrics():
     return export_all()
+
+
+@router.get("/prometheus", response_class=PlainTextResponse)
+def get_prometheus_metrics():
+    """Runtime metrics in the Prometheus text exposition format (for scraping)."""
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
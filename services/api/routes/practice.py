@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Any, Dict, List, Optional
 
-from ..utils.practice_sessions import start_session, get_session, record_answer
+from ..utils.practice_sessions import start_session, get_session, record_answer, advance_session
 from ..utils.mcq_store import get_mcq_by_id
 from .validate import validate_short_answer, ShortAnswerRequest
 
@@ -68,7 +68,7 @@ def practice_start(req: PracticeStartRequest):
         subject=sess.subject,
         chapter=sess.chapter,
         adaptive=req.adaptive or None,
-        rationale=getattr(sess, "rationale", None),
+        rationale=sess.rationale,
     )
 
 
@@ -80,10 +80,10 @@ def practice_next(payload: Dict[str, Any]):
     sess = get_session(session_id)
     if not sess:
         raise HTTPException(status_code=404, detail="Session not found")
-    q = sess.next()
+    q = advance_session(sess)
     if not q:
         raise HTTPException(status_code=400, detail="No more questions")
-    adaptive = (payload or {}).get("adaptive") or None
+    adaptive = bool((payload or {}).get("adaptive")) or sess.learner is not None
     return PracticeQuestionResponse(
         sessionId=sess.session_id,
         index=sess.index,
@@ -94,8 +94,8 @@ def practice_next(payload: Dict[str, Any]):
         options=q.options if q.qtype == "mcq" else None,
         subject=sess.subject,
         chapter=sess.chapter,
-        adaptive=adaptive,
-        rationale=("adaptive placeholder rationale" if adaptive else None),
+        adaptive=adaptive or None,
+        rationale=sess.rationale,
     )
 
 
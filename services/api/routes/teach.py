@@ -4,14 +4,26 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 import json
+import os
+import re
+
+from starlette.concurrency import run_in_threadpool
 
 from ..utils.indexer import DiskIndex
-from ..utils.curated_qa import match_curated_answer
+from ..utils.segmenter import split_sentences
+from ..utils.curated_qa import match_curated_answer, curated_version
+from ..utils.outline_cache import outline_key, get_outline, put_outline
 
 
 router = APIRouter()
 
+# Dedicated pool for per-topic retrieval fan-out (TEACH_RETRIEVAL_WORKERS, default 8)
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
 
 class TeachRequest(BaseModel):
     subject: str = Field(...)
@@ -99,123 +111,110 @@ def _collect_citations(hits: List[Dict[str, Any]], limit: int = 5) -> List[Dict[
     return citations
 
 
-def _split_sentences(text: str) -> List[str]:
-    import re
-    parts = re.split(r"(?<=[.!?])\s+|\n+", (text or "").strip())
-    return [p.strip() for p in parts if p and p.strip()]
+_TERM_STOP = frozenset({"and", "or", "the", "of", "a", "an", "to", "in", "for", "on", "by", "with", "as"})
+_TITLE_SEQ_RE = re.compile(r"[A-Z][a-zA-Z]{2,}(?:\s+[A-Z][a-zA-Z]{2,}){0,2}")
+_DEFINES_RE = re.compile(r"\b(is|are|refers\s+to|means)\b", re.I)
+_DIGIT_OR_PCT_RE = re.compile(r"[0-9%]")
+_WS_RE = re.compile(r"\s+")
 
 
-def _overview_bullets(hits: List[Dict[str, Any]], cap: int = 5) -> List[str]:
-    bullets: List[str] = []
-    for h in hits:
-        t = (h.get("text") or "").strip()
-        if not t:
-            continue
-        s = _split_sentences(t)
-        if not s:
-            continue
-        first = s[0].strip()
-        if first and first not in bullets:
-            bullets.append(first if len(first) < 160 else first[:157] + "…")
-        if len(bullets) >= cap:
-            break
-    return bullets
-
+def _extract_sections(hits: List[Dict[str, Any]], caps: Dict[str, int]) -> Dict[str, Any]:
+    """Single pass over hits feeding every outline extractor.
 
-def _key_terms(hits: List[Dict[str, Any]], cap: int = 8) -> List[str]:
-    import re
-    stop = {"and", "or", "the", "of", "a", "an", "to", "in", "for", "on", "by", "with", "as"}
+    Each hit is split into sentences and lines once, and those shared arrays feed the
+    overview (first sentence per hit), short answers (definition-like sentences), long
+    answers (18-40 word sentences), key terms ("Term: definition" lines and Title Case
+    runs, ranked by frequency), formulae and glossary definitions. Each extractor stops
+    collecting at its cap. Returns {ov, terms, shorts, longs, forms, glossary}.
+    """
+    ov: List[str] = []
+    shorts: List[str] = []
+    longs: List[str] = []
+    forms: List[str] = []
+    short_seen: set = set()
+    long_seen: set = set()
+    form_seen: set = set()
     terms: List[str] = []
-    seen = set()
-    # Count occurrences to rank later
+    term_seen: set = set()
     counts: Dict[str, int] = {}
+    title_ok: Dict[str, bool] = {}  # Title Case run -> contains no stopword
+    # Shortest right-hand side of "Term: definition" per lowercased term
+    defs: Dict[str, str] = {}
+
     for h in hits:
         text = (h.get("text") or "").strip()
+        if not text:
+            continue
+        # Sentence-based sections stop at their caps; skip splitting once all are full
+        want_ov = len(ov) < caps["ov"]
+        want_sl = len(shorts) < caps["shorts"] or len(longs) < caps["longs"]
+        sentences = split_sentences(text) if (want_ov or want_sl) else []
+
+        if sentences and want_ov:
+            first = sentences[0]
+            if first not in ov:
+                ov.append(first if len(first) < 160 else first[:157] + "…")
+
+        for s in sentences if want_sl else ():
+            if len(shorts) >= caps["shorts"] and len(longs) >= caps["longs"]:
+                break
+            n_words = len(s.split())
+            if len(shorts) < caps["shorts"] and n_words <= 24 and _DEFINES_RE.search(s):
+                cand = _WS_RE.sub(" ", s).strip().rstrip(".;")
+                key = cand.lower()
+                if key not in short_seen:
+                    short_seen.add(key)
+                    shorts.append(cand)
+            if len(longs) < caps["longs"] and 18 <= n_words <= 40:
+                cand = s.rstrip(".;")
+                key = cand.lower()
+                if key not in long_seen:
+                    long_seen.add(key)
+                    longs.append(cand)
+
         for line in text.splitlines():
-            # Pattern: Term: definition
             if ":" in line:
-                left = line.split(":", 1)[0].strip()
-                if 2 <= len(left.split()) <= 5 and left[0].isupper():
-                    cand = re.sub(r"\s+", " ", left)
+                left, right = line.split(":", 1)
+                term = left.strip()
+                # Pattern: Term: definition
+                if 2 <= len(term.split()) <= 5 and term[0].isupper():
+                    cand = _WS_RE.sub(" ", term)
                     key = cand.lower()
                     counts[key] = counts.get(key, 0) + 2  # boost for defined terms
-                    if key not in seen:
+                    if key not in term_seen:
                         terms.append(cand)
-                        seen.add(key)
+                        term_seen.add(key)
+                gk = term.lower()
+                definition = right.strip()
+                prev = defs.get(gk)
+                if prev is None or len(definition) < len(prev):
+                    defs[gk] = definition
+            if len(forms) < caps["forms"] and ("=" in line or "%" in line):
+                ln = line.strip()
+                if ln and len(ln) <= 140 and _DIGIT_OR_PCT_RE.search(ln):
+                    cand = _WS_RE.sub(" ", ln)
+                    key = cand.lower()
+                    if key not in form_seen:
+                        form_seen.add(key)
+                        forms.append(cand)
+
         # Title-case sequences
-        tokens = re.findall(r"[A-Z][a-zA-Z]{2,}(?:\s+[A-Z][a-zA-Z]{2,}){0,2}", text)
-        for cand in tokens:
-            words = [w.lower() for w in cand.split()]
-            if any(w in stop for w in words):
-                continue
+        for cand in _TITLE_SEQ_RE.findall(text):
             key = cand.lower()
+            ok = title_ok.get(key)
+            if ok is None:
+                ok = title_ok[key] = not any(w in _TERM_STOP for w in key.split())
+            if not ok:
+                continue
             counts[key] = counts.get(key, 0) + 1
-            if key not in seen:
+            if key not in term_seen:
                 terms.append(cand)
-                seen.add(key)
-    # Rank terms by counts (desc) and by length (shorter first)
-    ranked = sorted(terms, key=lambda t: (-counts.get(t.lower(), 0), len(t)))
-    return ranked[:cap]
-
-
-def _short_answers(hits: List[Dict[str, Any]], cap: int = 5) -> List[str]:
-    import re
-    out: List[str] = []
-    seen = set()
-    for h in hits:
-        for s in _split_sentences(h.get("text", "")):
-            if len(s.split()) > 24:
-                continue
-            if re.search(r"\b(is|are|refers\s+to|means)\b", s, re.I):
-                cand = re.sub(r"\s+", " ", s).strip().rstrip(".;")
-                key = cand.lower()
-                if key in seen:
-                    continue
-                seen.add(key)
-                out.append(cand)
-                if len(out) >= cap:
-                    return out
-    return out
-
-
-def _long_answers(hits: List[Dict[str, Any]], cap: int = 3) -> List[str]:
-    out: List[str] = []
-    seen = set()
-    for h in hits:
-        for s in _split_sentences(h.get("text", "")):
-            w = s.split()
-            if 18 <= len(w) <= 40:
-                cand = s.strip().rstrip(".;")
-                key = cand.lower()
-                if key in seen:
-                    continue
-                seen.add(key)
-                out.append(cand)
-                if len(out) >= cap:
-                    return out
-    return out
+                term_seen.add(key)
 
-
-def _formulae(hits: List[Dict[str, Any]], cap: int = 4) -> List[str]:
-    import re
-    out: List[str] = []
-    seen = set()
-    for h in hits:
-        for line in (h.get("text", "") or "").splitlines():
-            ln = line.strip()
-            if not ln:
-                continue
-            if ("=" in ln or "%" in ln) and len(ln) <= 140:
-                if re.search(r"[0-9%]", ln):
-                    cand = re.sub(r"\s+", " ", ln)
-                    key = cand.lower()
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    out.append(cand)
-                    if len(out) >= cap:
-                        return out
-    return out
+    # Rank terms by counts (desc) and by length (shorter first)
+    ranked = sorted(terms, key=lambda t: (-counts.get(t.lower(), 0), len(t)))[: caps["terms"]]
+    glossary = [{"term": t, "definition": defs.get(t.lower(), "")} for t in ranked]
+    return {"ov": ov, "terms": ranked, "shorts": shorts, "longs": longs, "forms": forms, "glossary": glossary}
 
 
 def _curated_points_for_topics(subject: Optional[str], chapter: Optional[str], topics: List[str], cap: int = 6) -> List[str]:
@@ -248,7 +247,7 @@ def _curated_points_for_topics(subject: Optional[str], chapter: Optional[str], t
                     return points
         # fallback to sentences if no bullets
         if not points:
-            for s in _split_sentences(text or ""):
+            for s in split_sentences(text or ""):
                 sc = s.strip()
                 if 3 <= len(sc) <= 160:
                     key = sc.lower()
@@ -261,48 +260,95 @@ def _curated_points_for_topics(subject: Optional[str], chapter: Optional[str], t
     return points
 
 
-@router.post("/teach", response_model=TeachResponse)
-def teach(req: TeachRequest):
-    # Build a structured outline using simple extractive heuristics over retrieved chunks
+def _teach_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        try:
+            workers = max(1, int(os.getenv("TEACH_RETRIEVAL_WORKERS", "8")))
+        except Exception:
+            workers = 8
+        _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="teach-retrieval")
+    return _EXECUTOR
+
+
+def _merge_hits(per_topic: List[List[Dict[str, Any]]], k: int) -> List[Dict[str, Any]]:
+    """Interleave per-topic rankings (rank 1 of each topic, then rank 2, ...), dropping repeats."""
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for rank in range(max((len(h) for h in per_topic), default=0)):
+        for hits in per_topic:
+            if rank >= len(hits):
+                continue
+            h = hits[rank]
+            key = h.get("text") or ""
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(h)
+            if len(merged) >= k:
+                return merged
+    return merged
+
+
+async def _retrieve_hits(idx: DiskIndex, req: TeachRequest, topics: List[str]) -> List[Dict[str, Any]]:
+    """Retrieve hits for up to three topics concurrently and merge them.
+
+    Each topic is queried on its own in the retrieval executor. When the queries go to Chroma,
+    a BM25 query over the joined topics is started at the same time as a fallback (e.g. for
+    an empty Chroma collection) and only awaited if every topic query came back empty. The
+    JSON index falls back to BM25 by itself, so no extra query is raced there.
+    """
+    loop = asyncio.get_running_loop()
+    k = int(req.k or 10)
+    retriever = req.retriever or "auto"
+
+    def run(query: str, r: str) -> "asyncio.Future[Dict[str, Any]]":
+        return loop.run_in_executor(_teach_executor(), partial(idx.query, subject=req.subject, chapter=req.chapter, query=query, k=k, retriever=r))
+
+    fallback = run("; ".join(topics[:3]), "bm25") if idx.uses_chroma(retriever) else None
+    if fallback is not None:
+        # Consume the result/exception even when the race is won by the primary queries
+        fallback.add_done_callback(lambda f: f.cancelled() or f.exception())
+    results = await asyncio.gather(*(run(t, retriever) for t in topics[:3]), return_exceptions=True)
+    per_topic = [r.get("results", []) for r in results if not isinstance(r, BaseException)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    merged = _merge_hits(per_topic, k)
+    if merged:
+        return merged
     try:
-        idx = DiskIndex()
-        topics = req.topics or ["overview"]
-        query = "; ".join(topics[:3])
-        # First attempt with requested retriever (default auto)
-        res = idx.query(
-            subject=req.subject,
-            chapter=req.chapter,
-            query=query,
-            k=int(req.k or 10),
-            retriever=req.retriever or "auto",
-        )
-        # If no results (e.g., empty chroma collection), retry with BM25
-        if not res.get("results"):
-            res = idx.query(
-                subject=req.subject,
-                chapter=req.chapter,
-                query=query,
-                k=int(req.k or 10),
-                retriever="bm25",
-            )
+        if fallback is None:
+            if errors:
+                raise errors[0]
+            return []
+        return (await fallback).get("results", [])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Index query failed: {e}")
 
-    hits = res.get("results", [])
+
+def _outline_from_hits(hits: List[Dict[str, Any]], req: TeachRequest, topics: List[str], depth: str) -> Tuple[List[TeachSection], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Extract (outline, glossary, readingList) from retrieved hits."""
+    # Build a structured outline using simple extractive heuristics over retrieved chunks
     # Depth-based caps
-    depth = (req.depth or "standard").lower()
     caps = {
         "basic": {"ov": 3, "terms": 5, "shorts": 3, "longs": 2, "forms": 2},
         "standard": {"ov": 5, "terms": 8, "shorts": 5, "longs": 3, "forms": 4},
         "deep": {"ov": 8, "terms": 12, "shorts": 8, "longs": 5, "forms": 6},
     }.get(depth, {"ov": 5, "terms": 8, "shorts": 5, "longs": 3, "forms": 4})
+    ex = _extract_sections(hits, caps)
+    # Curated fallback points are computed at most once; a smaller cap is a prefix of a larger one
+    curated_cache: List[List[str]] = []
+
+    def curated_pts(cap: int) -> List[str]:
+        if not curated_cache:
+            curated_cache.append(_curated_points_for_topics(req.subject, req.chapter, topics, cap=max(caps["ov"], caps["shorts"])))
+        return curated_cache[0][:cap]
+
     # Overview (with curated fallback to ensure useful content)
-    ov_bullets = _overview_bullets(hits, cap=caps["ov"]) 
+    ov_bullets = ex["ov"]
     if len(ov_bullets) < max(2, caps["ov"] // 2):
-        curated_pts = _curated_points_for_topics(req.subject, req.chapter, topics, cap=caps["ov"])
         # merge unique
         seen = set([b.lower() for b in ov_bullets])
-        for p in curated_pts:
+        for p in curated_pts(caps["ov"]):
             if p.lower() not in seen:
                 ov_bullets.append(p)
                 seen.add(p.lower())
@@ -320,21 +366,19 @@ def teach(req: TeachRequest):
     )
 
     # Key terms
-    terms = _key_terms(hits, cap=caps["terms"])
     key_terms = TeachSection(
         sectionId="key-terms",
         title="Key terms",
-        bullets=terms,
+        bullets=ex["terms"],
         pageAnchors=overview.pageAnchors,
         citations=ov_cites,
     )
 
     # Short answers (definitions)
-    shorts = _short_answers(hits, cap=caps["shorts"]) 
+    shorts = ex["shorts"]
     if len(shorts) < max(1, caps["shorts"] // 2):
-        curated_pts = _curated_points_for_topics(req.subject, req.chapter, topics, cap=caps["shorts"]) 
         seen = set([s.lower() for s in shorts])
-        for p in curated_pts:
+        for p in curated_pts(caps["shorts"]):
             if p.lower() not in seen:
                 shorts.append(p)
                 seen.add(p.lower())
@@ -349,45 +393,26 @@ def teach(req: TeachRequest):
     )
 
     # Long answers (explanations)
-    longs = _long_answers(hits, cap=caps["longs"])
     long_sec = TeachSection(
         sectionId="long-answers",
         title="Long answers (explanations)",
-        bullets=longs,
+        bullets=ex["longs"],
         pageAnchors=overview.pageAnchors,
         citations=ov_cites,
     )
 
     # Formulae
-    forms = _formulae(hits, cap=caps["forms"])
     formula_sec = TeachSection(
         sectionId="formulae",
         title="Formulae",
-        bullets=forms,
+        bullets=ex["forms"],
         pageAnchors=overview.pageAnchors,
         citations=ov_cites,
     )
 
     outline = [overview, key_terms, short_sec, long_sec, formula_sec]
-    # Build glossary with simple definitions when available
-    glossary: List[Dict[str, Any]] = []
-    # map term->definition (shortest seen right-hand side of Term: definition)
-    defs: Dict[str, str] = {}
-    for h in hits:
-        text = (h.get("text") or "").strip()
-        for line in text.splitlines():
-            if ":" in line:
-                left, right = line.split(":", 1)
-                term = left.strip()
-                definition = right.strip()
-                k = term.lower()
-                if k in [t.lower() for t in terms]:
-                    prev = defs.get(k)
-                    if prev is None or len(definition) < len(prev):
-                        defs[k] = definition
-    for t in terms:
-        k = t.lower()
-        glossary.append({"term": t, "definition": defs.get(k, "")})
+    # Glossary: key terms with their shortest "Term: definition" right-hand side
+    glossary: List[Dict[str, Any]] = ex["glossary"]
     # Build reading list from citations across outline (unique, sorted)
     rl_items: List[Dict[str, Any]] = []
     seen_rl = set()
@@ -403,9 +428,64 @@ def teach(req: TeachRequest):
             seen_rl.add(key)
             rl_items.append({"page": int(page), "filename": fname})
     rl_items.sort(key=lambda x: (x.get("page", 0), x.get("filename") or ""))
+    return outline, glossary, rl_items
+
+
+# Request shapes whose outlines are also persisted to disk (what /teach and the precompute command use by default)
+_PERSIST_DEPTHS = {"basic", "standard", "deep"}
+_PERSIST_RETRIEVERS = {"auto", "tfidf", "bm25"}
+
+
+def _persist_outline(req: TeachRequest, topics: List[str], depth: str, index_version: str) -> bool:
+    """Whether an outline for this request goes to the disk cache as well as the LRU.
+
+    Only default-shaped requests against an existing index are persisted, which bounds the files
+    per namespace; ad-hoc topic combinations stay in memory.
+    """
+    if index_version.endswith(":na"):
+        return False
+    return (
+        [" ".join(t.lower().split()) for t in topics] == ["overview"]
+        and depth in _PERSIST_DEPTHS
+        and (req.retriever or "auto").lower() in _PERSIST_RETRIEVERS
+        and int(req.k or 10) == 10
+    )
+
+
+@router.post("/teach", response_model=TeachResponse)
+async def teach(req: TeachRequest):
+    return await build_teach(req)
+
+
+async def build_teach(req: TeachRequest, *, persist_outline: Optional[bool] = None) -> TeachResponse:
+    """Build a /teach response; persist_outline overrides the default-shape rule for the disk cache."""
+    idx = DiskIndex()
+    topics = req.topics or ["overview"]
+    depth = (req.depth or "standard").lower()
+    # Outlines only change with the index or the curated bank: serve them from the cache
+    ns = idx._ns(req.subject, req.chapter)
+    key = outline_key(req.subject, req.chapter, topics, depth, req.retriever or "auto", int(req.k or 10))
+    # Index/curated version stats, the outline files and coverage.json are blocking I/O: keep them off the loop
+    index_version = await run_in_threadpool(idx.index_version, req.subject, req.chapter)
+    version = f"{index_version}|{await run_in_threadpool(curated_version)}"
+    cached = await run_in_threadpool(get_outline, ns, key, version)
+    if cached is not None:
+        outline = [TeachSection(**sec) for sec in cached["outline"]]
+        glossary, rl_items = cached["glossary"], cached["readingList"]
+    else:
+        hits = await _retrieve_hits(idx, req, topics)
+        outline, glossary, rl_items = await run_in_threadpool(_outline_from_hits, hits, req, topics, depth)
+        # Empty retrievals are not cached so a transient index problem doesn't stick
+        if hits:
+            persist = _persist_outline(req, topics, depth, index_version) if persist_outline is None else persist_outline
+            await run_in_threadpool(partial(put_outline, ns, key, version, {
+                "outline": [sec.model_dump() for sec in outline],
+                "glossary": glossary,
+                "readingList": rl_items,
+            }, persist=persist))
 
     # Coverage: required from file or request topics
-    required_topics = _load_required_topics(req.subject, req.chapter) or (req.topics or [])
+    required_topics = await run_in_threadpool(_load_required_topics, req.subject, req.chapter) or (req.topics or [])
     cov_covered, cov_gaps = _coverage_from_outline(required_topics, outline)
 
     resp = TeachResponse(
@@ -413,6 +493,6 @@ def teach(req: TeachRequest):
         glossary=glossary,
         readingList=rl_items,
         coverage={"requiredTopics": required_topics, "covered": cov_covered, "gaps": cov_gaps},
-        meta={"retrieverUsed": req.retriever or "auto", "depth": depth},
+        meta={"retrieverUsed": req.retriever or "auto", "depth": depth, "outlineCache": "hit" if cached is not None else "miss"},
     )
     return resp
@@ -7,7 +7,10 @@ import json
 
 from ..utils.pdf_parser import extract_text
 from ..utils.chunker import chunk_pages
+from ..utils.dedup import dedup_chunks
 from ..utils.indexer import DiskIndex
+from ..utils.gold_bank import invalidate_gold_points
+from ..utils.outline_cache import invalidate_outlines
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -22,6 +25,7 @@ class UploadResponse(BaseModel):
     namespace: Optional[str] = None
     index_count: Optional[int] = None
     chunks_path: Optional[str] = None
+    dedup_removed: Optional[int] = None
 
 router = APIRouter()
 
@@ -34,6 +38,8 @@ async def upload_pdf(
     reset: bool = Form(False),
     chunk_size: int = Form(1200),
     chunk_overlap: int = Form(200),
+    dedup: bool = Form(True, description="Drop near-duplicate chunks (MinHash) before indexing"),
+    dedup_threshold: float = Form(0.85, ge=0.0, le=1.0, description="Estimated Jaccard at or above which a chunk is a duplicate"),
     model: str = Form("all-MiniLM-L6-v2"),
     ocr: bool = Form(False, description="Enable OCR fallback for low-text pages"),
 ):
@@ -73,6 +79,11 @@ async def upload_pdf(
                 filename=file.filename,
                 source_path=str(out_path),
             )
+            # Near-duplicate suppression
+            dedup_removed = 0
+            if dedup:
+                chunks, dedup_report = dedup_chunks(chunks, threshold=dedup_threshold)
+                dedup_removed = dedup_report["removed"]
             # Persist chunks JSON to web for testing
             chunks_path: Optional[str] = None
             if subject and chapter:
@@ -98,10 +109,14 @@ async def upload_pdf(
             # Index
             index = DiskIndex()
             res = index.upsert(chunks, subject=subject, chapter=chapter, model=model, reset=reset)
+            # Outlines and gold points are also versioned by the index; drop them so stale entries go right away
+            invalidate_outlines(res.get("namespace") or index._ns(subject, chapter))
+            invalidate_gold_points()
 
             resp.namespace = res.get("namespace")
             resp.index_count = res.get("count")
             resp.chunks_path = chunks_path
+            resp.dedup_removed = dedup_removed
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Auto-index failed: {e}")
 
@@ -4,14 +4,15 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 
-from ..utils.indexer import DiskIndex
-from ..utils.answerer import _split_sentences
+from ..utils.indexer import RetrievalContext
 from ..utils.config import load_validate_scoring_config
-from ..utils.curated_qa import match_curated_answer
-from ..utils.metrics import record as record_metric
+from ..utils.gold_bank import GoldPoints, get_gold_points, point_tokens
+from ..utils.metrics import record as record_metric, register_cache
+from ..utils.lru import LRUCache, env_maxsize
 
-# Simple in-process cache for tfidf similarities keyed by (gold_text_hash, user_answer_hash)
-_SIM_CACHE: Dict[tuple[str, str], float] = {}
+# Bounded cache of tfidf similarities keyed by (vectorizer_version, answer_hash, gold_text_hash)
+_SIM_CACHE = LRUCache(maxsize=env_maxsize("VALIDATE_SIM_CACHE_SIZE", 4096))
+register_cache("validate_similarity", _SIM_CACHE)
 
 
 router = APIRouter()
@@ -42,96 +43,36 @@ class ShortAnswerResponse(BaseModel):
     recommendations: List[Dict[str, Any]]
 
 
-def _build_gold_points(question: str, subject: Optional[str], chapter: Optional[str]) -> Dict[str, Any]:
-    # Prefer curated bank
-    curated = match_curated_answer(question, subject, chapter)
-    points: List[str] = []
-    citations: List[Dict[str, Any]] = []
-    if curated is not None:
-        text, cites = curated
-        # Extract numbered/bulleted lines as atomic points
-        for ln in text.splitlines():
-            s = ln.strip()
-            if not s:
-                continue
-            if any(s.startswith(pfx) for pfx in ("- ", "• ", "1) ", "2) ", "3) ", "4) ", "5) ", "1. ", "2. ")):
-                # strip leading bullet/index
-                import re
-                s = re.sub(r"^(?:[-•]\s+|\d+[\.)]\s+|\d+\)\s+)", "", s).strip()
-                if s:
-                    points.append(s)
-        citations = cites or []
-    # If curated missing or yielded no points, fallback to retrieval to form points
-    if not points:
-        idx = DiskIndex()
-        res = idx.query(subject=subject, chapter=chapter, query=question, k=8, retriever="tfidf")
-        hits = res.get("results", [])
-        # Collect sentences with highest overlap to the question
-        import re
-        q_terms = set(re.split(r"\W+", question.lower()))
-        candidates: List[str] = []
-        meta_list: List[Dict[str, Any]] = []
-        for h in hits:
-            text = h.get("text", "")
-            meta = h.get("metadata", {}) or {}
-            for s in _split_sentences(text):
-                s_clean = s.strip()
-                if not s_clean or len(s_clean) < 6 or len(s_clean) > 180:
-                    continue
-                st = set(re.split(r"\W+", s_clean.lower()))
-                overlap = len(q_terms & st) / max(len(q_terms) or 1, 1)
-                if overlap >= 0.1:
-                    candidates.append(s_clean)
-                    meta_list.append(meta)
-        # De-dup and cap ~10
-        seen = set()
-        picked: List[str] = []
-        for s in candidates:
-            key = s.lower().strip()
-            if key in seen:
-                continue
-            seen.add(key)
-            picked.append(s)
-            if len(picked) >= 10:
-                break
-        points = picked
-        # Basic citations from top hits
-        citations = []
-        added = set()
-        for h in hits[:3]:
-            m = h.get("metadata", {}) or {}
-            key = (m.get("page_start"), m.get("page_end"), m.get("filename"))
-            if key in added:
-                continue
-            citations.append({
-                "page_start": m.get("page_start"),
-                "page_end": m.get("page_end"),
-                "filename": m.get("filename"),
-                "source_path": m.get("source_path"),
-            })
-            added.add(key)
-    gold_text = " \n".join(points)
-    return {"points": points, "citations": citations, "text": gold_text}
-
-
 def _hash_text(s: str) -> str:
     import hashlib
     return hashlib.sha1(s.encode('utf-8', errors='ignore')).hexdigest()  # nosec - non-crypto usage
 
 
-def _tfidf_cosine(a: str, b: str) -> float:
+def _tfidf_cosine(a: str, b: str, fitted: Optional[tuple] = None) -> float:
+    """Cosine similarity of a and b in TF-IDF space.
+
+    fitted=(vectorizer, version) scores with the chapter's already-fitted vectorizer (rows are
+    L2-normalized, so cosine is a dot product). Without it, a two-document vectorizer is fitted
+    as a fallback.
+    """
     try:
-        key = (_hash_text(a), _hash_text(b))
+        version = fitted[1] if fitted else ""
+        key = (version, _hash_text(a), _hash_text(b))
         cached = _SIM_CACHE.get(key)
         if cached is not None:
             return cached
-        from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
-        from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
-        vec = TfidfVectorizer(max_features=2048, ngram_range=(1, 2), stop_words="english")
-        X = vec.fit_transform([a, b])
-        sim = float(cosine_similarity(X[0], X[1])[0, 0])
-        _SIM_CACHE[key] = sim
-        return max(0.0, min(sim, 1.0))
+        if fitted:
+            X = fitted[0].transform([a, b])
+            sim = float(X[0].multiply(X[1]).sum())
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+            from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
+            vec = TfidfVectorizer(max_features=2048, ngram_range=(1, 2), stop_words="english")
+            X = vec.fit_transform([a, b])
+            sim = float(cosine_similarity(X[0], X[1])[0, 0])
+        sim = max(0.0, min(sim, 1.0))
+        _SIM_CACHE.put(key, sim)
+        return sim
     except Exception:
         return 0.0
 
@@ -140,6 +81,9 @@ def _structure_score(question: str, answer: str) -> float:
     import re
     q = question.strip().lower()
     a = answer.strip()
+    if not a:
+        # A blank answer has no structure to reward (batch grading scores blanks)
+        return 0.0
     # Simple heuristics: bullets/numbering → good for list/steps; concise definition → good for define/what is
     is_list_q = bool(re.search(r"\b(list|enumerate|state|steps|types|advantages|disadvantages|features)\b", q))
     has_bullets = bool(re.search(r"(^|\n)(?:[-•]|\d+[\.)])\s+", a))
@@ -164,27 +108,14 @@ def _terminology_score(question: str, answer: str) -> float:
     return present / max(len(q_terms), 1)
 
 
-@router.post("/answer/validate", response_model=ShortAnswerResponse)
-def validate_short_answer(req: ShortAnswerRequest):
-    import time as _time
-    _t0 = _time.perf_counter()
-    cfg = load_validate_scoring_config()
-    q = req.question.strip()
-    ua = req.userAnswer.strip()
-    if not q or not ua:
-        raise HTTPException(status_code=400, detail="question and userAnswer are required")
-
-    gold = _build_gold_points(q, req.subject, req.chapter)
-    points: List[str] = gold.get("points", [])
-    gold_text: str = gold.get("text", "")
-
+def _grade(q: str, ua: str, gold: GoldPoints, cosine: float, cfg: Any) -> Dict[str, Any]:
+    """Score one answer against precomputed gold points; cosine is computed by the caller."""
     # Coverage: match points by token overlap
-    import re
-    ua_tokens = set(re.split(r"\W+", ua.lower()))
+    ua_tokens = point_tokens(ua)
+    points = gold.points
     matched: List[str] = []
     missing: List[str] = []
-    for p in points:
-        p_tokens = set(re.split(r"\W+", p.lower()))
+    for p, p_tokens in zip(points, gold.tokens):
         if not p_tokens:
             continue
         overlap = len(ua_tokens & p_tokens) / max(len(p_tokens), 1)
@@ -194,7 +125,6 @@ def validate_short_answer(req: ShortAnswerRequest):
             missing.append(p)
     coverage = (len(matched) / max(len(points), 1)) if points else 0.0
 
-    cosine = _tfidf_cosine(ua, gold_text)
     structure = _structure_score(q, ua)
     terminology = _terminology_score(q, ua)
 
@@ -230,14 +160,16 @@ def validate_short_answer(req: ShortAnswerRequest):
             feedback.append("Use the correct terms from the chapter in your answer.")
         if cosine < cfg.off_topic_cosine_max and coverage < cfg.off_topic_coverage_max:
             feedback.append("Your answer seems off-topic. Revisit the chapter section.")
+    return {"result": result, "score": score, "rubric": rubric, "feedback": feedback, "missing": missing}
 
+
+def _gold_citations(q: str, gold: GoldPoints, ctx: RetrievalContext, retriever: str) -> List[Dict[str, Any]]:
     # Citations: use gold citations if any; else derive from retrieval on the question
-    citations = gold.get("citations", [])
+    # (reusing the gold-point retrieval when this request already ran one)
+    citations = list(gold.citations)
     if not citations:
         try:
-            idx = DiskIndex()
-            res = idx.query(subject=req.subject, chapter=req.chapter, query=q, k=5, retriever=req.retriever)
-            hits = res.get("results", [])
+            hits = ctx.search(q, k=5, retriever=retriever)
             added = set()
             for h in hits[:3]:
                 m = h.get("metadata", {}) or {}
@@ -253,24 +185,196 @@ def validate_short_answer(req: ShortAnswerRequest):
                 added.add(key)
         except Exception:
             pass
+    return citations
+
 
+def _recommendations(missing: List[str], citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     # Recommendations: map first two missing points to generic recommendations
-    recommendations: List[Dict[str, Any]] = []
-    for mp in missing[:2]:
-        recommendations.append({"topic": mp, "pages": [c.get("page_start") for c in citations if c.get("page_start")]})
+    pages = [c.get("page_start") for c in citations if c.get("page_start")]
+    return [{"topic": mp, "pages": list(pages)} for mp in missing[:2]]
+
+
+def _fitted_vectorizer(ctx: RetrievalContext) -> Optional[tuple]:
+    try:
+        return ctx.idx.fitted_vectorizer(ctx.subject, ctx.chapter)
+    except Exception:
+        return None
+
+
+def _latency_extras(ctx: RetrievalContext, gold: GoldPoints) -> Dict[str, Any]:
+    extra: Dict[str, Any] = {"points": len(gold.points), "gold_source": gold.source, "retrievals": ctx.retrievals}
+    extra.update({k: round(v, 3) for k, v in ctx.timings.items()})
+    return extra
+
+
+@router.post("/answer/validate", response_model=ShortAnswerResponse)
+def validate_short_answer(req: ShortAnswerRequest):
+    import time as _time
+    _t0 = _time.perf_counter()
+    cfg = load_validate_scoring_config()
+    q = req.question.strip()
+    ua = req.userAnswer.strip()
+    if not q or not ua:
+        raise HTTPException(status_code=400, detail="question and userAnswer are required")
+
+    # One retrieval context per request: at most one index query across all stages
+    ctx = RetrievalContext(req.subject, req.chapter)
+    # Gold points and their token sets come precomputed from the gold bank
+    t = _time.perf_counter()
+    gold = get_gold_points(q, req.subject, req.chapter, ctx=ctx)
+    ctx.timed("gold", t)
+    t = _time.perf_counter()
+    cosine = _tfidf_cosine(ua, gold.text, _fitted_vectorizer(ctx))
+    ctx.timed("cosine", t)
+    t = _time.perf_counter()
+    graded = _grade(q, ua, gold, cosine, cfg)
+    ctx.timed("grade", t)
+    t = _time.perf_counter()
+    citations = _gold_citations(q, gold, ctx, req.retriever)
+    ctx.timed("citations", t)
 
     resp = ShortAnswerResponse(
-        result=result,
-        score=round(score, 1),
-        rubric=rubric,
-        feedback=feedback,
-        missingPoints=missing[:5],
+        result=graded["result"],
+        score=round(graded["score"], 1),
+        rubric=graded["rubric"],
+        feedback=graded["feedback"],
+        missingPoints=graded["missing"][:5],
+        citations=citations,
+        recommendations=_recommendations(graded["missing"], citations),
+    )
+    dt_ms = (_time.perf_counter() - _t0) * 1000.0
+    try:
+        record_metric("validate_latency_ms", dt_ms, _latency_extras(ctx, gold))
+    except Exception:
+        pass
+    return resp
+
+
+class BatchAnswer(BaseModel):
+    id: Optional[str] = None
+    userAnswer: str = ""
+
+
+class ShortAnswerBatchRequest(BaseModel):
+    question: str = Field(..., min_length=3)
+    answers: List[BatchAnswer] = Field(..., min_length=1, max_length=1000)
+    subject: Optional[str] = None
+    chapter: Optional[str] = None
+    retriever: str = "auto"
+
+
+class BatchAnswerResult(BaseModel):
+    id: Optional[str] = None
+    result: str
+    score: float
+    rubric: List[RubricItem]
+    feedback: List[str]
+    missingPoints: List[str]
+    recommendations: List[Dict[str, Any]]
+
+
+class ScoreDistribution(BaseModel):
+    count: int
+    mean: float
+    median: float
+    stdev: float
+    min: float
+    max: float
+    results: Dict[str, int]
+    histogram: List[int]  # 10 buckets of width 10 over [0, 100]
+
+
+class ShortAnswerBatchResponse(BaseModel):
+    results: List[BatchAnswerResult]
+    citations: List[Dict[str, Any]]
+    summary: ScoreDistribution
+
+
+def _batch_cosines(answers: List[str], gold_text: str, fitted: Optional[tuple]) -> List[float]:
+    """Cosine of every answer against the gold text.
+
+    With the chapter's fitted vectorizer all answers are transformed in one matrix and
+    scored with a single sparse product; otherwise each answer falls back to _tfidf_cosine.
+    """
+    if fitted:
+        try:
+            X = fitted[0].transform([gold_text] + answers)
+            sims = (X[1:] @ X[0].T).toarray().ravel()
+            return [max(0.0, min(float(s), 1.0)) for s in sims]
+        except Exception:
+            pass
+    return [_tfidf_cosine(a, gold_text, fitted) if a else 0.0 for a in answers]
+
+
+def _distribution(scores: List[float], results: List[str]) -> ScoreDistribution:
+    import statistics
+    hist = [0] * 10
+    for s in scores:
+        hist[min(int(s // 10), 9)] += 1
+    counts = {"correct": 0, "partial": 0, "incorrect": 0}
+    for r in results:
+        counts[r] = counts.get(r, 0) + 1
+    return ScoreDistribution(
+        count=len(scores),
+        mean=round(statistics.fmean(scores), 1),
+        median=round(statistics.median(scores), 1),
+        stdev=round(statistics.pstdev(scores), 1),
+        min=round(min(scores), 1),
+        max=round(max(scores), 1),
+        results=counts,
+        histogram=hist,
+    )
+
+
+@router.post("/answer/validate/batch", response_model=ShortAnswerBatchResponse)
+def validate_short_answers_batch(req: ShortAnswerBatchRequest):
+    """Grade many answers to one question: gold points, citations and vectors are computed once."""
+    import time as _time
+    _t0 = _time.perf_counter()
+    cfg = load_validate_scoring_config()
+    q = req.question.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="question is required")
+
+    ctx = RetrievalContext(req.subject, req.chapter)
+    t = _time.perf_counter()
+    gold = get_gold_points(q, req.subject, req.chapter, ctx=ctx)
+    ctx.timed("gold", t)
+    t = _time.perf_counter()
+    citations = _gold_citations(q, gold, ctx, req.retriever)
+    ctx.timed("citations", t)
+    answers = [a.userAnswer.strip() for a in req.answers]
+    t = _time.perf_counter()
+    cosines = _batch_cosines(answers, gold.text, _fitted_vectorizer(ctx))
+    ctx.timed("cosine", t)
+    t = _time.perf_counter()
+
+    results: List[BatchAnswerResult] = []
+    for item, ua, cosine in zip(req.answers, answers, cosines):
+        graded = _grade(q, ua, gold, cosine, cfg)
+        if not ua:
+            # Blank answers are graded, not rejected, so one empty submission doesn't fail the class
+            graded["feedback"] = ["No answer given."]
+        results.append(BatchAnswerResult(
+            id=item.id,
+            result=graded["result"],
+            score=round(graded["score"], 1),
+            rubric=graded["rubric"],
+            feedback=graded["feedback"],
+            missingPoints=graded["missing"][:5],
+            recommendations=_recommendations(graded["missing"], citations),
+        ))
+
+    ctx.timed("grade", t)
+
+    resp = ShortAnswerBatchResponse(
+        results=results,
         citations=citations,
-        recommendations=recommendations,
+        summary=_distribution([r.score for r in results], [r.result for r in results]),
     )
     dt_ms = (_time.perf_counter() - _t0) * 1000.0
     try:
-        record_metric("validate_latency_ms", dt_ms, {"points": len(points)})
+        record_metric("validate_batch_latency_ms", dt_ms, {**_latency_extras(ctx, gold), "answers": len(results)})
     except Exception:
         pass
     return resp
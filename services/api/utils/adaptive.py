@@ -0,0 +1,333 @@
+"""Adaptive question selection for practice sessions.
+
+A session carries a small learner model: Beta(successes + 1, failures + 1) mastery estimates
+per topic and per question. The next question is the one whose answer is expected to tell us
+the most about the student, i.e. the expected information gain (mutual information) of one
+Beta-Bernoulli observation. Gains are kept quantised into a fixed number of buckets per
+question type, so a pick scans a constant number of buckets; an answer only re-buckets the
+questions that share a topic with the one answered.
+
+The evidence, the remaining quotas and the bucket membership of the unasked questions are
+persisted with a session, so restoring a selector for a pick re-evaluates no gains and never
+walks the chapter's bank: a pick scans the fixed set of buckets. Sessions stored before bucket
+membership was persisted are re-bucketed from their asked ids once, on their next update.
+
+Topics come from a per-chapter question-topic index built once per bank version: explicit
+"topic"/"topics" fields on MCQ items and curated entries, otherwise the content words that
+a question shares with at least one other question in the chapter.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import math
+import re
+
+from .mcq_store import get_mcqs, mcq_version
+from .curated_qa import _combined_entries, curated_version
+from .indexer import _load_custom_stopwords
+from .lru import LRUCache, env_maxsize
+from .metrics import register_cache
+
+_BUCKETS = 32
+_MAX_GAIN = math.log(2)  # nats; a Bernoulli outcome carries at most one bit
+_HISTORY_LIMIT = 500
+_WORD_RE = re.compile(r"[a-z][a-z\-]+")
+_RESULT_VALUE = {"correct": 1.0, "partial": 0.5, "incorrect": 0.0}
+_FALLBACK_STOP = frozenset(
+    "a an and are as at be by define defines described describe does for from how in is it its "
+    "meaning of on or state the their this to two what when which why with following best".split()
+)
+
+_INDEX_CACHE = LRUCache(maxsize=env_maxsize("PRACTICE_TOPIC_INDEX_CACHE_SIZE", 64))
+register_cache("practice_topic_index", _INDEX_CACHE)
+_STOPWORDS: Optional[frozenset] = None
+
+
+def _stopwords() -> frozenset:
+    global _STOPWORDS
+    if _STOPWORDS is None:
+        try:
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS  # type: ignore
+            base = set(ENGLISH_STOP_WORDS) | _FALLBACK_STOP
+        except Exception:
+            base = set(_FALLBACK_STOP)
+        _STOPWORDS = frozenset(base | {w.lower() for w in (_load_custom_stopwords() or [])})
+    return _STOPWORDS
+
+
+def short_question_id(text: str) -> str:
+    """Stable id for a curated short-answer prompt (the same in every worker process)."""
+    norm = " ".join(text.lower().split())
+    return "short:" + hashlib.sha1(norm.encode("utf-8")).hexdigest()[:16]  # nosec - non-crypto usage
+
+
+def content_words(text: str) -> List[str]:
+    """Lower-cased content words of a question (stopwords and very short words dropped, plurals folded)."""
+    stop = _stopwords()
+    out: List[str] = []
+    for w in _WORD_RE.findall(text.lower()):
+        if len(w) < 3 or w in stop:
+            continue
+        if w.endswith("s") and not w.endswith("ss") and len(w) > 4:
+            w = w[:-1]
+        if w not in out:
+            out.append(w)
+    return out
+
+
+def _explicit_topics(item: Dict[str, Any]) -> List[str]:
+    raw = item.get("topics") or item.get("topic") or []
+    if isinstance(raw, str):
+        raw = raw.split(";")
+    return [" ".join(str(t).lower().split()) for t in raw if str(t).strip()]
+
+
+@dataclass(slots=True)
+class QuestionTopicIndex:
+    """Questions of one chapter with their topics, and the reverse topic -> questions map."""
+    qtype: Dict[str, str]  # question id -> 'mcq' | 'short'
+    topics: Dict[str, Tuple[str, ...]]
+    members: Dict[str, Tuple[str, ...]]
+
+    def available(self, qtype: str) -> int:
+        return sum(1 for t in self.qtype.values() if t == qtype)
+
+
+def build_topic_index(subject: str, chapter: str) -> QuestionTopicIndex:
+    """Uncached index over the chapter's MCQs (by id) and curated short-answer prompts."""
+    subj, chap = (subject or "").strip().lower(), (chapter or "").strip().lower()
+    items: List[Tuple[str, str, str, List[str]]] = []  # (qid, qtype, text, explicit topics)
+    for m in get_mcqs(subject, chapter):
+        if m.get("id"):
+            items.append((str(m["id"]), "mcq", m.get("question") or "", _explicit_topics(m)))
+    seen = set()
+    for e in _combined_entries():
+        if (subj and e.get("subject", "").strip().lower() != subj) or (chap and e.get("chapter", "").strip().lower() != chap):
+            continue
+        q = e.get("q") or ""
+        qid = short_question_id(q)
+        if q and qid not in seen:
+            seen.add(qid)
+            items.append((qid, "short", q, _explicit_topics(e)))
+    words = {qid: content_words(text) for qid, _, text, _ in items}
+    df: Dict[str, int] = {}
+    for ws in words.values():
+        for w in ws:
+            df[w] = df.get(w, 0) + 1
+    qtype: Dict[str, str] = {}
+    topics: Dict[str, Tuple[str, ...]] = {}
+    members: Dict[str, List[str]] = {}
+    for qid, kind, _, explicit in items:
+        ts = explicit or [w for w in words[qid] if df[w] > 1] or [f"q:{qid}"]
+        qtype[qid] = kind
+        topics[qid] = tuple(ts)
+        for t in ts:
+            members.setdefault(t, []).append(qid)
+    return QuestionTopicIndex(qtype=qtype, topics=topics, members={t: tuple(q) for t, q in members.items()})
+
+
+def topic_index(subject: str, chapter: str) -> QuestionTopicIndex:
+    """Cached question-topic index; rebuilt when the curated bank or the chapter's MCQ file changes."""
+    key = ((subject or "").strip().lower(), (chapter or "").strip().lower(), curated_version(), mcq_version(subject, chapter))
+    idx = _INDEX_CACHE.get(key)
+    if idx is None:
+        idx = build_topic_index(subject, chapter)
+        _INDEX_CACHE.put(key, idx)
+    return idx
+
+
+def _digamma(x: float) -> float:
+    r = 0.0
+    while x < 6.0:
+        r -= 1.0 / x
+        x += 1.0
+    f = 1.0 / (x * x)
+    return r + math.log(x) - 0.5 / x - f * (1 / 12 - f * (1 / 120 - f * (1 / 252 - f * (1 / 240 - f / 132))))
+
+
+def expected_information_gain(a: float, b: float) -> float:
+    """Mutual information (nats) between one Bernoulli outcome and p ~ Beta(a, b)."""
+    m = a / (a + b)
+    predictive = -(m * math.log(m) + (1 - m) * math.log(1 - m)) if 0 < m < 1 else 0.0
+    s = _digamma(a + b + 1)
+    expected = m * (s - _digamma(a + 1)) + (1 - m) * (s - _digamma(b + 1))
+    return max(0.0, predictive - expected)
+
+
+def outcome_value(result: Optional[str], score: Optional[float] = None) -> Optional[float]:
+    """Map a validation outcome to [0, 1]: the 0-100 score when given, else correct/partial/incorrect."""
+    if isinstance(score, (int, float)):
+        return min(1.0, max(0.0, float(score) / 100.0))
+    return _RESULT_VALUE.get((result or "").lower())
+
+
+class AdaptiveSelector:
+    """Learner model plus bucketed question pool for one session.
+
+    evidence maps "q:<id>" / "t:<topic>" to [successes, failures]; buckets[qtype][i] is an
+    insertion-ordered set of unasked question ids whose gain falls in bucket i. pooled is False
+    for an evidence-only restore, whose (empty) pool must not be written back.
+    """
+
+    __slots__ = ("index", "evidence", "buckets", "where", "quota", "pooled")
+
+    def __init__(self, index: QuestionTopicIndex, quota: Dict[str, int]) -> None:
+        self.index = index
+        self.evidence: Dict[str, List[float]] = {}
+        self.buckets: Dict[str, List[Dict[str, None]]] = {t: [{} for _ in range(_BUCKETS)] for t in quota}
+        self.where: Dict[str, int] = {}
+        self.quota = dict(quota)
+        self.pooled = False
+
+    @classmethod
+    def start(cls, index: QuestionTopicIndex, quota: Dict[str, int], history: Optional[Iterable[Dict[str, Any]]] = None) -> "AdaptiveSelector":
+        sel = cls(index, quota)
+        for h in list(history or [])[-_HISTORY_LIMIT:]:
+            sel._observe_history(h)
+        sel._fill()
+        return sel
+
+    def _fill(self, asked: Iterable[str] = ()) -> None:
+        # Bucket every unasked question of the quota types; questions with the same estimate
+        # (e.g. all untested ones) share a gain evaluation
+        skip = set(asked)
+        memo: Dict[Tuple[float, float], int] = {}
+        for qid, kind in self.index.qtype.items():
+            if kind in self.buckets and qid not in skip:
+                self._place(qid, memo)
+        self.pooled = True
+
+    def _observe_history(self, h: Dict[str, Any]) -> None:
+        # Accept both stored answer rows ({question_id, answer: {...}}) and flat client records
+        if not isinstance(h, dict):
+            return
+        ans = h.get("answer") if isinstance(h.get("answer"), dict) else h
+        qid = str(h.get("question_id") or h.get("questionId") or "")
+        value = outcome_value(ans.get("result"), ans.get("score"))
+        if value is not None and qid in self.index.qtype:
+            self._record(qid, value)
+        self._record_missed(ans.get("missingPoints") or ())
+
+    def _record_missed(self, missing: Iterable[str]) -> Iterable[str]:
+        # A missed key point counts as a failure on every indexed topic it mentions
+        topics = {w for mp in missing for w in content_words(str(mp))} & self.index.members.keys()
+        for t in topics:
+            self._add(f"t:{t}", 0.0)
+        return topics
+
+    def _add(self, key: str, value: float) -> None:
+        e = self.evidence.setdefault(key, [0.0, 0.0])
+        e[0] += value
+        e[1] += 1.0 - value
+
+    def _record(self, qid: str, value: float) -> None:
+        self._add(f"q:{qid}", value)
+        for t in self.index.topics.get(qid, ()):
+            self._add(f"t:{t}", value)
+
+    def estimate(self, qid: str) -> Tuple[float, float]:
+        """Beta(a, b) belief that the student answers qid correctly."""
+        s, f = self.evidence.get(f"q:{qid}", (0.0, 0.0))
+        ts = self.index.topics.get(qid, ())
+        if ts:
+            s += sum(self.evidence.get(f"t:{t}", (0.0, 0.0))[0] for t in ts) / len(ts)
+            f += sum(self.evidence.get(f"t:{t}", (0.0, 0.0))[1] for t in ts) / len(ts)
+        return 1.0 + s, 1.0 + f
+
+    def gain(self, qid: str) -> float:
+        return expected_information_gain(*self.estimate(qid))
+
+    def _place(self, qid: str, memo: Optional[Dict[Tuple[float, float], int]] = None) -> None:
+        kind = self.index.qtype.get(qid)
+        if kind not in self.buckets:
+            return
+        old = self.where.get(qid)
+        if old is not None:
+            self.buckets[kind][old].pop(qid, None)
+        est = self.estimate(qid)
+        b = memo.get(est) if memo is not None else None
+        if b is None:
+            b = min(_BUCKETS - 1, int(expected_information_gain(*est) / _MAX_GAIN * _BUCKETS))
+            if memo is not None:
+                memo[est] = b
+        self.buckets[kind][b][qid] = None
+        self.where[qid] = b
+
+    def observe(self, qid: str, value: float, missing: Iterable[str] = ()) -> None:
+        """Fold one answer into the model and re-bucket the questions sharing its topics."""
+        self._record(qid, value)
+        for t in set(self.index.topics.get(qid, ())) | set(self._record_missed(missing)):
+            for other in self.index.members.get(t, ()):
+                if other in self.where:
+                    self._place(other)
+
+    def pick(self) -> Optional[str]:
+        """Unasked question with the highest expected information gain, within the type quotas."""
+        best: Optional[Tuple[int, int, str]] = None
+        for kind, buckets in self.buckets.items():
+            if self.quota.get(kind, 0) <= 0:
+                continue
+            for b in range(_BUCKETS - 1, -1, -1):
+                if buckets[b]:
+                    cand = (b, self.quota[kind], kind)
+                    if best is None or cand[:2] > best[:2]:
+                        best = cand
+                    break
+        if best is None:
+            return None
+        b, _, kind = best
+        qid = next(iter(self.buckets[kind][b]))
+        del self.buckets[kind][b][qid]
+        del self.where[qid]
+        self.quota[kind] -= 1
+        return qid
+
+    def mastery(self, topic: str) -> float:
+        s, f = self.evidence.get(f"t:{topic}", (0.0, 0.0))
+        return (1.0 + s) / (2.0 + s + f)
+
+    def rationale(self, qid: str) -> str:
+        topics = [t for t in self.index.topics.get(qid, ()) if not t.startswith("q:")]
+        a, b = self.estimate(qid)
+        focus = ", ".join(f"{t} ({self.mastery(t):.0%} mastery)" for t in topics[:3]) or "a new question"
+        return f"Adaptive: probing {focus}; predicted {a / (a + b):.0%} chance correct, expected information gain {self.gain(qid):.2f} nats"
+
+    def to_state(self) -> Dict[str, Any]:
+        """Evidence, remaining quotas and the non-empty buckets of the question pool."""
+        state: Dict[str, Any] = {
+            "e": {k: [round(v[0], 4), round(v[1], 4)] for k, v in self.evidence.items()},
+            "q": self.quota,
+        }
+        if self.pooled:
+            state["b"] = {kind: {str(i): list(bucket) for i, bucket in enumerate(bs) if bucket} for kind, bs in self.buckets.items()}
+        return state
+
+    @classmethod
+    def from_state(cls, index: QuestionTopicIndex, state: Dict[str, Any], asked: Optional[Iterable[str]] = None) -> "AdaptiveSelector":
+        """Restore a selector with its stored pool, without re-evaluating any gain.
+
+        States without a stored pool (older sessions) are re-bucketed from asked, O(bank); with
+        neither, only the evidence is loaded.
+        """
+        sel = cls(index, {k: int(v) for k, v in (state.get("q") or {}).items()})
+        sel.evidence = {k: [float(v[0]), float(v[1])] for k, v in (state.get("e") or {}).items()}
+        pool = state.get("b")
+        if isinstance(pool, dict):
+            for kind, stored in pool.items():
+                buckets = sel.buckets.get(kind)
+                if buckets is None:
+                    continue
+                for i, qids in stored.items():
+                    b = min(_BUCKETS - 1, max(0, int(i)))
+                    for qid in qids:
+                        # Questions dropped from the bank since the session started are skipped
+                        if index.qtype.get(qid) == kind:
+                            buckets[b][qid] = None
+                            sel.where[qid] = b
+            sel.pooled = True
+        elif asked is not None:
+            sel._fill(asked)
+        return sel
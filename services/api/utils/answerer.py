@@ -1,7 +1,28 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any, Tuple
+import re
+
 from .curated_qa import match_curated_answer
+from .segmenter import (
+    clean_text,
+    is_noise_sentence,
+    hit_sentences,
+)
+
+# Query-side patterns (compiled once at import)
+_LIST_Q_RE = re.compile(
+    r"\b(list|enumerate|state|mention|outline|write|what\s+are\s+the|which\s+are\s+the|name\s+the|give)\b.*\b(ways|methods|types|features|advantages|disadvantages|benefits|limitations|causes|modes)\b",
+    re.I,
+)
+_RETIRE_WAYS_RE = re.compile(r"\b(ways|how)\b.*\bpartner\b.*\bretire\b", re.I)
+_DEFINITIONAL_Q_RE = re.compile(r"^(what\s+is|define)\b", re.I)
+# Candidate-side patterns
+_DEFINITIONAL_S_RE = re.compile(r"\b(is|are|refers\s+to|means)\b", re.I)
+_MOTIVE_BONUS_RE = re.compile(r"(raw\s+material|supplier\s+of\s+raw|market\s+for\s+british\s+goods|market\s+for\s+british)", re.I)
+_BULLET_PREFIX_RE = re.compile(r"^(•|\-|\*|\u2022|\u25cf|\d+[\.)]|\([a-zA-Zivx]+\)|[ivx]+\.)\s+")
+_LEADING_DASH_RE = re.compile(r"^(\-\s+|•\s+)")
+_WS_RE = re.compile(r"\s+")
 
 
 def _score_from_hit(hit: Dict[str, Any]) -> float:
@@ -14,13 +35,15 @@ def _score_from_hit(hit: Dict[str, Any]) -> float:
     return min(len(t) / 1000.0, 1.0)
 
 
-def _jaccard(a: str, b: str) -> float:
-    as_ = set(a.lower().split())
-    bs_ = set(b.lower().split())
+def _token_set(text: str) -> frozenset:
+    return frozenset(text.lower().split())
+
+
+def _jaccard_sets(as_: frozenset, bs_: frozenset) -> float:
     if not as_ or not bs_:
         return 0.0
     inter = len(as_ & bs_)
-    uni = len(as_ | bs_)
+    uni = len(as_) + len(bs_) - inter
     return inter / (uni or 1)
 
 
@@ -29,43 +52,32 @@ def select_passages_mmr(hits: List[Dict[str, Any]], max_passages: int = 5, lambd
 
     - hits: list of {text, metadata, distance?}
     - returns: subset of hits with reduced redundancy
+
+    Relevance and token sets are computed once per hit; each candidate's max similarity
+    to the selected set is updated only against the newest pick, so the cost is O(n·k).
     """
-    if not hits:
+    if not hits or max_passages <= 0:
         return []
-    # Sort by base relevance (score desc)
-    candidates = sorted(hits, key=_score_from_hit, reverse=True)
-    selected: List[Dict[str, Any]] = []
-    while candidates and len(selected) < max_passages:
-        if not selected:
-            selected.append(candidates.pop(0))
-            continue
-        # Compute MMR for each candidate against selected
-        mmr_scores: List[Tuple[float, int]] = []
-        for i, h in enumerate(candidates):
-            rel = _score_from_hit(h)
-            max_sim = 0.0
-            for s in selected:
-                sim = _jaccard(h.get("text", ""), s.get("text", ""))
-                if sim > max_sim:
-                    max_sim = sim
-            mmr = lambda_mult * rel - (1 - lambda_mult) * max_sim
-            mmr_scores.append((mmr, i))
-        mmr_scores.sort(key=lambda x: x[0], reverse=True)
-        best_mmr, idx = mmr_scores[0]
-        selected.append(candidates.pop(idx))
-    return selected
-
-
-def _split_sentences(text: str) -> List[str]:
-    # Simple sentence splitter; avoids extra deps
-    import re
-    # Keep page newlines meaningful
-    text = text.strip()
-    if not text:
-        return []
-    parts = re.split(r"(?<=[.!?])\s+|\n+", text)
-    out = [p.strip() for p in parts if p and p.strip()]
-    return out
+    rel = [_score_from_hit(h) for h in hits]
+    toks = [_token_set(h.get("text", "")) for h in hits]
+    # Sort by base relevance (score desc); stable so ties keep retrieval order
+    remaining = sorted(range(len(hits)), key=lambda i: rel[i], reverse=True)
+    max_sim = [0.0] * len(hits)
+    selected: List[int] = [remaining.pop(0)]
+    while remaining and len(selected) < max_passages:
+        last = toks[selected[-1]]
+        best_pos = 0
+        best_mmr = float("-inf")
+        for pos, i in enumerate(remaining):
+            sim = _jaccard_sets(toks[i], last)
+            if sim > max_sim[i]:
+                max_sim[i] = sim
+            mmr = lambda_mult * rel[i] - (1 - lambda_mult) * max_sim[i]
+            if mmr > best_mmr:
+                best_mmr = mmr
+                best_pos = pos
+        selected.append(remaining.pop(best_pos))
+    return [hits[i] for i in selected]
 
 
 def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int = 900, *, filter_noise: bool = True, subject: str | None = None, chapter: str | None = None) -> Tuple[str, List[Dict[str, Any]]]:
@@ -89,23 +101,15 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
     if not passages:
         return ("No supporting passages found for this question.", [])
 
-    import re
+    # Query-level features, computed once per call
     q_terms = set(w.lower() for w in query.split())
-
-    # Detect list-style prompts (enumerations like "ways", "methods", "list", etc.)
-    list_q_re = re.compile(
-        r"\b(list|enumerate|state|mention|outline|write|what\s+are\s+the|which\s+are\s+the|name\s+the|give)\b.*\b(ways|methods|types|features|advantages|disadvantages|benefits|limitations|causes|modes)\b",
-        re.I,
-    )
-    retire_ways_re = re.compile(r"\b(ways|how)\b.*\bpartner\b.*\bretire\b", re.I)
-
-    def is_list_question(q: str) -> bool:
-        return bool(list_q_re.search(q)) or bool(retire_ways_re.search(q))
+    is_retire_ways = bool(_RETIRE_WAYS_RE.search(query))
+    is_list_question = bool(_LIST_Q_RE.search(query)) or is_retire_ways
+    is_definitional = bool(_DEFINITIONAL_Q_RE.match(query.strip()))
 
     # Curated micro-fallbacks for very common prompts to avoid vague answers
-    def curated_list_answer(q: str) -> List[str] | None:
-        qn = q.lower().strip()
-        if retire_ways_re.search(qn):
+    def curated_list_answer() -> List[str] | None:
+        if is_retire_ways:
             return [
                 "With consent of all partners (mutual agreement)",
                 "As provided by the partnership deed (if it permits retirement)",
@@ -113,33 +117,8 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
             ]
         return None
 
-    # Filters and bonuses
-    interrogative_re = re.compile(r"\?$|^(what|why|how|when|where|who|name|explain|discuss|enumerate|give reasons|identify|prepare|compare)\b", re.I)
-    exercise_re = re.compile(r"(exercise|work (these|this) out|short\s*answer|very\s*short|fill in|choose the correct|critically\s+appraise|match\s+the|state\s+whether|on\s+a\s+map\s+of\s+india)", re.I)
-    heading_re = re.compile(r"^\d+(?:\.[\d]+)*\s+[A-Z][A-Z\s]+$")
-    artifact_re = re.compile(r"\(cid:[^\)]+\)")
-    motive_bonus_re = re.compile(r"(raw\s+material|supplier\s+of\s+raw|market\s+for\s+british\s+goods|market\s+for\s+british)", re.I)
-
-    def is_noise_sentence(s: str) -> bool:
-        s_clean = s.strip()
-        if len(s_clean) < 5:
-            return True
-        if filter_noise and (interrogative_re.search(s_clean) or exercise_re.search(s_clean)):
-            return True
-        if filter_noise and heading_re.match(s_clean):
-            return True
-        letters = [ch for ch in s_clean if ch.isalpha()]
-        if letters:
-            upper_ratio = sum(1 for ch in letters if ch.isupper()) / len(letters)
-            if filter_noise and upper_ratio > 0.8 and len(letters) > 8:
-                return True
-        # Avoid overlong instruction-like lines
-        if filter_noise and len(s_clean) > 300 and (";" in s_clean or ":" in s_clean):
-            return True
-        return False
-
     # Special handling: extract enumerations for list-style questions
-    if is_list_question(query):
+    if is_list_question:
         bullets: List[Tuple[str, Dict[str, Any]]] = []
 
         def extract_list_items(txt: str) -> List[str]:
@@ -148,8 +127,8 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
             lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
             for ln in lines:
                 # bullets or hyphen/numbered/roman
-                if re.match(r"^(•|\-|\*|\u2022|\u25cf|\d+[\.)]|\([a-zA-Zivx]+\)|[ivx]+\.)\s+", ln):
-                    items.append(re.sub(r"^(•|\-|\*|\u2022|\u25cf|\d+[\.)]|\([a-zA-Zivx]+\)|[ivx]+\.)\s+", "", ln))
+                if _BULLET_PREFIX_RE.match(ln):
+                    items.append(_BULLET_PREFIX_RE.sub("", ln))
                 # inline semicolon-separated lists in instructional lines
                 elif ";" in ln and len(ln) < 300:
                     parts = [p.strip() for p in ln.split(";") if p.strip()]
@@ -158,23 +137,23 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
             # post-process
             out: List[str] = []
             for it in items:
-                it = re.sub(r"\s+", " ", it).strip().rstrip(".,;:")
-                it = re.sub(r"^(\-\s+|•\s+)", "", it)
+                it = _WS_RE.sub(" ", it).strip().rstrip(".,;:")
+                it = _LEADING_DASH_RE.sub("", it)
                 if 3 <= len(it) <= 140:
                     out.append(it)
             return out
 
         for h in passages:
-            raw = artifact_re.sub(" ", h.get("text", ""))
+            raw = clean_text(h.get("text", ""))
             meta = h.get("metadata", {}) or {}
             for it in extract_list_items(raw):
                 # filter instructional noise
-                if is_noise_sentence(it):
+                if is_noise_sentence(it, filter_noise):
                     continue
                 bullets.append((it, meta))
 
         # If nothing extracted, use curated fallback if available
-        curated_list = curated_list_answer(query)
+        curated_list = curated_list_answer()
         if not bullets and curated_list:
             # Attach citations from first passage if any
             meta = (passages[0].get("metadata", {}) or {}) if passages else {}
@@ -191,7 +170,7 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
         seen = set()
         chosen_list: List[Tuple[str, Dict[str, Any]]] = []
         for s, m in bullets:
-            key = re.sub(r"\s+", " ", s.lower()).strip()
+            key = _WS_RE.sub(" ", s.lower()).strip()
             if key in seen:
                 continue
             seen.add(key)
@@ -234,14 +213,8 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
     # Gather candidates across all passages (default sentence-based synthesis)
     candidates: List[Tuple[str, Dict[str, Any]]] = []
     for h in passages:
-        text = artifact_re.sub(" ", h.get("text", ""))
         meta = h.get("metadata", {}) or {}
-        for s in _split_sentences(text):
-            s = s.strip()
-            if not s:
-                continue
-            if is_noise_sentence(s):
-                continue
+        for s in hit_sentences(h, filter_noise):
             if len(s) > 260:
                 continue
             candidates.append((s, meta))
@@ -249,35 +222,40 @@ def synthesize_answer(query: str, passages: List[Dict[str, Any]], max_chars: int
     if not candidates:
         return ("No direct answer found in retrieved passages.", [])
 
-    # Score and rank candidates
-    def s_score(s: str) -> float:
-        st = set(s.lower().split())
-        overlap = len(q_terms & st) / (len(q_terms) or 1)
+    # Score and rank candidates; token sets are built once and reused for redundancy checks
+    cand_toks = [_token_set(s) for s, _ in candidates]
+
+    def s_score(i: int) -> float:
+        s = candidates[i][0]
+        overlap = len(q_terms & cand_toks[i]) / (len(q_terms) or 1)
         declarative_bonus = 0.1 if s.endswith('.') else 0.0
-        definitional_bonus = 0.0
-        if re.match(r"^(what\s+is|define)\b", query.strip(), re.I):
-            if re.search(r"\b(is|are|refers\s+to|means)\b", s, re.I):
-                definitional_bonus = 0.2
-        motive_bonus = 0.2 if motive_bonus_re.search(s) else 0.0
+        definitional_bonus = 0.2 if is_definitional and _DEFINITIONAL_S_RE.search(s) else 0.0
+        motive_bonus = 0.2 if _MOTIVE_BONUS_RE.search(s) else 0.0
         return overlap + declarative_bonus + definitional_bonus + motive_bonus
 
-    ranked = sorted(candidates, key=lambda t: s_score(t[0]), reverse=True)
-
-    # Greedy selection with redundancy suppression
-    def _norm(x: str) -> str:
-        return re.sub(r"\s+", " ", x.strip().lower())
+    ranked = sorted(range(len(candidates)), key=s_score, reverse=True)
 
+    # Greedy selection with redundancy suppression. joined_len tracks len(" ".join(chosen))
+    # and the chosen set keeps normalized text and token sets, so each candidate costs O(|chosen|).
     chosen: List[Tuple[str, Dict[str, Any]]] = []
-    for s, m in ranked:
-        if len(" ".join([c[0] for c in chosen]) + " " + s) > max_chars:
+    chosen_norms: set = set()
+    chosen_toks: List[frozenset] = []
+    joined_len = 0
+    for i in ranked:
+        s, m = candidates[i]
+        if joined_len + 1 + len(s) > max_chars:
             break
-        s_n = _norm(s)
-        if any(_norm(c[0]) == s_n for c in chosen):
+        s_n = _WS_RE.sub(" ", s.strip().lower())
+        if s_n in chosen_norms:
             continue
-        if any(_jaccard(c[0], s) > 0.75 for c in chosen):
+        st = cand_toks[i]
+        if any(_jaccard_sets(ct, st) > 0.75 for ct in chosen_toks):
             continue
+        joined_len += len(s) + (1 if chosen else 0)
         chosen.append((s, m))
-        if len(chosen) >= 3 and len(" ".join([c[0] for c in chosen])) > max_chars * 0.6:
+        chosen_norms.add(s_n)
+        chosen_toks.append(st)
+        if len(chosen) >= 3 and joined_len > max_chars * 0.6:
             break
 
     citations: List[Dict[str, Any]] = []
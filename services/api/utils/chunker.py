@@ -1,5 +1,13 @@
 from typing import List, Tuple, Dict, Any
 from dataclasses import dataclass
+import re
+
+
+CHUNK_STRATEGIES = ("char", "sentence", "token")
+
+# Sentence boundaries: terminal punctuation followed by whitespace, or a blank line.
+_SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+_TOKEN_RE = re.compile(r"\S+")
 
 
 @dataclass
@@ -29,6 +37,78 @@ def _sliding_windows(text: str, size: int, overlap: int) -> List[Tuple[int, int,
     return chunks
 
 
+def _token_spans(text: str, start: int = 0, end: int | None = None) -> List[Tuple[int, int]]:
+    """Return (start, end) character offsets of whitespace-delimited tokens in text[start:end]."""
+    end = len(text) if end is None else end
+    return [(m.start(), m.end()) for m in _TOKEN_RE.finditer(text, start, end)]
+
+
+def _token_windows(text: str, max_tokens: int, overlap: int) -> List[Tuple[int, int, str]]:
+    """Return (start_index, end_index, chunk_text) windows of up to max_tokens whole tokens."""
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be > 0")
+    if overlap < 0 or overlap >= max_tokens:
+        overlap = 0
+    toks = _token_spans(text)
+    chunks: List[Tuple[int, int, str]] = []
+    i = 0
+    n = len(toks)
+    while i < n:
+        j = min(i + max_tokens, n)
+        s, e = toks[i][0], toks[j - 1][1]
+        chunks.append((s, e, text[s:e]))
+        if j == n:
+            break
+        i = j - overlap
+    return chunks
+
+
+def _sentence_windows(text: str, max_tokens: int, overlap_sentences: int) -> List[Tuple[int, int, str]]:
+    """Pack whole sentences into windows of at most max_tokens tokens.
+
+    Consecutive windows share the last `overlap_sentences` sentences. A single sentence
+    longer than the budget is split on token boundaries so no window exceeds it.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be > 0")
+    if overlap_sentences < 0:
+        overlap_sentences = 0
+
+    # Sentence units as (start, end, n_tokens)
+    units: List[Tuple[int, int, int]] = []
+    cursor = 0
+    bounds = [(m.start(), m.end()) for m in _SENTENCE_BOUNDARY_RE.finditer(text)]
+    bounds.append((len(text), len(text)))
+    for b_start, b_end in bounds:
+        toks = _token_spans(text, cursor, b_start)
+        cursor = b_end
+        if not toks:
+            continue
+        if len(toks) <= max_tokens:
+            units.append((toks[0][0], toks[-1][1], len(toks)))
+            continue
+        for k in range(0, len(toks), max_tokens):
+            part = toks[k:k + max_tokens]
+            units.append((part[0][0], part[-1][1], len(part)))
+
+    chunks: List[Tuple[int, int, str]] = []
+    i = 0
+    n = len(units)
+    while i < n:
+        j = i
+        total = 0
+        while j < n and (j == i or total + units[j][2] <= max_tokens):
+            total += units[j][2]
+            j += 1
+        s, e = units[i][0], units[j - 1][1]
+        chunks.append((s, e, text[s:e]))
+        if j == n:
+            break
+        # Always advance by at least one sentence to guarantee progress
+        i = max(j - overlap_sentences, i + 1)
+    return chunks
+
+
 def chunk_pages(
     pages: List[Tuple[int, str]],
     *,
@@ -38,15 +118,28 @@ def chunk_pages(
     chapter: str | None = None,
     filename: str | None = None,
     source_path: str | None = None,
+    strategy: str = "char",
+    max_tokens: int = 300,
+    overlap_sentences: int = 1,
+    overlap_tokens: int = 40,
 ) -> List[Chunk]:
     """
-    Convert a list of (page_number, text) into overlapping character-based chunks.
+    Convert a list of (page_number, text) into overlapping chunks.
 
-    - chunk_size and chunk_overlap are in characters (roughly ~4 chars/token for English).
+    - strategy="char" (default): fixed character windows; chunk_size and chunk_overlap are in
+      characters (roughly ~4 chars/token for English).
+    - strategy="sentence": packs whole sentences up to max_tokens tokens; overlap is
+      overlap_sentences sentences.
+    - strategy="token": windows of max_tokens whole tokens with overlap_tokens overlap.
+    - Tokens are whitespace-delimited words.
     - Includes basic metadata for indexing and later citation.
     """
     import uuid
 
+    strategy = (strategy or "char").lower()
+    if strategy not in CHUNK_STRATEGIES:
+        raise ValueError(f"strategy must be one of {', '.join(CHUNK_STRATEGIES)}")
+
     # Concatenate pages while tracking page boundaries
     full_text_parts: List[str] = []
     page_break_positions: List[Tuple[int, int]] = []  # (page_no, end_pos)
@@ -62,7 +155,12 @@ def chunk_pages(
         cursor += 2
 
     full_text = "".join(full_text_parts).strip()
-    win_list = _sliding_windows(full_text, chunk_size, chunk_overlap)
+    if strategy == "sentence":
+        win_list = _sentence_windows(full_text, max_tokens, overlap_sentences)
+    elif strategy == "token":
+        win_list = _token_windows(full_text, max_tokens, overlap_tokens)
+    else:
+        win_list = _sliding_windows(full_text, chunk_size, chunk_overlap)
 
     def _page_span(start_idx: int, end_idx: int) -> Tuple[int, int]:
         start_page = 1
@@ -89,7 +187,12 @@ def chunk_pages(
             "chunk_index": idx,
             "chunk_size": chunk_size,
             "chunk_overlap": chunk_overlap,
+            "chunk_strategy": strategy,
         }
+        if strategy == "sentence":
+            meta.update({"max_tokens": max_tokens, "overlap_sentences": overlap_sentences})
+        elif strategy == "token":
+            meta.update({"max_tokens": max_tokens, "overlap_tokens": overlap_tokens})
         out.append(
             Chunk(
                 id=str(uuid.uuid4()),
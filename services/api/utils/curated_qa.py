@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple, List, Dict
+from typing import Optional, Tuple, List, Dict, Set, Any
+from dataclasses import dataclass, field
 import os
 import json
-from functools import lru_cache
+import threading
+import time
+
+from .lru import LRUCache, env_maxsize
+from .metrics import register_cache
 
 
 def _norm(s: str) -> str:
@@ -109,52 +114,287 @@ def _load_external_entries() -> List[Dict[str, str]]:
         return []
 
 
-@lru_cache(maxsize=1)
-def _combined_entries_cache_key() -> str:
-    # Use file mtime as a simple cache key; function body returns a string that changes when file changes
+def _stat_interval_seconds() -> float:
+    try:
+        return max(0.0, float(os.getenv("CURATED_STAT_INTERVAL_SEC", "5")))
+    except Exception:
+        return 5.0
+
+
+# Parsed + compiled curated bank: (file_key, entries, index). Validated against the external
+# file's mtime, which hot paths stat() at most once per CURATED_STAT_INTERVAL_SEC.
+_STATE: Optional[Tuple[str, List[Dict[str, str]], "CuratedIndex"]] = None
+_STATE_LOCK = threading.Lock()
+_LAST_STAT = 0.0
+
+
+def _curated_file_key() -> str:
     path = _external_curated_path()
     try:
-        mt = os.path.getmtime(path)
-        return f"{path}:{mt}"
+        return f"{path}:{os.path.getmtime(path)}"
     except Exception:
         return f"{path}:na"
 
 
+def _current_state() -> Tuple[str, List[Dict[str, str]], "CuratedIndex"]:
+    global _STATE, _LAST_STAT
+    state = _STATE
+    if state is not None and (time.monotonic() - _LAST_STAT) < _stat_interval_seconds():
+        return state
+    with _STATE_LOCK:
+        state = _STATE
+        now = time.monotonic()
+        if state is not None and (now - _LAST_STAT) < _stat_interval_seconds():
+            return state
+        key = _curated_file_key()
+        if state is None or state[0] != key:
+            # Merge built-ins with external; parse and compile once per file version
+            entries = _CURATED + _load_external_entries()
+            state = (key, entries, CuratedIndex.build(entries, key))
+            _STATE = state
+            register_cache("curated_allowed", state[2]._allowed_cache)
+        _LAST_STAT = now
+        return state
+
+
+def invalidate_curated_cache() -> None:
+    """Drop the parsed curated bank so the next lookup re-reads docs/data/curated_qa.json."""
+    global _STATE, _LAST_STAT
+    with _STATE_LOCK:
+        _STATE = None
+        _LAST_STAT = 0.0
+
+
+def curated_version() -> str:
+    """Version tag of the curated bank currently in use (external file path + mtime)."""
+    return _current_state()[0]
+
+
 def _combined_entries() -> List[Dict[str, str]]:
-    # lru_cache on a trivial function to allow cache invalidation when mtime changes
-    _ = _combined_entries_cache_key()
-    # Merge built-ins with external
-    extern = _load_external_entries()
-    return _CURATED + extern
+    return _current_state()[1]
 
 
-def match_curated_answer(query: str, subject: Optional[str], chapter: Optional[str]) -> Optional[Tuple[str, List[Dict[str, str]]]]:
+def _aliases_of(item: Dict[str, str]) -> List[str]:
+    aliases_field = item.get("aliases")
+    if isinstance(aliases_field, list):
+        return [str(a) for a in aliases_field]
+    if isinstance(aliases_field, str):
+        # support semicolon-separated string
+        return [a.strip() for a in aliases_field.split(";") if a.strip()]
+    return []
+
+
+@dataclass
+class _CompiledEntry:
+    item: Dict[str, str]
+    subject: str
+    chapter: str
+    # Normalized question followed by normalized aliases, with their token lists
+    forms: List[str]
+    form_tokens: List[List[str]]
+
+
+@dataclass
+class CuratedIndex:
+    """Precompiled view of the curated bank.
+
+    - entries keep the bank order (ties and the rule-based fallback prefer earlier entries)
+    - postings map each question/alias token to the entries that use it
+    - buckets group entry positions by (subject, chapter); "" means the entry applies to any
+    - matrix holds one L2-normalized row per question/alias form: word (1-2 gram) and char
+      (3-5 gram) TF-IDF blocks scaled so a dot product is the mean of the two cosines.
+      form_owner maps each row to its entry. Both are None when scikit-learn is unavailable.
+    """
+    key: str
+    entries: List[_CompiledEntry] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict)
+    buckets: Dict[Tuple[str, str], List[int]] = field(default_factory=dict)
+    vectorizers: Optional[Tuple[Any, Any]] = None
+    matrix: Any = None
+    form_owner: List[int] = field(default_factory=list)
+    # (subject, chapter) -> allowed entry positions; keys come from callers, so keep it bounded
+    _allowed_cache: LRUCache = field(default_factory=lambda: LRUCache(maxsize=env_maxsize("CURATED_ALLOWED_CACHE_SIZE", 256)))
+
+    @classmethod
+    def build(cls, items: List[Dict[str, str]], key: str) -> "CuratedIndex":
+        idx = cls(key=key)
+        for item in items:
+            cand_q = _norm(item.get("q", ""))
+            if not cand_q:
+                continue
+            forms = [cand_q] + [_norm(a) for a in _aliases_of(item)]
+            form_tokens = [_tokenize(f) for f in forms]
+            pos = len(idx.entries)
+            idx.entries.append(_CompiledEntry(
+                item=item,
+                subject=str(item.get("subject", "")).strip().lower(),
+                chapter=str(item.get("chapter", "")).strip().lower(),
+                forms=forms,
+                form_tokens=form_tokens,
+            ))
+            for tok in {t for toks in form_tokens for t in toks}:
+                idx.postings.setdefault(tok, []).append(pos)
+            idx.buckets.setdefault((idx.entries[pos].subject, idx.entries[pos].chapter), []).append(pos)
+        idx._fit_matrix()
+        return idx
+
+    def _fit_matrix(self) -> None:
+        forms: List[str] = []
+        owner: List[int] = []
+        for pos, e in enumerate(self.entries):
+            for f in e.forms:
+                forms.append(f)
+                owner.append(pos)
+        if not forms:
+            return
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+            from scipy.sparse import hstack  # type: ignore
+            word_vec = TfidfVectorizer(ngram_range=(1, 2), stop_words="english", sublinear_tf=True)
+            char_vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True)
+            try:
+                W = word_vec.fit_transform(forms)
+            except ValueError:
+                # Bank made only of stopwords; score on characters alone
+                word_vec, W = None, None
+            C = char_vec.fit_transform(forms)
+            self.matrix = (hstack([W, C]) * (0.5 ** 0.5) if W is not None else C).tocsr()
+            self.vectorizers = (word_vec, char_vec)
+            self.form_owner = owner
+        except Exception:
+            self.vectorizers = None
+            self.matrix = None
+            self.form_owner = []
+
+    def _query_vector(self, qn: str):
+        word_vec, char_vec = self.vectorizers  # type: ignore[misc]
+        from scipy.sparse import hstack  # type: ignore
+        c = char_vec.transform([qn])
+        if word_vec is None:
+            return c
+        return (hstack([word_vec.transform([qn]), c]) * (0.5 ** 0.5)).tocsr()
+
+    def score(self, qn: str, subj: str, chap: str, top_n: int = 5) -> List[Tuple[int, float]]:
+        """Top entries by best form similarity, restricted to the allowed buckets.
+
+        A single sparse product scores every form; only rows sharing a feature with the query
+        are visited. Returns [(entry_pos, score)] sorted by score desc, then bank order.
+        """
+        if self.matrix is None or not qn:
+            return []
+        sims = (self.matrix @ self._query_vector(qn).T).tocoo()
+        allowed = self._allowed(subj, chap)
+        best: Dict[int, float] = {}
+        for row, val in zip(sims.row, sims.data):
+            pos = self.form_owner[row]
+            if pos in allowed and val > best.get(pos, 0.0):
+                best[pos] = float(val)
+        ranked = sorted(best.items(), key=lambda t: (-t[1], t[0]))
+        return ranked[:top_n]
+
+    def _allowed(self, subj: str, chap: str) -> Set[int]:
+        cached = self._allowed_cache.get((subj, chap))
+        if cached is not None:
+            return cached
+        allowed: Set[int] = set()
+        for (s, c), positions in self.buckets.items():
+            if subj and s and s != subj:
+                continue
+            if chap and c and c != chap:
+                continue
+            allowed.update(positions)
+        self._allowed_cache.put((subj, chap), allowed)
+        return allowed
+
+    def candidates(self, q_tokens: Set[str], subj: str, chap: str) -> List[int]:
+        """Entry positions sharing at least one token with the query, in bank order."""
+        hit: Set[int] = set()
+        for t in q_tokens:
+            hit.update(self.postings.get(t, ()))
+        return sorted(hit & self._allowed(subj, chap))
+
+
+def _matches_compiled(qn: str, q_tokens: Set[str], entry: _CompiledEntry) -> bool:
+    # Same rules as _matches(), on precomputed forms
+    for f in entry.forms:
+        if f == qn or f in qn or qn in f:
+            return True
+    for toks in entry.form_tokens:
+        if toks:
+            overlap = sum(1 for t in toks if t in q_tokens) / len(toks)
+            if overlap >= 0.6:
+                return True
+    return False
+
+
+def curated_index() -> CuratedIndex:
+    """Return the compiled curated index, rebuilt only when the curated file changes."""
+    return _current_state()[2]
+
+
+def _min_match_score() -> float:
+    try:
+        return min(1.0, max(0.0, float(os.getenv("CURATED_MATCH_MIN_SCORE", "0.5"))))
+    except Exception:
+        return 0.5
+
+
+@dataclass
+class CuratedMatch:
+    item: Dict[str, str]
+    score: float
+    elapsed_ms: float
+    method: str  # 'tfidf' | 'rules'
+
+
+def top_curated_matches(query: str, subject: Optional[str], chapter: Optional[str], n: int = 5) -> List[CuratedMatch]:
+    """Score the whole curated bank for a query and return the n best entries (any score)."""
+    idx = curated_index()
+    t0 = time.perf_counter()
     qn = _norm(query)
     subj = (subject or "").strip().lower()
     chap = (chapter or "").strip().lower()
+    if idx.matrix is not None:
+        ranked = idx.score(qn, subj, chap, top_n=n)
+        dt = (time.perf_counter() - t0) * 1000.0
+        return [CuratedMatch(item=idx.entries[pos].item, score=sc, elapsed_ms=dt, method="tfidf") for pos, sc in ranked]
+
+    # Fallback without scikit-learn: exact/substring/token-overlap rules over entries sharing a
+    # token with the query, in bank order. Substring matches are plain string containment.
+    q_tokens = set(_tokenize(qn))
+    out: List[CuratedMatch] = []
+    for pos in idx.candidates(q_tokens, subj, chap):
+        if _matches_compiled(qn, q_tokens, idx.entries[pos]):
+            out.append(CuratedMatch(item=idx.entries[pos].item, score=1.0, elapsed_ms=0.0, method="rules"))
+            if len(out) >= n:
+                break
+    dt = (time.perf_counter() - t0) * 1000.0
+    for m in out:
+        m.elapsed_ms = dt
+    return out
 
-    # Exact/substring/synonym match over curated entries (built-in + external) with optional subject/chapter filter
-    for item in _combined_entries():
-        if subj and item.get("subject", "").lower() and item["subject"].lower() != subj:
-            continue
-        if chap and item.get("chapter", "").lower() and item["chapter"].lower() != chap:
-            continue
-        cand_q_raw = item.get("q", "")
-        cand_q = _norm(cand_q_raw)
-        if not cand_q:
-            continue
-        aliases_field = item.get("aliases")
-        aliases: List[str] = []
-        if isinstance(aliases_field, list):
-            aliases = [str(a) for a in aliases_field]
-        elif isinstance(aliases_field, str):
-            # support semicolon-separated string
-            aliases = [a.strip() for a in aliases_field.split(";") if a.strip()]
-        if _matches(qn, cand_q, aliases):
-            ans = item.get("a", "").strip()
-            cites: List[Dict[str, str]] = []
-            pages = item.get("pages")
-            if pages:
-                cites.append({"page_hint": pages})
-            return (ans, cites)
-    return None
+
+def find_curated_match(query: str, subject: Optional[str], chapter: Optional[str]) -> Optional[CuratedMatch]:
+    """Best curated entry whose score reaches CURATED_MATCH_MIN_SCORE (default 0.5), else None."""
+    top = top_curated_matches(query, subject, chapter, n=1)
+    match = top[0] if top and top[0].score >= _min_match_score() else None
+    try:
+        from .metrics import record as record_metric
+        elapsed = top[0].elapsed_ms if top else 0.0
+        record_metric("curated_match_ms", elapsed, {"matched": match is not None})
+    except Exception:
+        pass
+    return match
+
+
+def match_curated_answer(query: str, subject: Optional[str], chapter: Optional[str]) -> Optional[Tuple[str, List[Dict[str, str]]]]:
+    match = find_curated_match(query, subject, chapter)
+    if match is None:
+        return None
+    item = match.item
+    ans = item.get("a", "").strip()
+    cites: List[Dict[str, str]] = []
+    pages = item.get("pages")
+    if pages:
+        cites.append({"page_hint": pages})
+    return (ans, cites)
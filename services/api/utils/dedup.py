@@ -0,0 +1,110 @@
+"""Near-duplicate chunk suppression using MinHash signatures with LSH banding.
+
+Runs at ingest time between chunk_pages() and DiskIndex.upsert() so repeated boxed
+summaries, exercise text and overlap-heavy windows never reach the index.
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Any, Tuple, Set
+import hashlib
+import random
+import re
+
+from .chunker import Chunk
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int) -> Set[int]:
+    """Hash word n-gram shingles of the lowercased text to 32-bit ints."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) < size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "big")
+        for g in grams
+    }
+
+
+class MinHasher:
+    """Deterministic MinHash over 32-bit shingle hashes (universal hashing a*x+b mod p)."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingles: Set[int]) -> Tuple[int, ...]:
+        if not shingles:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in shingles)
+            for a, b in self._perms
+        )
+
+
+def _estimate_jaccard(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    same = sum(1 for x, y in zip(a, b) if x == y)
+    return same / max(len(a), 1)
+
+
+def dedup_chunks(
+    chunks: List[Chunk],
+    *,
+    threshold: float = 0.85,
+    num_perm: int = 64,
+    bands: int = 16,
+    shingle_size: int = 5,
+) -> Tuple[List[Chunk], Dict[str, Any]]:
+    """Drop chunks whose estimated Jaccard similarity to an earlier kept chunk is >= threshold.
+
+    LSH banding (bands x rows = num_perm) limits comparisons to candidate pairs sharing a
+    band bucket. The first occurrence is kept; its metadata records the ids it absorbed as a
+    comma-joined ``dup_ids`` string plus ``dup_count`` (index metadata must stay scalar).
+
+    Returns (kept_chunks, report) where report = {input, kept, removed}.
+    """
+    if bands <= 0 or num_perm % bands != 0:
+        raise ValueError("num_perm must be a positive multiple of bands")
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm=num_perm)
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    kept: List[Chunk] = []
+    kept_sigs: List[Tuple[int, ...]] = []
+    removed = 0
+
+    for c in chunks:
+        sig = hasher.signature(_shingles(c.text, shingle_size))
+        keys = [(b, sig[b * rows:(b + 1) * rows]) for b in range(bands)]
+        candidates: Set[int] = set()
+        for key in keys:
+            candidates.update(buckets.get(key, ()))
+        dup_of = None
+        for ci in sorted(candidates):
+            if _estimate_jaccard(sig, kept_sigs[ci]) >= threshold:
+                dup_of = ci
+                break
+        if dup_of is not None:
+            removed += 1
+            # Chroma metadata values must be scalars, so absorbed ids are kept comma-joined
+            meta = kept[dup_of].metadata
+            meta["dup_ids"] = f"{meta['dup_ids']},{c.id}" if meta.get("dup_ids") else c.id
+            meta["dup_count"] = int(meta.get("dup_count", 0)) + 1
+            continue
+        idx = len(kept)
+        kept.append(c)
+        kept_sigs.append(sig)
+        for key in keys:
+            buckets.setdefault(key, []).append(idx)
+
+    return kept, {"input": len(chunks), "kept": len(kept), "removed": removed}
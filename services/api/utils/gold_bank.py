@@ -0,0 +1,243 @@
+"""Gold points for short-answer validation, cached per (question, subject, chapter, version).
+
+Building gold points means a curated lookup and, failing that, a TF-IDF retrieval plus
+sentence scoring. The result only changes when the chapter index or the curated bank
+changes, so it is memoised in-process and can be precomputed in bulk into
+data/runtime/gold_bank.json (see scripts/precompute_gold_points.py).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+import json
+import os
+import re
+import threading
+
+from .indexer import DiskIndex, RetrievalContext
+from .segmenter import split_sentences
+from .curated_qa import match_curated_answer, curated_version
+from .lru import LRUCache, env_maxsize
+from .metrics import register_cache
+
+_BANK_PATH = Path(__file__).resolve().parents[3] / "data" / "runtime" / "gold_bank.json"
+_BULLET_PREFIXES = ("- ", "• ", "1) ", "2) ", "3) ", "4) ", "5) ", "1. ", "2. ")
+_BULLET_RE = re.compile(r"^(?:[-•]\s+|\d+[\.)]\s+|\d+\)\s+)")
+_SPLIT_RE = re.compile(r"\W+")
+_WS_RE = re.compile(r"\s+")
+
+_CACHE = LRUCache(maxsize=env_maxsize("GOLD_BANK_CACHE_SIZE", 2048))
+register_cache("gold_points", _CACHE)
+
+# Precomputed entries loaded from _BANK_PATH, reloaded when its mtime changes
+_BANK: Dict[str, Dict[str, Any]] = {}
+_BANK_MTIME: Optional[float] = None
+_BANK_LOCK = threading.Lock()
+
+
+def point_tokens(text: str) -> FrozenSet[str]:
+    """Token set used for key-point coverage matching."""
+    return frozenset(_SPLIT_RE.split(text.lower()))
+
+
+@dataclass
+class GoldPoints:
+    points: List[str]
+    citations: List[Dict[str, Any]]
+    source: str  # 'curated' | 'retrieval'
+    tokens: List[FrozenSet[str]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if len(self.tokens) != len(self.points):
+            self.tokens = [point_tokens(p) for p in self.points]
+
+    @property
+    def text(self) -> str:
+        return " \n".join(self.points)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "points": self.points,
+            "tokens": [sorted(t) for t in self.tokens],
+            "citations": self.citations,
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "GoldPoints":
+        points = [str(p) for p in d.get("points") or []]
+        tokens = [frozenset(t) for t in d.get("tokens") or []]
+        return cls(points=points, citations=list(d.get("citations") or []), source=str(d.get("source") or ""), tokens=tokens)
+
+
+def _curated_points(text: str) -> List[str]:
+    # Extract numbered/bulleted lines as atomic points
+    points: List[str] = []
+    for ln in text.splitlines():
+        s = ln.strip()
+        if not s:
+            continue
+        if s.startswith(_BULLET_PREFIXES):
+            s = _BULLET_RE.sub("", s).strip()
+            if s:
+                points.append(s)
+    return points
+
+
+def _retrieval_points(question: str, ctx: RetrievalContext) -> Tuple[List[str], List[Dict[str, Any]]]:
+    hits = ctx.search(question, k=8, retriever="tfidf")
+    # Collect sentences with highest overlap to the question
+    q_terms = set(_SPLIT_RE.split(question.lower()))
+    candidates: List[str] = []
+    for h in hits:
+        for s in split_sentences(h.get("text", "")):
+            s_clean = s.strip()
+            if not s_clean or len(s_clean) < 6 or len(s_clean) > 180:
+                continue
+            st = set(_SPLIT_RE.split(s_clean.lower()))
+            overlap = len(q_terms & st) / max(len(q_terms) or 1, 1)
+            if overlap >= 0.1:
+                candidates.append(s_clean)
+    # De-dup and cap ~10
+    seen = set()
+    picked: List[str] = []
+    for s in candidates:
+        key = s.lower().strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        picked.append(s)
+        if len(picked) >= 10:
+            break
+    # Basic citations from top hits
+    citations: List[Dict[str, Any]] = []
+    added = set()
+    for h in hits[:3]:
+        m = h.get("metadata", {}) or {}
+        key = (m.get("page_start"), m.get("page_end"), m.get("filename"))
+        if key in added:
+            continue
+        citations.append({
+            "page_start": m.get("page_start"),
+            "page_end": m.get("page_end"),
+            "filename": m.get("filename"),
+            "source_path": m.get("source_path"),
+        })
+        added.add(key)
+    return picked, citations
+
+
+def build_gold_points(question: str, subject: Optional[str], chapter: Optional[str], idx: Optional[DiskIndex] = None, ctx: Optional[RetrievalContext] = None) -> GoldPoints:
+    """Uncached gold points: curated bank first, retrieval over the chapter index as fallback.
+
+    Retrieval goes through ctx when given, so the caller can reuse the hits.
+    """
+    curated = match_curated_answer(question, subject, chapter)
+    if curated is not None:
+        text, cites = curated
+        points = _curated_points(text)
+        if points:
+            return GoldPoints(points=points, citations=list(cites or []), source="curated")
+    # If curated missing or yielded no points, fallback to retrieval to form points
+    points, citations = _retrieval_points(question, ctx or RetrievalContext(subject, chapter, idx))
+    return GoldPoints(points=points, citations=citations, source="retrieval")
+
+
+def gold_version(subject: Optional[str], chapter: Optional[str], idx: Optional[DiskIndex] = None) -> str:
+    """Version of everything gold points depend on: the chapter index and the curated bank."""
+    return f"{(idx or DiskIndex()).index_version(subject, chapter)}|{curated_version()}"
+
+
+def _bank_key(question: str, subject: Optional[str], chapter: Optional[str], version: str) -> str:
+    qn = _WS_RE.sub(" ", question.strip().lower())
+    return "\t".join((qn, (subject or "").strip().lower(), str(chapter or "").strip().lower(), version))
+
+
+def _bank_entry(key: str) -> Optional[Dict[str, Any]]:
+    global _BANK, _BANK_MTIME
+    try:
+        mtime: Optional[float] = os.path.getmtime(_BANK_PATH)
+    except Exception:
+        mtime = None
+    with _BANK_LOCK:
+        if mtime != _BANK_MTIME:
+            bank: Dict[str, Dict[str, Any]] = {}
+            if mtime is not None:
+                try:
+                    data = json.loads(Path(_BANK_PATH).read_text(encoding="utf-8"))
+                    if isinstance(data.get("entries"), dict):
+                        bank = data["entries"]
+                except Exception:
+                    bank = {}
+            _BANK, _BANK_MTIME = bank, mtime
+        return _BANK.get(key)
+
+
+def get_gold_points(question: str, subject: Optional[str], chapter: Optional[str], idx: Optional[DiskIndex] = None, ctx: Optional[RetrievalContext] = None) -> GoldPoints:
+    """Gold points for a question, from the in-process cache, the precomputed bank, or built fresh."""
+    idx = ctx.idx if ctx is not None else (idx or DiskIndex())
+    key = _bank_key(question, subject, chapter, gold_version(subject, chapter, idx))
+    gold = _CACHE.get(key)
+    if gold is not None:
+        return gold
+    entry = _bank_entry(key)
+    if entry is not None:
+        try:
+            gold = GoldPoints.from_dict(entry)
+        except Exception:
+            gold = None
+    if gold is None:
+        gold = build_gold_points(question, subject, chapter, idx, ctx)
+    _CACHE.put(key, gold)
+    return gold
+
+
+def invalidate_gold_points() -> None:
+    """Drop in-process gold points and force the precomputed bank to be re-read."""
+    global _BANK, _BANK_MTIME
+    _CACHE.clear()
+    with _BANK_LOCK:
+        _BANK, _BANK_MTIME = {}, None
+
+
+def precompute_gold_points(questions: Iterable[Tuple[str, Optional[str], Optional[str]]], idx: Optional[DiskIndex] = None) -> Dict[str, Any]:
+    """Build gold points for (question, subject, chapter) triples and write them to the bank file.
+
+    Entries for the chapters covered by this run are replaced, so stale versions are dropped;
+    other chapters already in the bank are kept. Returns {questions, curated, retrieval, empty, path}.
+    """
+    idx = idx or DiskIndex()
+    entries: Dict[str, Dict[str, Any]] = {}
+    versions: Dict[Tuple[Optional[str], Optional[str]], str] = {}
+    counts = {"curated": 0, "retrieval": 0, "empty": 0}
+    for question, subject, chapter in questions:
+        if not question or not question.strip():
+            continue
+        sc = (subject, chapter)
+        if sc not in versions:
+            versions[sc] = gold_version(subject, chapter, idx)
+        key = _bank_key(question, subject, chapter, versions[sc])
+        if key in entries:
+            continue
+        gold = build_gold_points(question, subject, chapter, idx)
+        entries[key] = gold.to_dict()
+        counts[gold.source] += 1
+        if not gold.points:
+            counts["empty"] += 1
+    path = Path(_BANK_PATH)
+    covered = {tuple(k.split("\t")[1:3]) for k in entries}
+    try:
+        previous = json.loads(path.read_text(encoding="utf-8")).get("entries") or {}
+    except Exception:
+        previous = {}
+    for k, v in previous.items():
+        if tuple(k.split("\t")[1:3]) not in covered:
+            entries.setdefault(k, v)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"entries": entries}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    invalidate_gold_points()
+    return {"questions": sum(counts[s] for s in ("curated", "retrieval")), **counts, "path": str(path)}
@@ -2,9 +2,14 @@ from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import json
 from .chunker import Chunk
+from .segmenter import segment_text
 import os
+import time
 
 _MODEL_CACHE: Dict[str, Any] = {}
+_CHROMA_INSTALLED: Optional[bool] = None
+# Touched on every Chroma upsert so index_version() changes (Chroma has no items.json)
+_CHROMA_VERSION_FILE = "chroma.version"
 _TFIDF_CACHE: Dict[str, Tuple[Any, Any, float, int]] = {}
 # cache: namespace -> (vectorizer, X_sparse, items_mtime, n_docs)
 
@@ -24,6 +29,14 @@ def _load_custom_stopwords() -> Optional[List[str]]:
     return None
 
 
+def _chroma_installed() -> bool:
+    global _CHROMA_INSTALLED
+    if _CHROMA_INSTALLED is None:
+        import importlib.util
+        _CHROMA_INSTALLED = importlib.util.find_spec("chromadb") is not None
+    return _CHROMA_INSTALLED
+
+
 class DiskIndex:
     """Lightweight wrapper around Chroma persistent client per subject/chapter."""
 
@@ -113,8 +126,9 @@ class DiskIndex:
         if not new_chunks:
             return {"namespace": namespace, "count": len(items)}
 
+        # Sentence spans + noise flags are stored with the chunk so synthesis can skip re-splitting
         new_items = items + [
-            {"id": c.id, "text": c.text, "metadata": c.metadata}
+            {"id": c.id, "text": c.text, "metadata": c.metadata, "segments": [list(sg) for sg in segment_text(c.text)]}
             for c in new_chunks
         ]
 
@@ -199,6 +213,45 @@ class DiskIndex:
             pass
         return False
 
+    def index_version(self, subject: Optional[str], chapter: Optional[str]) -> str:
+        """Cheap version tag for a namespace; changes whenever it is rewritten.
+
+        JSON namespaces use the items.json mtime, Chroma namespaces the version file touched by
+        upsert() (or chroma.sqlite3 for collections written before it existed).
+        """
+        namespace = self._ns(subject, chapter)
+        for name in ("items.json", _CHROMA_VERSION_FILE, "chroma.sqlite3"):
+            try:
+                return f"{namespace}:{(self.base / namespace / name).stat().st_mtime}"
+            except Exception:
+                continue
+        return f"{namespace}:na"
+
+    def fitted_vectorizer(self, subject: Optional[str], chapter: Optional[str]) -> Optional[Tuple[Any, str]]:
+        """Return (vectorizer, version) for the namespace's fitted TF-IDF model, or None.
+
+        Only stats items.json on the warm path; the version string changes whenever the
+        index is rewritten, so callers can key derived caches on it.
+        """
+        namespace = self._ns(subject, chapter)
+        items_path = self.base / namespace / "items.json"
+        try:
+            mtime = items_path.stat().st_mtime
+        except Exception:
+            return None
+        cached = _TFIDF_CACHE.get(namespace)
+        if cached is None or abs(cached[2] - mtime) >= 1e-6:
+            if not self._load_tfidf_cache_from_disk(namespace, mtime):
+                items, mtime = self._get_items_and_mtime(items_path)
+                texts = [it.get("text", "") for it in items]
+                if not texts:
+                    return None
+                self._ensure_tfidf_cache(namespace, texts, mtime)
+            cached = _TFIDF_CACHE.get(namespace)
+        if cached is None or cached[0] is None:
+            return None
+        return cached[0], f"{namespace}:{cached[2]}"
+
     def _simple_query(self, namespace: str, query: str, k: int, model: str, *, retriever: str = "auto") -> Dict[str, Any]:
         ns_dir = self._ns_dir(namespace)
         items_path = ns_dir / "items.json"
@@ -232,11 +285,14 @@ class DiskIndex:
                 for i in top_idx:
                     it = items[i]
                     score = float(sims[i])
-                    out.append({
+                    hit = {
                         "text": it.get("text", ""),
                         "metadata": it.get("metadata", {}),
                         "distance": float(1.0 - score),
-                    })
+                    }
+                    if "segments" in it:
+                        hit["segments"] = it["segments"]
+                    out.append(hit)
                 return {"namespace": namespace, "results": out}
             except Exception:
                 # If anything fails, fall back to BM25-like
@@ -294,11 +350,14 @@ class DiskIndex:
                 it = items[i]
                 s = scores[i]
                 dist = float(1.0 - (s / max_s if max_s > 0 else 0.0))
-                out.append({
+                hit = {
                     "text": it.get("text", ""),
                     "metadata": it.get("metadata", {}),
                     "distance": dist,
-                })
+                }
+                if "segments" in it:
+                    hit["segments"] = it["segments"]
+                out.append(hit)
             return {"namespace": namespace, "results": out}
 
         # Route based on desired retriever
@@ -328,6 +387,10 @@ class DiskIndex:
             if not ids:
                 return {"namespace": ns, "count": 0}
             coll.upsert(ids=ids, documents=texts, metadatas=metadatas)
+            try:
+                (self.base / ns / _CHROMA_VERSION_FILE).write_text(str(time.time_ns()), encoding="utf-8")
+            except Exception:
+                pass
             # Chroma doesn't return count; assume added all
             return {"namespace": ns, "count": len(coll.get()["ids"]) if hasattr(coll, "get") else len(ids)}
         except RuntimeError as e:
@@ -336,6 +399,13 @@ class DiskIndex:
                 return self._simple_upsert(ns, chunks, model, reset=reset)
             raise
 
+    def uses_chroma(self, retriever: Optional[str] = "auto") -> bool:
+        """Whether query() with this retriever goes to Chroma rather than the JSON index.
+
+        The JSON path already falls back from TF-IDF to BM25 internally; Chroma does not.
+        """
+        return (retriever or "auto").lower() not in {"tfidf", "bm25"} and _chroma_installed()
+
     def query(self, *, subject: Optional[str], chapter: Optional[str], query: str, k: int = 5, model: str = "all-MiniLM-L6-v2", retriever: str = "auto") -> Dict[str, Any]:
         ns = self._ns(subject, chapter)
         try:
@@ -381,3 +451,39 @@ def clear_tfidf_cache(namespace: Optional[str]) -> list[str]:
     except Exception:
         pass
     return cleared
+
+
+class RetrievalContext:
+    """Per-request retrieval memo for one (subject, chapter).
+
+    Threaded through a pipeline (e.g. short-answer validation) so later stages reuse hits an
+    earlier stage already fetched instead of querying the index again: searches are memoized
+    per (query, retriever), and a later search is served from the memo only when the earlier
+    one asked for at least as many hits. Also collects per-stage timings for metrics.
+    """
+
+    def __init__(self, subject: Optional[str], chapter: Optional[str], idx: Optional[DiskIndex] = None) -> None:
+        self.subject = subject
+        self.chapter = chapter
+        self.idx = idx or DiskIndex()
+        self.retrievals = 0
+        self.timings: Dict[str, float] = {}
+        # (query, retriever) -> (k requested, hits)
+        self._memo: Dict[Tuple[str, str], Tuple[int, List[Dict[str, Any]]]] = {}
+
+    def search(self, query: str, k: int, retriever: str = "auto") -> List[Dict[str, Any]]:
+        key = (query, (retriever or "auto").lower())
+        cached = self._memo.get(key)
+        if cached is not None and cached[0] >= k:
+            return cached[1][:k]
+        t0 = time.perf_counter()
+        res = self.idx.query(subject=self.subject, chapter=self.chapter, query=query, k=k, retriever=retriever)
+        self.retrievals += 1
+        hits = list(res.get("results", []))
+        self._memo[key] = (k, hits)
+        self.timings["retrieval_ms"] = self.timings.get("retrieval_ms", 0.0) + (time.perf_counter() - t0) * 1000.0
+        return hits
+
+    def timed(self, stage: str, t0: float) -> None:
+        """Record the time since perf_counter() value t0 under f"{stage}_ms"."""
+        self.timings[f"{stage}_ms"] = (time.perf_counter() - t0) * 1000.0
@@ -1,38 +1,140 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, replace
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import json
+import os
 import threading
+import time
 
-_cache_lock = threading.Lock()
-_mcq_cache: Dict[str, List[Dict[str, Any]]] = {}
+_MCQ_ROOT = Path("data/mcq")
+
+# Readers look chapters up in an immutable snapshot without taking a lock; writers publish a
+# new dict (copy-on-write) under _publish_lock, which is never held during file I/O.
+_snapshot: Dict[str, "MCQChapter"] = {}
+_publish_lock = threading.Lock()
+# Single-flight: one thread (re)loads a given chapter while others wait for it, or, when a
+# previous version exists, keep serving that version until the reload is published.
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class MCQChapter:
+    """One chapter's MCQs as loaded from disk, indexed by id and by topic."""
+    items: List[Dict[str, Any]]
+    by_id: Dict[str, Dict[str, Any]]
+    by_topic: Dict[str, Tuple[Dict[str, Any], ...]]
+    mtime: Optional[float]
+    checked_at: float  # time.monotonic() of the last mtime check
+
+
+def _stat_interval_seconds() -> float:
+    try:
+        return max(0.0, float(os.getenv("MCQ_STAT_INTERVAL_SEC", "2")))
+    except Exception:
+        return 2.0
 
 
 def _key(subject: str, chapter: str) -> str:
     return f"{subject.lower().strip()}::{chapter.lower().strip()}"
 
 
-def load_mcqs(subject: str, chapter: str) -> List[Dict[str, Any]]:
-    """Load MCQs from data/mcq/<subject>/<chapter>.json and cache them."""
+def _path(subject: str, chapter: str) -> Tuple[str, Path]:
     subj = subject.lower().replace(" ", "-")
     chap = str(chapter).lower()
-    p = Path("data/mcq") / subj / f"{chap}.json"
-    k = _key(subj, chap)
-    with _cache_lock:
-        if k in _mcq_cache:
-            return _mcq_cache[k]
-        if not p.exists():
-            _mcq_cache[k] = []
-            return []
+    return _key(subj, chap), _MCQ_ROOT / subj / f"{chap}.json"
+
+
+def _mtime(p: Path) -> Optional[float]:
+    try:
+        return p.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _item_topics(item: Dict[str, Any]) -> List[str]:
+    raw = item.get("topics") or item.get("topic") or []
+    if isinstance(raw, str):
+        raw = raw.split(";")
+    return [" ".join(str(t).lower().split()) for t in raw if str(t).strip()]
+
+
+def _build_chapter(p: Path, mtime: Optional[float]) -> MCQChapter:
+    items: List[Dict[str, Any]] = []
+    if mtime is not None:
         try:
             items = json.loads(p.read_text(encoding="utf-8"))
             if not isinstance(items, list):
                 items = []
         except Exception:
             items = []
-        _mcq_cache[k] = items
-        return items
+    by_id: Dict[str, Dict[str, Any]] = {}
+    topics: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if item.get("id") is not None:
+            # First occurrence wins, matching the old linear scan
+            by_id.setdefault(str(item.get("id")), item)
+        for t in _item_topics(item):
+            topics.setdefault(t, []).append(item)
+    return MCQChapter(
+        items=items,
+        by_id=by_id,
+        by_topic={t: tuple(v) for t, v in topics.items()},
+        mtime=mtime,
+        checked_at=time.monotonic(),
+    )
+
+
+def _publish(k: str, chapter: MCQChapter) -> MCQChapter:
+    global _snapshot
+    with _publish_lock:
+        snap = dict(_snapshot)
+        snap[k] = chapter
+        _snapshot = snap
+    return chapter
+
+
+def _refresh(k: str, p: Path, cached: Optional[MCQChapter]) -> MCQChapter:
+    mtime = _mtime(p)
+    if cached is not None and cached.mtime == mtime:
+        return _publish(k, replace(cached, checked_at=time.monotonic()))
+    return _publish(k, _build_chapter(p, mtime))
+
+
+def load_chapter(subject: str, chapter: str) -> MCQChapter:
+    """Indexed MCQs from data/mcq/<subject>/<chapter>.json, reloaded when the file's mtime changes.
+
+    The mtime is checked at most once per MCQ_STAT_INTERVAL_SEC per chapter. Hits never lock.
+    """
+    k, p = _path(subject, chapter)
+    cached = _snapshot.get(k)
+    if cached is not None and (time.monotonic() - cached.checked_at) < _stat_interval_seconds():
+        return cached
+    with _inflight_lock:
+        event = _inflight.get(k)
+        leader = event is None
+        if leader:
+            event = _inflight[k] = threading.Event()
+    if not leader:
+        if cached is not None:
+            return cached
+        event.wait()
+        return _snapshot.get(k) or load_chapter(subject, chapter)
+    try:
+        return _refresh(k, p, cached)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(k, None)
+        event.set()
+
+
+def load_mcqs(subject: str, chapter: str) -> List[Dict[str, Any]]:
+    """Load MCQs from data/mcq/<subject>/<chapter>.json and cache them."""
+    return load_chapter(subject, chapter).items
 
 
 def get_mcqs(subject: str, chapter: str) -> List[Dict[str, Any]]:
@@ -40,7 +142,24 @@ def get_mcqs(subject: str, chapter: str) -> List[Dict[str, Any]]:
 
 
 def get_mcq_by_id(subject: str, chapter: str, qid: str) -> Optional[Dict[str, Any]]:
-    for item in load_mcqs(subject, chapter):
-        if str(item.get("id")) == str(qid):
-            return item
-    return None
+    return load_chapter(subject, chapter).by_id.get(str(qid))
+
+
+def get_mcqs_by_topic(subject: str, chapter: str, topic: str) -> List[Dict[str, Any]]:
+    """MCQs tagged with topic (via their "topic"/"topics" field)."""
+    return list(load_chapter(subject, chapter).by_topic.get(" ".join(topic.lower().split()), ()))
+
+
+def mcq_version(subject: str, chapter: str) -> str:
+    """Version tag of the loaded chapter file (its mtime, or 'na' when missing)."""
+    mtime = load_chapter(subject, chapter).mtime
+    return "na" if mtime is None else f"{mtime:.6f}"
+
+
+def invalidate_mcq_cache() -> int:
+    """Drop every loaded chapter so the next lookup re-reads the files. Returns chapters dropped."""
+    global _snapshot
+    with _publish_lock:
+        n = len(_snapshot)
+        _snapshot = {}
+    return n
@@ -1,40 +1,225 @@
+"""In-process runtime metrics.
+
+Every record() lands in a fixed-bucket log-scale histogram for the metric (O(1): one log()
+and one counter increment), in a per-label histogram for low-cardinality extras such as
+retriever, k or route, and in a bounded deque of recent raw samples for debugging. Quantiles
+are read off the histogram buckets, so export cost does not grow with traffic.
+"""
+
 from __future__ import annotations
 
-import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import math
+import os
 import threading
-from typing import Dict, List, Any
+import time
 
 _LOCK = threading.Lock()
-_MAX = 200  # ring buffer size per metric
-_DATA: Dict[str, List[Dict[str, Any]]] = {}
+
+# Buckets grow by 10% from 1µs; 250 buckets reach ~24 minutes. Values are reported at the
+# bucket's geometric midpoint, i.e. within ~5% of the true quantile.
+_MIN_MS = 0.001
+_GROWTH = 1.1
+_LOG_GROWTH = math.log(_GROWTH)
+_NUM_BUCKETS = 250
+
+# Extras recorded as labels (each distinct combination gets its own histogram)
+LABEL_KEYS = ("route", "method", "status", "retriever", "k")
+_MAX_SERIES = 256  # per metric; further label combinations only count towards the total
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+_WINDOW = _env_int("METRICS_WINDOW", 1000)  # recent raw samples kept per metric
+
+
+class Histogram:
+    """Log-bucketed latency histogram: O(1) observe, quantiles in O(buckets)."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def bucket_of(ms: float) -> int:
+        if ms <= _MIN_MS:
+            return 0
+        return min(_NUM_BUCKETS - 1, int(math.log(ms / _MIN_MS) / _LOG_GROWTH) + 1)
+
+    @staticmethod
+    def upper_bound(i: int) -> float:
+        """Inclusive upper edge (ms) of bucket i."""
+        return _MIN_MS * _GROWTH ** i
+
+    def observe(self, ms: float) -> None:
+        self.counts[self.bucket_of(ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen > rank:
+                mid = math.sqrt(self.upper_bound(i - 1) * self.upper_bound(i)) if i else _MIN_MS
+                return min(max(mid, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0, "p50": 0, "p90": 0, "p95": 0, "p99": 0, "avg": 0}
+        return {
+            "count": self.count,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "avg": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    def minus(self, other: "Histogram") -> "Histogram":
+        """Samples in self that are not in other (other must be a subset, e.g. one label series)."""
+        h = Histogram()
+        h.counts = [a - b for a, b in zip(self.counts, other.counts)]
+        h.count, h.total, h.min, h.max = self.count - other.count, self.total - other.total, self.min, self.max
+        return h
+
+    def copy(self) -> "Histogram":
+        h = Histogram()
+        h.counts = list(self.counts)
+        h.count, h.total, h.min, h.max = self.count, self.total, self.min, self.max
+        return h
+
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+_HISTS: Dict[str, Histogram] = {}
+_LABELLED: Dict[str, Dict[LabelSet, Histogram]] = {}
+_DATA: Dict[str, Deque[Dict[str, Any]]] = {}  # recent raw samples per metric
+_COUNTERS: Dict[str, Dict[LabelSet, float]] = {}
+_GAUGES: Dict[str, Dict[LabelSet, float]] = {}
+_CACHES: Dict[str, Any] = {}  # name -> object exposing stats()
+
+
+def _labels(extra: Optional[Dict[str, Any]]) -> LabelSet:
+    if not extra:
+        return ()
+    return tuple((k, str(extra[k])) for k in LABEL_KEYS if extra.get(k) is not None)
 
 
 def record(metric: str, ms: float, extra: Dict[str, Any] | None = None) -> None:
     row = {"t": int(time.time()), "ms": float(ms)}
     if extra:
         row.update(extra)
+    labels = _labels(extra)
+    with _LOCK:
+        hist = _HISTS.get(metric)
+        if hist is None:
+            hist = _HISTS[metric] = Histogram()
+            _DATA[metric] = deque(maxlen=_WINDOW)
+        hist.observe(row["ms"])
+        _DATA[metric].append(row)
+        if labels:
+            series = _LABELLED.setdefault(metric, {})
+            lh = series.get(labels)
+            if lh is None and len(series) < _MAX_SERIES:
+                lh = series[labels] = Histogram()
+            if lh is not None:
+                lh.observe(row["ms"])
+
+
+def incr(metric: str, labels: Dict[str, Any] | None = None, value: float = 1.0) -> None:
+    """Add to a monotonically increasing counter (e.g. error counts)."""
+    key = _labels(labels)
+    with _LOCK:
+        series = _COUNTERS.setdefault(metric, {})
+        series[key] = series.get(key, 0.0) + value
+
+
+def gauge_add(metric: str, delta: float, labels: Dict[str, Any] | None = None) -> None:
+    """Move a gauge up or down (e.g. requests in flight)."""
+    key = _labels(labels)
+    with _LOCK:
+        series = _GAUGES.setdefault(metric, {})
+        series[key] = series.get(key, 0.0) + delta
+
+
+def counters() -> Dict[str, Dict[LabelSet, float]]:
+    with _LOCK:
+        return {m: dict(v) for m, v in _COUNTERS.items()}
+
+
+def gauges() -> Dict[str, Dict[LabelSet, float]]:
     with _LOCK:
-        buf = _DATA.setdefault(metric, [])
-        buf.append(row)
-        if len(buf) > _MAX:
-            del buf[: len(buf) - _MAX]
+        return {m: dict(v) for m, v in _GAUGES.items()}
+
+
+def caches() -> Dict[str, Dict[str, Any]]:
+    return {name: c.stats() for name, c in list(_CACHES.items())}
+
+
+def _label_str(labels: LabelSet) -> str:
+    return ",".join(f"{k}={v}" for k, v in labels)
 
 
 def summary(metric: str) -> Dict[str, Any]:
     with _LOCK:
-        buf = list(_DATA.get(metric, []))
-    if not buf:
-        return {"count": 0, "p50": 0, "p95": 0, "avg": 0}
-    values = [r["ms"] for r in buf]
-    values_sorted = sorted(values)
-    def pct(p: float) -> float:
-        if not values_sorted:
-            return 0.0
-        k = int(round((p / 100.0) * (len(values_sorted) - 1)))
-        return values_sorted[k]
-    avg = sum(values) / len(values)
-    return {"count": len(values), "p50": pct(50), "p95": pct(95), "avg": avg}
+        hist = _HISTS.get(metric)
+        hist = hist.copy() if hist is not None else Histogram()
+        series = {labels: h.copy() for labels, h in _LABELLED.get(metric, {}).items()}
+    out = hist.summary()
+    if series:
+        out["labels"] = {_label_str(labels): h.summary() for labels, h in sorted(series.items())}
+    return out
+
+
+def recent(metric: str, n: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Most recent raw samples (oldest first), at most n."""
+    with _LOCK:
+        rows = list(_DATA.get(metric, ()))
+    return rows[-n:] if n else rows
+
+
+def histograms() -> Dict[str, Tuple[Histogram, Dict[LabelSet, Histogram]]]:
+    """Consistent copies of every metric's histogram and its labelled series (for exporters)."""
+    with _LOCK:
+        return {
+            m: (h.copy(), {labels: lh.copy() for labels, lh in _LABELLED.get(m, {}).items()})
+            for m, h in _HISTS.items()
+        }
+
+
+def register_cache(name: str, cache: Any) -> None:
+    """Expose a cache's stats() under "caches" in export_all()."""
+    _CACHES[name] = cache
 
 
 def export_all() -> Dict[str, Any]:
-    return {k: summary(k) for k in _DATA.keys()}
+    out: Dict[str, Any] = {k: summary(k) for k in list(_HISTS.keys())}
+    if _CACHES:
+        out["caches"] = caches()
+    if _COUNTERS:
+        out["counters"] = {m: {_label_str(k): v for k, v in sorted(series.items())} for m, series in counters().items()}
+    if _GAUGES:
+        out["gauges"] = {m: {_label_str(k): v for k, v in sorted(series.items())} for m, series in gauges().items()}
+    return out
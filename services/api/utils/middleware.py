@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import os
 import asyncio
-from typing import Callable
+import time
+from typing import Any, AsyncIterator, Callable
 from fastapi import Request, Response
+from starlette.background import BackgroundTask, BackgroundTasks
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from .metrics import gauge_add, incr, record as record_metric
+
 
 def _get_int_env(name: str, default: int) -> int:
     try:
@@ -53,3 +57,56 @@ class RequestTimeoutMiddleware(BaseHTTPMiddleware):
         except asyncio.TimeoutError:
             from starlette.responses import PlainTextResponse
             return PlainTextResponse("Request timeout", status_code=504)
+
+
+def _route_label(request: Request) -> str:
+    # The matched route template keeps label cardinality bounded (/practice/next, not ids)
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+async def _release_after(body: AsyncIterator[Any], release: Callable[[], None]) -> AsyncIterator[Any]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        release()
+
+
+class RequestMetricsMiddleware(BaseHTTPMiddleware):
+    """Records per-route latency, requests in flight and error counts into utils.metrics.
+
+    Latency is measured until the response starts (for streaming routes, time to first byte);
+    a request counts as in flight until its body has been sent, so open SSE streams show up.
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Response]):
+        method = request.method
+        gauge_add("http_requests_in_flight", 1, {"method": method})
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                gauge_add("http_requests_in_flight", -1, {"method": method})
+
+        t0 = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        except BaseException:
+            release()
+            raise
+        finally:
+            labels = {"route": _route_label(request), "method": method, "status": status}
+            record_metric("http_request_ms", (time.perf_counter() - t0) * 1000.0, labels)
+            if status >= 500:
+                incr("http_request_errors_total", labels)
+        response.body_iterator = _release_after(response.body_iterator, release)
+        # The background task covers a client that disconnects before the body starts streaming
+        task = BackgroundTask(release)
+        response.background = task if response.background is None else BackgroundTasks([response.background, task])
+        return response
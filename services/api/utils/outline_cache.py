@@ -0,0 +1,80 @@
+"""Persistent cache of /teach outlines.
+
+An outline depends only on (subject, chapter, topics, depth, retriever, k) and on the
+chapter index + curated bank it was extracted from. Entries live in a bounded in-process
+LRU; only the fixed request shapes the precompute command builds are also written one file
+per key under data/runtime/teach_outlines/<namespace>/, so free-form topics cannot grow the
+disk cache. Entries carry the version they were built against; a version mismatch is a miss.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+
+from .lru import LRUCache, env_maxsize
+from .metrics import register_cache
+
+# Bump when outline construction changes so entries built by older code are not served
+_FORMAT = 2
+_OUTLINE_DIR = Path(__file__).resolve().parents[3] / "data" / "runtime" / "teach_outlines"
+
+_CACHE = LRUCache(maxsize=env_maxsize("TEACH_OUTLINE_CACHE_SIZE", 512))
+register_cache("teach_outlines", _CACHE)
+
+
+def outline_key(subject: str, chapter: str, topics: List[str], depth: str, retriever: str, k: int) -> str:
+    norm_topics = [" ".join(t.lower().split()) for t in topics]
+    raw = json.dumps([_FORMAT, subject.strip().lower(), str(chapter).strip().lower(), norm_topics, depth, retriever, int(k)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()  # nosec - non-crypto usage
+
+
+def _path(namespace: str, key: str) -> Path:
+    return _OUTLINE_DIR / namespace / f"{key}.json"
+
+
+def get_outline(namespace: str, key: str, version: str) -> Optional[Dict[str, Any]]:
+    """Cached outline payload built against version, or None."""
+    hit = _CACHE.get((namespace, key))
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    try:
+        data = json.loads(_path(namespace, key).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get("version") != version or not isinstance(data.get("outline"), dict):
+        return None
+    _CACHE.put((namespace, key), (version, data["outline"]))
+    return data["outline"]
+
+
+def put_outline(namespace: str, key: str, version: str, outline: Dict[str, Any], *, persist: bool = True) -> None:
+    """Store an outline in memory and, if persist, on disk (best-effort, atomic replace)."""
+    _CACHE.put((namespace, key), (version, outline))
+    if not persist:
+        return
+    try:
+        p = _path(namespace, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"version": version, "outline": outline}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+    except Exception:
+        pass
+
+
+def invalidate_outlines(namespace: Optional[str] = None) -> int:
+    """Drop cached outlines (all, or one namespace) from memory and disk. Returns files removed."""
+    _CACHE.clear()
+    base = _OUTLINE_DIR / namespace if namespace else _OUTLINE_DIR
+    removed = 0
+    for p in base.rglob("*.json") if base.exists() else []:
+        try:
+            p.unlink()
+            removed += 1
+        except Exception:
+            pass
+    return removed
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import asyncio
+import heapq
 import time
 import uuid
 import json
+import os
+import sqlite3
+import threading
 from pathlib import Path
 
-from .mcq_store import get_mcqs
-from .curated_qa import _combined_entries
+from .mcq_store import get_mcqs, get_mcq_by_id
+from .curated_qa import _combined_entries, curated_version
+from .adaptive import AdaptiveSelector, outcome_value, short_question_id, topic_index
+from .lru import LRUCache, env_maxsize
+from .metrics import register_cache
 
 
 @dataclass
 class PracticeQuestion:
+    """A question resolved for display: text and options looked up from the MCQ/curated banks."""
     qtype: str  # 'mcq' | 'short'
     id: str
     question: str
@@ -20,37 +30,94 @@ class PracticeQuestion:
     meta: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
+class QuestionRef:
+    """What a session stores per question: its type and id (MCQ id or short:<digest>)."""
+    qtype: str
+    id: str
+
+
+@dataclass(slots=True)
+class AnswerRecord:
+    """Compact outcome of one submission; the full validation payload is returned, not stored."""
+    index: int
+    question_id: str
+    qtype: Optional[str]
+    result: Optional[str]
+    score: Optional[float] = None
+    missing: Tuple[str, ...] = ()
+    ts: float = 0.0
+
+    @classmethod
+    def from_payload(cls, index: int, question_id: str, qtype: Optional[str], payload: Dict[str, Any]) -> "AnswerRecord":
+        score = payload.get("score")
+        return cls(
+            index=index,
+            question_id=str(question_id),
+            qtype=qtype,
+            result=payload.get("result"),
+            score=float(score) if isinstance(score, (int, float)) else None,
+            missing=tuple(str(m) for m in payload.get("missingPoints") or ()),
+            ts=time.time(),
+        )
+
+    def to_row(self) -> List[Any]:
+        return [self.index, self.question_id, self.qtype, self.result, self.score, list(self.missing), round(self.ts, 3)]
+
+    @classmethod
+    def from_row(cls, row: Any) -> "AnswerRecord":
+        if isinstance(row, dict):
+            # Pre-compact sessions stored {"index", "question_id", "qtype", "answer": payload, "ts"}
+            rec = cls.from_payload(int(row.get("index", 0)), row.get("question_id") or "", row.get("qtype"), row.get("answer") or {})
+            rec.ts = float(row.get("ts") or 0.0)
+            return rec
+        index, qid, qtype, result, score, missing, ts = row
+        return cls(index=int(index), question_id=qid, qtype=qtype, result=result, score=score, missing=tuple(missing or ()), ts=float(ts))
+
+
+@dataclass(slots=True)
 class PracticeSession:
     session_id: str
     subject: str
     chapter: str
     created_at: float
-    questions: List[PracticeQuestion]
+    questions: List[QuestionRef]
     index: int = 0
-    answers: List[Dict[str, Any]] = field(default_factory=list)
+    answers: List[AnswerRecord] = field(default_factory=list)
+    rationale: Optional[str] = None  # why the current question was picked (adaptive sessions)
+    # Adaptive sessions pick questions one at a time up to limit, from the learner state
+    limit: int = 0
+    learner: Optional[Dict[str, Any]] = None
 
     @property
     def total(self) -> int:
-        return len(self.questions)
+        return max(self.limit, len(self.questions))
 
-    def current(self) -> Optional[PracticeQuestion]:
+    def current_ref(self) -> Optional[QuestionRef]:
         if 0 <= self.index < len(self.questions):
             return self.questions[self.index]
         return None
 
+    def current(self) -> Optional[PracticeQuestion]:
+        ref = self.current_ref()
+        return resolve_question(self.subject, self.chapter, ref) if ref is not None else None
+
     def next(self) -> Optional[PracticeQuestion]:
         self.index += 1
         return self.current()
 
 
-_SESSIONS: Dict[str, PracticeSession] = {}
-
 # Persistence configuration
-_PERSIST_PATH = Path(__file__).resolve().parents[3] / "data" / "runtime" / "practice_sessions.json"
-_PERSIST_PATH.parent.mkdir(parents=True, exist_ok=True)
+_LEGACY_PATH = Path(__file__).resolve().parents[3] / "data" / "runtime" / "practice_sessions.json"
+_DB_PATH = _LEGACY_PATH.with_suffix(".db")
 _SESSION_TTL_SECONDS = 60 * 60 * 6  # 6 hours
-_LAST_LOAD = 0.0
+try:
+    _SWEEP_INTERVAL_SECONDS = max(1.0, float(os.getenv("PRACTICE_SWEEP_INTERVAL_SEC", "60")))
+except Exception:
+    _SWEEP_INTERVAL_SECONDS = 60.0
+# Every Nth sweep also runs an indexed range delete, catching sessions whose expiry was
+# scheduled by another worker process (or one that has since exited)
+_BACKSTOP_EVERY = 10
 
 
 def _serialize_session(sess: PracticeSession) -> Dict[str, Any]:
@@ -60,185 +127,446 @@ def _serialize_session(sess: PracticeSession) -> Dict[str, Any]:
         "chapter": sess.chapter,
         "created_at": sess.created_at,
         "index": sess.index,
-        "answers": sess.answers,
-        "questions": [
-            {
-                "qtype": q.qtype,
-                "id": q.id,
-                "question": q.question,
-                "options": q.options,
-                "meta": q.meta,
-            } for q in sess.questions
-        ],
+        "questions": [[q.qtype, q.id] for q in sess.questions],
+        "answers": [a.to_row() for a in sess.answers],
+        **({"limit": sess.limit, "learner": sess.learner, "rationale": sess.rationale} if sess.learner is not None else {}),
     }
 
 
+def _question_ref(raw: Any) -> QuestionRef:
+    if isinstance(raw, dict):
+        # Pre-compact sessions stored the whole question; keep only what resolves it
+        if raw.get("qtype") == "short":
+            return QuestionRef("short", short_question_id(raw.get("question") or ""))
+        return QuestionRef(raw.get("qtype"), str((raw.get("meta") or {}).get("mcq_id") or raw.get("id")))
+    qtype, qid = raw
+    return QuestionRef(qtype, qid)
+
+
 def _deserialize_session(d: Dict[str, Any]) -> Optional[PracticeSession]:
     try:
-        questions = [PracticeQuestion(qtype=q.get("qtype"), id=q.get("id"), question=q.get("question"), options=q.get("options"), meta=q.get("meta") or {}) for q in d.get("questions", [])]
         return PracticeSession(
             session_id=d.get("session_id"),
             subject=d.get("subject"),
             chapter=d.get("chapter"),
             created_at=float(d.get("created_at")),
-            questions=questions,
+            questions=[_question_ref(q) for q in d.get("questions", [])],
             index=int(d.get("index", 0)),
-            answers=d.get("answers", []),
+            answers=[AnswerRecord.from_row(a) for a in d.get("answers", [])],
+            rationale=d.get("rationale"),
+            limit=int(d.get("limit", 0)),
+            learner=d.get("learner"),
         )
     except Exception:
         return None
 
 
-def _prune_and_persist() -> None:
-    # Remove expired sessions then persist all
-    now = time.time()
-    expired = []
-    for sid, sess in list(_SESSIONS.items()):
-        if (now - sess.created_at) > _SESSION_TTL_SECONDS:
-            expired.append(sid)
-    for sid in expired:
-        _SESSIONS.pop(sid, None)
+class SessionStore:
+    """SQLite session table shared by every thread and worker process.
+
+    One row per session, so each write is O(1) I/O. The database runs in WAL mode so
+    readers never block the writer; each thread keeps its own connection, and mutations
+    are read-modify-write transactions under BEGIN IMMEDIATE, so concurrent submits from
+    different threads or uvicorn workers cannot overwrite each other. The legacy
+    practice_sessions.json is imported once, when the table is first created.
+    """
+
+    def __init__(self, path: Path, legacy_json: Optional[Path] = None) -> None:
+        self.path = path
+        self._legacy_json = legacy_json
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # isolation_level=None: autocommit, transactions are opened explicitly
+            conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._ensure_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            # IMMEDIATE takes the write lock, so only one process creates the table and imports
+            with self._transaction(conn):
+                fresh = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sessions'").fetchone() is None
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "session_id TEXT PRIMARY KEY, created_at REAL NOT NULL, updated_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions(created_at)")
+                if fresh and self._legacy_json is not None:
+                    self._import_legacy(conn, self._legacy_json)
+            self._schema_ready = True
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _import_legacy(self, conn: sqlite3.Connection, path: Path) -> None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        now = time.time()
+        rows = []
+        for sid, raw in (data.items() if isinstance(data, dict) else []):
+            sess = _deserialize_session(raw)
+            if sess and (now - sess.created_at) <= _SESSION_TTL_SECONDS:
+                rows.append((sid, sess.created_at, now, _dumps(sess)))
+        if rows:
+            conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)", rows)
+
+    @staticmethod
+    def _load(row: Optional[Tuple[str]]) -> Optional[PracticeSession]:
+        if not row:
+            return None
+        try:
+            return _deserialize_session(json.loads(row[0]))
+        except Exception:
+            return None
+
+    def put(self, sess: PracticeSession) -> None:
+        self._db().execute(
+            "INSERT OR REPLACE INTO sessions (session_id, created_at, updated_at, payload) VALUES (?, ?, ?, ?)",
+            (sess.session_id, sess.created_at, time.time(), _dumps(sess)),
+        )
+
+    def get(self, session_id: str) -> Optional[PracticeSession]:
+        return self._load(self._db().execute("SELECT payload FROM sessions WHERE session_id = ?", (session_id,)).fetchone())
+
+    def update(self, session_id: str, mutate: Callable[[PracticeSession], Any]) -> Optional[PracticeSession]:
+        """Atomically apply mutate() to the stored session; returns the updated session or None."""
+        conn = self._db()
+        with self._transaction(conn):
+            sess = self._load(conn.execute("SELECT payload FROM sessions WHERE session_id = ?", (session_id,)).fetchone())
+            if sess is None:
+                return None
+            mutate(sess)
+            conn.execute(
+                "UPDATE sessions SET updated_at = ?, payload = ? WHERE session_id = ?",
+                (time.time(), _dumps(sess), session_id),
+            )
+        return sess
+
+    def delete(self, session_id: str) -> None:
+        self._db().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self, created_before: float) -> int:
+        """Delete sessions created before the cutoff (an indexed range delete)."""
+        return self._db().execute("DELETE FROM sessions WHERE created_at < ?", (created_before,)).rowcount
+
+    def expiries(self) -> List[Tuple[float, str]]:
+        """(created_at, session_id) for every stored session; read once when the sweeper starts."""
+        return [(float(ts), sid) for sid, ts in self._db().execute("SELECT session_id, created_at FROM sessions")]
+
+
+class MemorySessionStore:
+    """Process-local store with the SessionStore interface (single worker, tests)."""
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, str] = {}
+        self._created: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def put(self, sess: PracticeSession) -> None:
+        with self._lock:
+            self._rows[sess.session_id] = _dumps(sess)
+            self._created[sess.session_id] = sess.created_at
+
+    def get(self, session_id: str) -> Optional[PracticeSession]:
+        with self._lock:
+            raw = self._rows.get(session_id)
+        return _deserialize_session(json.loads(raw)) if raw else None
+
+    def update(self, session_id: str, mutate: Callable[[PracticeSession], Any]) -> Optional[PracticeSession]:
+        with self._lock:
+            raw = self._rows.get(session_id)
+            sess = _deserialize_session(json.loads(raw)) if raw else None
+            if sess is None:
+                return None
+            mutate(sess)
+            self._rows[session_id] = _dumps(sess)
+        return sess
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._rows.pop(session_id, None)
+            self._created.pop(session_id, None)
+
+    def prune(self, created_before: float) -> int:
+        with self._lock:
+            old = [sid for sid, ts in self._created.items() if ts < created_before]
+            for sid in old:
+                self._rows.pop(sid, None)
+                self._created.pop(sid, None)
+        return len(old)
+
+    def expiries(self) -> List[Tuple[float, str]]:
+        with self._lock:
+            return [(ts, sid) for sid, ts in self._created.items()]
+
+
+def _dumps(sess: PracticeSession) -> str:
+    return json.dumps(_serialize_session(sess), ensure_ascii=False, separators=(",", ":"))
+
+
+def _make_store() -> Any:
+    # PRACTICE_SESSION_STORE=memory keeps sessions in-process (single worker only)
+    if os.getenv("PRACTICE_SESSION_STORE", "sqlite").strip().lower() == "memory":
+        return MemorySessionStore()
+    return SessionStore(_DB_PATH, legacy_json=_LEGACY_PATH)
+
+
+_SHORT_PROMPTS = LRUCache(maxsize=env_maxsize("PRACTICE_PROMPT_CACHE_SIZE", 64))
+register_cache("practice_short_prompts", _SHORT_PROMPTS)
+
+# The store is the source of truth; there is no per-process session cache to diverge
+_STORE = _make_store()
+
+# Min-heap of (expires_at, session_id) for sessions this process knows about. The sweeper
+# pops only the entries that are due, so nothing on the request path walks the table.
+_EXPIRY_HEAP: List[Tuple[float, str]] = []
+_EXPIRY_LOCK = threading.Lock()
+
+
+def _expired(sess: PracticeSession, now: Optional[float] = None) -> bool:
+    return ((now or time.time()) - sess.created_at) > _SESSION_TTL_SECONDS
+
+
+def _schedule_expiry(session_id: str, created_at: float) -> None:
+    with _EXPIRY_LOCK:
+        heapq.heappush(_EXPIRY_HEAP, (created_at + _SESSION_TTL_SECONDS, session_id))
+
+
+def next_expiry() -> Optional[float]:
+    """Earliest scheduled expiry time, or None when nothing is scheduled."""
+    with _EXPIRY_LOCK:
+        return _EXPIRY_HEAP[0][0] if _EXPIRY_HEAP else None
+
+
+def seed_expiries() -> int:
+    """Schedule every session already in the store (sessions persisted before this process started)."""
     try:
-        payload = {sid: _serialize_session(s) for sid, s in _SESSIONS.items()}
-        _PERSIST_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        # File rotation if >5MB
-        if _PERSIST_PATH.stat().st_size > 5 * 1024 * 1024:
-            ts = int(time.time())
-            rotated = _PERSIST_PATH.parent / f"practice_sessions_{ts}.json"
-            _PERSIST_PATH.rename(rotated)
-            _PERSIST_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        rows = _STORE.expiries()
     except Exception:
-        pass
+        return 0
+    with _EXPIRY_LOCK:
+        for created_at, sid in rows:
+            _EXPIRY_HEAP.append((created_at + _SESSION_TTL_SECONDS, sid))
+        heapq.heapify(_EXPIRY_HEAP)
+    return len(rows)
+
+
+def sweep_expired(now: Optional[float] = None) -> int:
+    """Delete the sessions whose expiry is due; O(k log n) for k expired entries."""
+    now = now or time.time()
+    due: List[str] = []
+    with _EXPIRY_LOCK:
+        while _EXPIRY_HEAP and _EXPIRY_HEAP[0][0] <= now:
+            due.append(heapq.heappop(_EXPIRY_HEAP)[1])
+    for sid in due:
+        try:
+            _STORE.delete(sid)
+        except Exception:
+            pass
+    return len(due)
+
+
+async def run_session_sweeper(interval: Optional[float] = None) -> None:
+    """Background task: sleep until the next expiry (at most interval seconds), then sweep.
 
+    Started from the app lifespan; cancel it on shutdown.
+    """
+    interval = interval or _SWEEP_INTERVAL_SECONDS
+    await asyncio.to_thread(seed_expiries)
+    sweeps = 0
+    while True:
+        nxt = next_expiry()
+        delay = interval if nxt is None else min(interval, max(0.0, nxt - time.time()))
+        await asyncio.sleep(delay)
+        await asyncio.to_thread(sweep_expired)
+        sweeps += 1
+        if sweeps % _BACKSTOP_EVERY == 0:
+            try:
+                await asyncio.to_thread(_STORE.prune, time.time() - _SESSION_TTL_SECONDS)
+            except Exception:
+                pass
 
-def _lazy_load() -> None:
-    global _LAST_LOAD
-    if _SESSIONS or not _PERSIST_PATH.exists():
-        return
+
+def _short_prompts(subject: str, chapter: str) -> Dict[str, str]:
+    """Curated prompts for a chapter as {short id: question}, in bank order; rebuilt when the bank changes."""
+    key = (curated_version(), (subject or "").strip().lower(), (chapter or "").strip().lower())
+    prompts = _SHORT_PROMPTS.get(key)
+    if prompts is not None:
+        return prompts
+    prompts = {}
     try:
-        data = json.loads(_PERSIST_PATH.read_text(encoding="utf-8"))
-        for sid, raw in data.items():
-            sess = _deserialize_session(raw)
-            if not sess:
+        for e in _combined_entries():
+            if key[1] and e.get("subject", "").strip().lower() != key[1]:
                 continue
-            if (time.time() - sess.created_at) > _SESSION_TTL_SECONDS:
+            if key[2] and e.get("chapter", "").strip().lower() != key[2]:
                 continue
-            _SESSIONS[sid] = sess
+            q = e.get("q") or ""
+            if q:
+                prompts.setdefault(short_question_id(q), q)
     except Exception:
-        pass
-    _LAST_LOAD = time.time()
-
-
-def _gen_mcq_questions(subject: str, chapter: str, limit: int) -> List[PracticeQuestion]:
-    out: List[PracticeQuestion] = []
-    mcqs = get_mcqs(subject, chapter)
-    for m in mcqs[:limit]:
-        out.append(PracticeQuestion(
-            qtype="mcq",
-            id=m.get("id") or str(uuid.uuid4()),
-            question=m.get("question") or "",
-            options=m.get("options") or [],
-            meta={"mcq_id": m.get("id")},
-        ))
+        prompts = {}
+    _SHORT_PROMPTS.put(key, prompts)
+    return prompts
+
+
+def resolve_question(subject: str, chapter: str, ref: QuestionRef) -> Optional[PracticeQuestion]:
+    """Look up the text (and options) for a stored question reference; None if it is gone from the bank."""
+    if ref.qtype == "mcq":
+        m = get_mcq_by_id(subject, chapter, ref.id)
+        if m is None:
+            return None
+        return PracticeQuestion(qtype="mcq", id=ref.id, question=m.get("question") or "", options=m.get("options") or [], meta={"mcq_id": ref.id})
+    text = _short_prompts(subject, chapter).get(ref.id)
+    if text is None:
+        return None
+    return PracticeQuestion(qtype="short", id=ref.id, question=text)
+
+
+def _gen_mcq_questions(subject: str, chapter: str, limit: int) -> List[QuestionRef]:
+    # MCQs without an id cannot be resolved or validated later, so they are skipped
+    out: List[QuestionRef] = []
+    for m in get_mcqs(subject, chapter):
+        if len(out) >= limit:
+            break
+        if m.get("id"):
+            out.append(QuestionRef("mcq", str(m["id"])))
     return out
 
 
-def _gen_short_questions(subject: str, chapter: str, limit: int) -> List[PracticeQuestion]:
-    out: List[PracticeQuestion] = []
+def _gen_short_questions(subject: str, chapter: str, limit: int) -> List[QuestionRef]:
     # Use curated entries as short-answer prompts when available
-    try:
-        entries = [e for e in _combined_entries() if (
-            (not subject or e.get("subject", "").strip().lower() == (subject or "").strip().lower()) and
-            (not chapter or e.get("chapter", "").strip().lower() == (chapter or "").strip().lower())
-        )]
-    except Exception:
-        entries = []
-    for e in entries[:limit]:
-        q = e.get("q") or ""
-        if not q:
-            continue
-        out.append(PracticeQuestion(
-            qtype="short",
-            id=f"short:{hash(q)}",
-            question=q,
-        ))
-    return out
+    return [QuestionRef("short", sid) for sid in list(_short_prompts(subject, chapter))[:limit]]
 
 
-def start_session(subject: str, chapter: str, total: int = 6, mix: Tuple[int, int] = (3, 3)) -> PracticeSession:
-    _lazy_load()
+def _start_adaptive(subject: str, chapter: str, total: int, mix: Tuple[int, int], answer_history: Optional[List[Dict[str, Any]]]) -> Tuple[List[QuestionRef], int, Optional[Dict[str, Any]], Optional[str]]:
+    index = topic_index(subject, chapter)
     mcq_n, short_n = mix
-    rationale = None
-    import collections
-    # Adaptive logic: prioritize missed key points and incorrect MCQs
-    import inspect
-    frame = inspect.currentframe()
-    answer_history = None
-    # Try to get answer_history from caller if passed
-    if 'answer_history' in frame.f_back.f_locals:
-        answer_history = frame.f_back.f_locals['answer_history']
-    if answer_history:
-        missed_points = collections.Counter()
-        incorrect_mcqs = set()
-        for ans in answer_history:
-            if ans.get("qtype") == "short":
-                for mp in ans.get("answer", {}).get("missingPoints", []):
-                    missed_points[mp] += 1
-            elif ans.get("qtype") == "mcq":
-                qid = ans.get("question_id")
-                correct = ans.get("answer", {}).get("result") == "correct"
-                if not correct and qid:
-                    incorrect_mcqs.add(qid)
-        # Prioritize short-answer questions covering top 2 missed points
-        short_qs = _gen_short_questions(subject, chapter, short_n)
-        if missed_points:
-            top_missed = [mp for mp, _ in missed_points.most_common(2)]
-            filtered_short = [q for q in short_qs if any(mp in q.question for mp in top_missed)]
-            if filtered_short:
-                short_qs = filtered_short + [q for q in short_qs if q not in filtered_short]
-        # Bias MCQ selection toward incorrect MCQs
-        mcq_qs = _gen_mcq_questions(subject, chapter, mcq_n)
-        prioritized_mcqs = [q for q in mcq_qs if q.id in incorrect_mcqs]
-        if prioritized_mcqs:
-            mcq_qs = prioritized_mcqs + [q for q in mcq_qs if q not in prioritized_mcqs]
-        rationale = f"Adaptive: prioritized missed points {top_missed if missed_points else []} and incorrect MCQs {list(incorrect_mcqs)[:2]}"
+    # Same shortfall rule as fixed sessions: missing short prompts become extra MCQs
+    short_n = min(short_n, index.available("short"))
+    mcq_n = min(mcq_n + (mix[1] - short_n), index.available("mcq"))
+    selector = AdaptiveSelector.start(index, {"mcq": mcq_n, "short": short_n}, answer_history)
+    first = selector.pick()
+    if first is None:
+        return [], 0, None, None
+    limit = min(total, mcq_n + short_n)
+    return [QuestionRef(index.qtype[first], first)], limit, selector.to_state(), selector.rationale(first)
+
+
+def start_session(
+    subject: str,
+    chapter: str,
+    total: int = 6,
+    mix: Tuple[int, int] = (3, 3),
+    adaptive: bool = False,
+    answer_history: Optional[List[Dict[str, Any]]] = None,
+) -> PracticeSession:
+    """Create and persist a session.
+
+    Fixed sessions take the first MCQs and curated prompts of the chapter. Adaptive sessions
+    (adaptive=True) seed a learner model from answer_history and pick each next question by
+    expected information gain (see utils/adaptive.py).
+    """
+    sid = str(uuid.uuid4())
+    if adaptive:
+        qs, limit, learner, rationale = _start_adaptive(subject, chapter, total, mix, answer_history)
+        sess = PracticeSession(session_id=sid, subject=subject, chapter=chapter, created_at=time.time(), questions=qs,
+                               rationale=rationale, limit=limit, learner=learner)
     else:
+        mcq_n, short_n = mix
         mcq_qs = _gen_mcq_questions(subject, chapter, mcq_n)
         short_qs = _gen_short_questions(subject, chapter, short_n)
-    # If not enough curated short questions, fill with extra MCQs
-    if len(short_qs) < short_n:
-        extra = short_n - len(short_qs)
-        mcq_qs.extend(_gen_mcq_questions(subject, chapter, extra))
-    qs = mcq_qs + short_qs
-    # Cap total
-    qs = qs[:total]
-    sid = str(uuid.uuid4())
-    sess = PracticeSession(session_id=sid, subject=subject, chapter=chapter, created_at=time.time(), questions=qs)
-    _SESSIONS[sid] = sess
-    _prune_and_persist()
-    sess.rationale = rationale
+        # If not enough curated short questions, fill with extra MCQs
+        if len(short_qs) < short_n:
+            extra = short_n - len(short_qs)
+            mcq_qs.extend(_gen_mcq_questions(subject, chapter, extra))
+        qs = (mcq_qs + short_qs)[:total]
+        sess = PracticeSession(session_id=sid, subject=subject, chapter=chapter, created_at=time.time(), questions=qs)
+    _STORE.put(sess)
+    _schedule_expiry(sid, sess.created_at)
     return sess
 
 
 def get_session(session_id: str) -> Optional[PracticeSession]:
-    _lazy_load()
-    sess = _SESSIONS.get(session_id)
-    if not sess:
+    """Load a session from the shared store (a fresh copy; mutate it via the helpers below).
+
+    Only this row's TTL is checked here; bulk expiry is the sweeper's job.
+    """
+    sess = _STORE.get(session_id)
+    if sess is None:
         return None
-    if (time.time() - sess.created_at) > _SESSION_TTL_SECONDS:
-        # Expired; remove and persist
-        _SESSIONS.pop(session_id, None)
-        _prune_and_persist()
+    if _expired(sess):
+        _STORE.delete(session_id)
         return None
     return sess
 
 
+def _sync(session: PracticeSession, stored: Optional[PracticeSession]) -> None:
+    # Reflect the committed state back into the caller's copy
+    if stored is not None:
+        session.index = stored.index
+        session.answers = stored.answers
+        session.questions = stored.questions
+        session.learner = stored.learner
+        session.rationale = stored.rationale
+
+
+def advance_session(session: PracticeSession) -> Optional[PracticeQuestion]:
+    """Move to the next question and persist the new position atomically."""
+    # Resolved before the write transaction: it may stat and (re)build the chapter's bank
+    index = topic_index(session.subject, session.chapter) if session.learner is not None else None
+
+    def _step(s: PracticeSession) -> None:
+        if index is not None and s.learner is not None and s.index + 1 >= len(s.questions) and len(s.questions) < s.limit:
+            selector = AdaptiveSelector.from_state(index, s.learner, asked=[q.id for q in s.questions])
+            qid = selector.pick()
+            if qid is not None:
+                s.questions.append(QuestionRef(selector.index.qtype[qid], qid))
+                s.rationale = selector.rationale(qid)
+                s.learner = selector.to_state()
+        s.index += 1
+
+    stored = _STORE.update(session.session_id, _step)
+    if stored is None:
+        return session.next()
+    _sync(session, stored)
+    return session.current()
+
+
 def record_answer(session: PracticeSession, question_id: str, payload: Dict[str, Any]) -> None:
-    session.answers.append({
-        "index": session.index,
-        "question_id": question_id,
-        "qtype": (session.current().qtype if session.current() else None),
-        "answer": payload,
-        "ts": time.time(),
-    })
-    _prune_and_persist()
+    """Store a compact record of a submission (result, score, missed points) for the current question."""
+    index = topic_index(session.subject, session.chapter) if session.learner is not None else None
+
+    def _append(s: PracticeSession) -> None:
+        ref = s.current_ref()
+        rec = AnswerRecord.from_payload(s.index, question_id, ref.qtype if ref else None, payload)
+        s.answers.append(rec)
+        value = outcome_value(rec.result, rec.score)
+        if index is not None and s.learner is not None and ref is not None and value is not None:
+            # The stored pool is restored too, so the questions sharing a topic are re-bucketed
+            selector = AdaptiveSelector.from_state(index, s.learner, asked=[q.id for q in s.questions])
+            selector.observe(ref.id, value, rec.missing)
+            s.learner = selector.to_state()
+
+    _sync(session, _STORE.update(session.session_id, _append))
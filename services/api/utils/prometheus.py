@@ -0,0 +1,89 @@
+"""Prometheus text exposition (format 0.0.4) of the in-process metrics in utils/metrics.
+
+Latency histograms are exported as cumulative `_bucket{le=...}` series over a fixed set of
+millisecond bounds (derived from the finer log buckets, so each bound is accurate to one
+log bucket, ~10%), plus `_sum` and `_count`. Counters, gauges and cache stats follow.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple
+import math
+import re
+
+from .metrics import _NUM_BUCKETS, Histogram, LabelSet, caches, counters, gauges, histograms
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "commerce_"
+LE_BOUNDS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_:]")
+# For each bound, how many of the log buckets lie entirely below it
+_CUTOFFS = [sum(1 for i in range(_NUM_BUCKETS) if Histogram.upper_bound(i) <= le) for le in LE_BOUNDS_MS]
+
+
+def metric_name(name: str) -> str:
+    n = _NAME_RE.sub("_", name)
+    return PREFIX + (n if not n[:1].isdigit() else f"_{n}")
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = [f'{k}="{_escape(str(v))}"' for k, v in labels]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def _histogram_lines(name: str, labels: LabelSet, h: Histogram) -> List[str]:
+    lines: List[str] = []
+    cum = 0
+    i = 0
+    for le, cutoff in zip(LE_BOUNDS_MS, _CUTOFFS):
+        while i < cutoff:
+            cum += h.counts[i]
+            i += 1
+        lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', _fmt_value(le)),))} {cum}")
+    lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {h.count}")
+    lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(h.total)}")
+    lines.append(f"{name}_count{_fmt_labels(labels)} {h.count}")
+    return lines
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    out: List[str] = []
+    for metric, (total, series) in sorted(histograms().items()):
+        name = metric_name(metric)
+        out.append(f"# HELP {name} Latency of {metric} (milliseconds).")
+        out.append(f"# TYPE {name} histogram")
+        rest = total
+        for labels, h in sorted(series.items()):
+            out.extend(_histogram_lines(name, labels, h))
+            rest = rest.minus(h)
+        # Samples recorded without labels (or past the series cap) are exported unlabelled
+        if rest.count > 0 or not series:
+            out.extend(_histogram_lines(name, (), rest))
+    for kind, data in (("counter", counters()), ("gauge", gauges())):
+        for metric, series in sorted(data.items()):
+            name = metric_name(metric)
+            out.append(f"# TYPE {name} {kind}")
+            for labels, v in sorted(series.items()):
+                out.append(f"{name}{_fmt_labels(labels)} {_fmt_value(v)}")
+    stats = caches()
+    fields = sorted({k for s in stats.values() for k, v in s.items() if isinstance(v, (int, float)) and not isinstance(v, bool)})
+    for field in fields:
+        kind = "counter" if field in ("hits", "misses", "evictions") else "gauge"
+        name = metric_name(f"cache_{field}_total" if kind == "counter" else f"cache_{field}")
+        out.append(f"# TYPE {name} {kind}")
+        for cache, s in sorted(stats.items()):
+            if isinstance(s.get(field), (int, float)):
+                out.append(f"{name}{_fmt_labels((('cache', cache),))} {_fmt_value(s[field])}")
+    return "\n".join(out) + "\n"
@@ -0,0 +1,105 @@
+"""Sentence segmentation and noise flags shared by indexing and answer synthesis.
+
+Segments are computed once per chunk (at index time for the JSON index, or via a bounded
+in-process cache for other backends) so synthesize_answer does not re-split passages and
+re-run the noise regexes on every request.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Tuple
+import re
+
+# Module-level pattern bank (compiled once)
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+ARTIFACT_RE = re.compile(r"\(cid:[^\)]+\)")
+INTERROGATIVE_RE = re.compile(r"\?$|^(what|why|how|when|where|who|name|explain|discuss|enumerate|give reasons|identify|prepare|compare)\b", re.I)
+EXERCISE_RE = re.compile(r"(exercise|work (these|this) out|short\s*answer|very\s*short|fill in|choose the correct|critically\s+appraise|match\s+the|state\s+whether|on\s+a\s+map\s+of\s+india)", re.I)
+HEADING_RE = re.compile(r"^\d+(?:\.[\d]+)*\s+[A-Z][A-Z\s]+$")
+
+# (start, end, is_noise) offsets into clean_text(text)
+Segment = Tuple[int, int, bool]
+
+
+def clean_text(text: str) -> str:
+    """Replace PDF extraction artifacts like (cid:123) with spaces."""
+    return ARTIFACT_RE.sub(" ", text or "")
+
+
+def split_sentences(text: str) -> List[str]:
+    # Simple sentence splitter; avoids extra deps. Keeps page newlines meaningful.
+    text = text.strip()
+    if not text:
+        return []
+    parts = SENTENCE_SPLIT_RE.split(text)
+    return [p.strip() for p in parts if p and p.strip()]
+
+
+def is_noise_sentence(s: str, filter_noise: bool = True) -> bool:
+    s_clean = s.strip()
+    if len(s_clean) < 5:
+        return True
+    if not filter_noise:
+        return False
+    if INTERROGATIVE_RE.search(s_clean) or EXERCISE_RE.search(s_clean):
+        return True
+    if HEADING_RE.match(s_clean):
+        return True
+    letters = [ch for ch in s_clean if ch.isalpha()]
+    if letters:
+        upper_ratio = sum(1 for ch in letters if ch.isupper()) / len(letters)
+        if upper_ratio > 0.8 and len(letters) > 8:
+            return True
+    # Avoid overlong instruction-like lines
+    if len(s_clean) > 300 and (";" in s_clean or ":" in s_clean):
+        return True
+    return False
+
+
+def segment_text(text: str) -> List[Segment]:
+    """Return sentence spans over clean_text(text) with their noise flag (filter_noise=True).
+
+    Spans reproduce split_sentences(clean_text(text)) exactly.
+    """
+    cleaned = clean_text(text)
+    out: List[Segment] = []
+    pos = 0
+    bounds = [(m.start(), m.end()) for m in SENTENCE_SPLIT_RE.finditer(cleaned)]
+    bounds.append((len(cleaned), len(cleaned)))
+    for b_start, b_end in bounds:
+        piece = cleaned[pos:b_start]
+        stripped = piece.strip()
+        if stripped:
+            s = pos + (len(piece) - len(piece.lstrip()))
+            e = s + len(stripped)
+            out.append((s, e, is_noise_sentence(stripped)))
+        pos = b_end
+    return out
+
+
+@lru_cache(maxsize=4096)
+def _segment_cached(text: str) -> Tuple[Segment, ...]:
+    return tuple(segment_text(text))
+
+
+def hit_sentences(hit: dict, filter_noise: bool = True) -> List[str]:
+    """Clean, non-noise sentences of a retrieval hit.
+
+    Uses precomputed hit["segments"] when the index stored them, else the bounded cache.
+    """
+    text = hit.get("text", "") or ""
+    segs = hit.get("segments")
+    if not isinstance(segs, list):
+        segs = _segment_cached(text)
+    cleaned = clean_text(text)
+    out: List[str] = []
+    for s, e, noise in segs:
+        sent = cleaned[s:e]
+        if filter_noise:
+            if noise:
+                continue
+        elif len(sent) < 5:
+            continue
+        out.append(sent)
+    return out
@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+
+from services.api.main import app
+from services.api.utils import adaptive as ad
+from services.api.utils import practice_sessions as ps
+
+
+def _index():
+    # q1/q2 share "inflation", q3 stands alone
+    return ad.QuestionTopicIndex(
+        qtype={"q1": "mcq", "q2": "mcq", "q3": "short"},
+        topics={"q1": ("inflation",), "q2": ("inflation",), "q3": ("gdp",)},
+        members={"inflation": ("q1", "q2"), "gdp": ("q3",)},
+    )
+
+
+def test_information_gain_is_highest_for_unknown_mastery():
+    assert ad.expected_information_gain(1, 1) > ad.expected_information_gain(3, 1) > ad.expected_information_gain(30, 1)
+    assert ad.expected_information_gain(1, 1) > ad.expected_information_gain(6, 6)
+
+
+def test_selector_prefers_untested_topics_and_respects_quota():
+    sel = ad.AdaptiveSelector.start(_index(), {"mcq": 1, "short": 1}, [{"question_id": "q1", "answer": {"result": "incorrect"}}])
+    # inflation has evidence, gdp does not: the gdp question is the most informative
+    assert sel.pick() == "q3"
+    assert sel.pick() == "q2"
+    assert sel.pick() is None
+    state = ad.AdaptiveSelector.from_state(_index(), sel.to_state())
+    assert state.quota == {"mcq": 0, "short": 0} and state.evidence == sel.evidence
+
+
+def test_state_carries_the_pool_and_legacy_state_is_rebuilt_from_asked_ids():
+    sel = ad.AdaptiveSelector.start(_index(), {"mcq": 2, "short": 1})
+    first = sel.pick()
+    state = sel.to_state()
+    assert set(state) == {"e", "q", "b"}
+    restored = ad.AdaptiveSelector.from_state(_index(), state)
+    assert restored.where == sel.where and first not in restored.where
+    # Sessions stored without a pool are re-bucketed from the asked ids
+    legacy = {"e": state["e"], "q": state["q"]}
+    assert ad.AdaptiveSelector.from_state(_index(), legacy).where == {}
+    assert "b" not in ad.AdaptiveSelector.from_state(_index(), legacy).to_state()
+    rebuilt = ad.AdaptiveSelector.from_state(_index(), legacy, asked=[first])
+    assert rebuilt.where == sel.where
+    assert restored.pick() == rebuilt.pick() == sel.pick()
+
+
+class _NoScanDict(dict):
+    def __iter__(self):
+        raise AssertionError("pick walked the whole bank")
+
+    def items(self):
+        raise AssertionError("pick walked the whole bank")
+
+    def values(self):
+        raise AssertionError("pick walked the whole bank")
+
+
+def test_pick_from_stored_state_does_not_touch_the_bank(monkeypatch):
+    state = ad.AdaptiveSelector.start(_index(), {"mcq": 2, "short": 1}).to_state()
+    index = _index()
+    index.qtype = _NoScanDict(index.qtype)
+    gains = []
+    monkeypatch.setattr(ad, "expected_information_gain", lambda a, b: gains.append((a, b)) or 0.0)
+    sel = ad.AdaptiveSelector.from_state(index, state, asked=[])
+    assert sel.pick() in {"q1", "q2", "q3"}
+    assert gains == []
+
+
+def test_observe_rebuckets_questions_sharing_a_topic():
+    sel = ad.AdaptiveSelector.start(_index(), {"mcq": 2, "short": 1})
+    before = sel.where["q2"]
+    sel.observe("q1", 1.0)
+    assert sel.where["q2"] < before and sel.where["q3"] == before
+    assert sel.mastery("inflation") > 0.5
+
+
+def test_adaptive_practice_session_picks_with_rationale(monkeypatch):
+    monkeypatch.setattr(ps, "_STORE", ps.MemorySessionStore())
+    client = TestClient(app)
+    r = client.post("/practice/start", json={"subject": "Economics", "chapter": "1", "total": 3, "mcq": 2, "short": 1, "adaptive": True,
+                                             "answerHistory": [{"qtype": "mcq", "question_id": "eco1-m-001", "answer": {"result": "incorrect"}}]})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["adaptive"] is True and data["total"] == 3 and data["rationale"].startswith("Adaptive:")
+    seen = {data["questionId"]}
+    client.post("/practice/submit", json={"sessionId": data["sessionId"], "type": data["type"], "questionId": data["questionId"],
+                                          "selectedIndex": 0, "answer": "inflation is a rise in prices"})
+    nxt = client.post("/practice/next", json={"sessionId": data["sessionId"]})
+    assert nxt.status_code == 200, nxt.text
+    assert nxt.json()["adaptive"] is True and "placeholder" not in nxt.json()["rationale"]
+    assert nxt.json()["questionId"] not in seen
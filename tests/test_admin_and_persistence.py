@@ -31,9 +31,10 @@ def test_session_persistence_creates_file(tmp_path, monkeypatch):
     else:
         sub = client.post('/practice/submit', json={'sessionId': sid, 'type':'short','answer':'test'})
     assert sub.status_code in (200,400)
-    # Persistence file should exist
-    persist = Path('data/runtime/practice_sessions.json')
-    assert persist.exists(), 'persistence file not created'
+    # Session should be persisted in the session store and reloadable without the in-process cache
+    from services.api.utils import practice_sessions as ps
+    assert ps._STORE.path.exists(), 'session store not created'
+    assert ps._STORE.get(sid) is not None
 
 
 def test_threshold_update_round_trip():
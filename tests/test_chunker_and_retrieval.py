@@ -30,3 +30,46 @@ def test_retrieval_bm25_fallback(tmp_path):
     hits = res.get("results", [])
     assert hits, "Expected non-empty results"
     assert "two-fold" in hits[0]["text"] or "two-fold" in hits[0]["text"].lower()
+
+
+def test_chunker_sentence_strategy_keeps_whole_sentences():
+    text = " ".join(f"Sentence number {i} talks about national income." for i in range(40))
+    chunks = chunk_pages([(1, text)], strategy="sentence", max_tokens=30, overlap_sentences=1, subject="Test", chapter="1")
+    assert len(chunks) > 1
+    for c in chunks:
+        assert c.text.startswith("Sentence") and c.text.endswith(".")
+        assert len(c.text.split()) <= 30
+        assert c.metadata.get("chunk_strategy") == "sentence"
+    # Overlap is one whole sentence
+    last_of_first = chunks[0].text.rsplit("Sentence", 1)[1]
+    assert chunks[1].text.startswith("Sentence" + last_of_first)
+
+
+def test_dedup_drops_near_duplicate_chunks():
+    from services.api.utils.chunker import Chunk
+    from services.api.utils.dedup import dedup_chunks
+    summary = "Points to remember: national income is the sum of factor incomes earned by normal residents of a country in a year."
+    chunks = [
+        Chunk(id="a", text=summary, page_start=1, page_end=1, metadata={}),
+        Chunk(id="b", text="Unrelated paragraph on the circular flow of income between households and firms.", page_start=2, page_end=2, metadata={}),
+        Chunk(id="c", text=summary + " ", page_start=9, page_end=9, metadata={}),
+    ]
+    kept, report = dedup_chunks(chunks)
+    assert [c.id for c in kept] == ["a", "b"]
+    assert report == {"input": 3, "kept": 2, "removed": 1}
+    assert kept[0].metadata.get("dup_ids") == "c"
+    assert kept[0].metadata.get("dup_count") == 1
+    # Chroma only accepts str/int/float/bool metadata values
+    assert all(isinstance(v, (str, int, float, bool)) for v in kept[0].metadata.values())
+
+
+def test_index_stores_sentence_segments(tmp_path):
+    from services.api.utils.chunker import Chunk
+    idx = DiskIndex(base_dir=str(tmp_path / "indexes"))
+    text = essay + " Work these out: what was the two-fold motive?"
+    idx.upsert([Chunk(id="1", text=text, page_start=5, page_end=5, metadata={"page_start": 5, "page_end": 5})], subject="Economics", chapter="1")
+    hits = idx.query(subject="Economics", chapter="1", query="two-fold motive", k=1, retriever="bm25")["results"]
+    segs = hits[0]["segments"]
+    assert len(segs) == 3
+    # Last sentence is an exercise prompt and is flagged as noise at index time
+    assert [bool(sg[2]) for sg in segs] == [False, False, True]
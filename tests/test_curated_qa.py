@@ -0,0 +1,67 @@
+from services.api.utils.curated_qa import CuratedIndex, match_curated_answer
+
+
+def test_curated_index_buckets_and_postings():
+    items = [
+        {"subject": "Economics", "chapter": "1", "q": "what is inflation", "aliases": ["meaning of inflation"], "a": "A"},
+        {"subject": "Economics", "chapter": "2", "q": "define demand", "aliases": "what is demand; meaning of demand", "a": "B"},
+        {"q": "ways a partner can retire from the firm", "a": "C"},
+    ]
+    idx = CuratedIndex.build(items, key="t")
+    assert set(idx.postings["inflation"]) == {0}
+    assert set(idx.postings["meaning"]) == {0, 1}
+    # Entries without subject/chapter apply to every filter
+    assert idx.candidates({"meaning", "retire"}, "economics", "1") == [0, 2]
+    assert idx.candidates({"demand"}, "economics", "1") == []
+
+
+def test_curated_allowed_cache_is_bounded(monkeypatch):
+    monkeypatch.setenv("CURATED_ALLOWED_CACHE_SIZE", "2")
+    idx = CuratedIndex.build([{"subject": "Economics", "chapter": "1", "q": "what is inflation", "a": "A"}], key="t")
+    for chap in ("1", "2", "3", "4"):
+        idx.candidates({"inflation"}, "economics", chap)
+    assert idx._allowed_cache.stats()["size"] == 2
+    assert idx._allowed_cache.stats()["evictions"] == 2
+
+
+def test_match_curated_answer_uses_aliases():
+    out = match_curated_answer("nominal vs real gdp", "Economics", "1")
+    assert out is not None
+    assert "nominal gdp" in out[0].lower()
+    assert match_curated_answer("nominal vs real gdp", "Economics", "2") is None
+
+
+def test_curated_cache_is_throttled_and_reloadable(tmp_path, monkeypatch):
+    import json
+    from fastapi.testclient import TestClient
+    from services.api.main import app
+    from services.api.utils import curated_qa as cq
+
+    path = tmp_path / "curated_qa.json"
+    path.write_text(json.dumps({"entries": [{"subject": "Economics", "chapter": "9", "q": "what is money supply", "a": "M1"}]}), encoding="utf-8")
+    monkeypatch.setattr(cq, "_external_curated_path", lambda: str(path))
+    monkeypatch.setenv("CURATED_STAT_INTERVAL_SEC", "3600")
+    cq.invalidate_curated_cache()
+    try:
+        assert cq.match_curated_answer("what is money supply", "Economics", "9")[0] == "M1"
+        # Edits are not seen while the stat throttle holds...
+        path.write_text(json.dumps({"entries": [{"subject": "Economics", "chapter": "9", "q": "what is money supply", "a": "M3"}]}), encoding="utf-8")
+        assert cq.match_curated_answer("what is money supply", "Economics", "9")[0] == "M1"
+        # ...until an explicit reload
+        r = TestClient(app).post("/admin/reload/curated")
+        assert r.status_code == 200, r.text
+        assert r.json()["curated_count"] == len(cq._CURATED) + 1
+        assert cq.match_curated_answer("what is money supply", "Economics", "9")[0] == "M3"
+    finally:
+        monkeypatch.undo()
+        cq.invalidate_curated_cache()
+
+
+def test_curated_scoring_ranks_best_match_above_threshold():
+    from services.api.utils.curated_qa import top_curated_matches, find_curated_match
+    top = top_curated_matches("explain what is inflation", "Economics", "1", n=3)
+    assert top and top[0].item["q"] == "what is inflation"
+    assert all(a.score >= b.score for a, b in zip(top, top[1:]))
+    assert top[0].elapsed_ms >= 0.0
+    # Sharing the "what is" prefix alone is no longer enough to match
+    assert find_curated_match("what is national income", "Economics", "1") is None
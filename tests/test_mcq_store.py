@@ -7,3 +7,53 @@ def test_mcq_ingest_and_lookup():
     item = get_mcq_by_id('economics', '1', 'eco1-m-001')
     assert item is not None
     assert item.get('answerIndex') == 0
+
+
+def test_mcq_store_indexes_and_reloads_on_mtime(tmp_path, monkeypatch):
+    import json
+    import os
+    from services.api.utils import mcq_store
+
+    monkeypatch.setattr(mcq_store, '_MCQ_ROOT', tmp_path)
+    monkeypatch.setenv('MCQ_STAT_INTERVAL_SEC', '0')
+    mcq_store.invalidate_mcq_cache()
+    p = tmp_path / 'economics' / '9.json'
+    p.parent.mkdir()
+    p.write_text(json.dumps([{'id': 'a', 'question': 'Q1', 'topics': ['Inflation']}, {'id': 2, 'question': 'Q2'}]), encoding='utf-8')
+    assert get_mcq_by_id('Economics', '9', '2')['question'] == 'Q2'
+    assert [m['id'] for m in mcq_store.get_mcqs_by_topic('Economics', '9', 'inflation')] == ['a']
+    p.write_text(json.dumps([{'id': 'a', 'question': 'Q1 edited'}]), encoding='utf-8')
+    os.utime(p, (1, 1))  # mtime change regardless of filesystem timestamp resolution
+    assert get_mcq_by_id('Economics', '9', 'a')['question'] == 'Q1 edited'
+    assert get_mcq_by_id('Economics', '9', '2') is None
+    mcq_store.invalidate_mcq_cache()
+
+
+def test_mcq_cold_load_is_single_flight_and_does_not_block_other_chapters(monkeypatch):
+    import threading
+    import time
+    from services.api.utils import mcq_store
+
+    mcq_store.invalidate_mcq_cache()
+    mcq_store.get_mcqs('economics', '1')  # warm one chapter
+    calls = []
+    release = threading.Event()
+    real_build = mcq_store._build_chapter
+
+    def slow_build(p, mtime):
+        calls.append(p)
+        release.wait(5)
+        return real_build(p, mtime)
+
+    monkeypatch.setattr(mcq_store, '_build_chapter', slow_build)
+    threads = [threading.Thread(target=mcq_store.get_mcqs, args=('economics', '99')) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    # The warm chapter is served while the cold one is loading
+    assert get_mcq_by_id('economics', '1', 'eco1-m-001') is not None
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    mcq_store.invalidate_mcq_cache()
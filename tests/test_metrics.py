@@ -0,0 +1,89 @@
+import random
+
+from services.api.utils import metrics
+
+
+def test_histogram_quantiles_track_exact_values():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(2, 1) for _ in range(20000)]
+    h = metrics.Histogram()
+    for v in values:
+        h.observe(v)
+    exact = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        true = exact[int(q * (len(exact) - 1))]
+        assert abs(h.quantile(q) - true) / true < 0.06
+    s = h.summary()
+    assert s["count"] == 20000 and s["min"] == exact[0] and s["max"] == exact[-1]
+
+
+def test_record_keeps_label_series_and_bounded_window(monkeypatch):
+    monkeypatch.setattr(metrics, "_WINDOW", 5)
+    name = "test_metric_labels_ms"
+    for i in range(20):
+        metrics.record(name, float(i + 1), {"retriever": "bm25" if i % 2 else "tfidf", "k": 5, "gold_ms": 1.0})
+    s = metrics.summary(name)
+    assert s["count"] == 20
+    assert set(s["labels"]) == {"retriever=bm25,k=5", "retriever=tfidf,k=5"}
+    assert s["labels"]["retriever=bm25,k=5"]["count"] == 10
+    recent = metrics.recent(name)
+    assert len(recent) == 5 and recent[-1]["ms"] == 20.0 and recent[-1]["gold_ms"] == 1.0
+    assert name in metrics.export_all()
+
+
+def test_prometheus_endpoint_exposes_route_latency_and_errors():
+    from fastapi.testclient import TestClient
+    from services.api.main import app
+    from services.api.utils import prometheus
+
+    client = TestClient(app)
+    assert client.get("/health/").status_code == 200
+    r = client.get("/metrics/prometheus")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = r.text.splitlines()
+    assert "# TYPE commerce_http_request_ms histogram" in lines
+    assert any(l.startswith('commerce_http_request_ms_count{route="/health/",method="GET",status="200"}') for l in lines)
+    assert any(l.startswith('commerce_http_requests_in_flight{method="GET"}') for l in lines)
+    # Buckets are cumulative and end with +Inf == _count
+    health = [l for l in lines if l.startswith('commerce_http_request_ms_bucket{route="/health/",method="GET",status="200"')]
+    counts = [float(l.rsplit(" ", 1)[1]) for l in health]
+    assert counts == sorted(counts) and health[-1].split("le=")[1].startswith('"+Inf"')
+    assert prometheus.metric_name("ask latency-ms") == "commerce_ask_latency_ms"
+
+
+def test_request_middleware_counts_errors_and_open_streams():
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+    from fastapi.testclient import TestClient
+    from services.api.utils.middleware import RequestMetricsMiddleware
+
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+    in_flight = []
+    key = (("method", "GET"),)
+
+    @app.get("/boom")
+    def boom():
+        return PlainTextResponse("boom", status_code=503)
+
+    @app.get("/stream")
+    def stream():
+        def body():
+            yield "a"
+            in_flight.append(metrics.gauges()["http_requests_in_flight"][key])
+            yield "b"
+        return StreamingResponse(body())
+
+    client = TestClient(app)
+    errors = (("route", "/boom"), ("method", "GET"), ("status", "503"))
+    try:
+        assert client.get("/boom").status_code == 503
+        assert metrics.counters()["http_request_errors_total"][errors] == 1.0
+        before = metrics.gauges()["http_requests_in_flight"][key]
+        assert client.get("/stream").text == "ab"
+        # Still in flight while the body streams, released once it is sent
+        assert in_flight == [before + 1]
+        assert metrics.gauges()["http_requests_in_flight"][key] == before
+    finally:
+        with metrics._LOCK:
+            metrics._COUNTERS.get("http_request_errors_total", {}).pop(errors, None)
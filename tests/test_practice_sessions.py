@@ -0,0 +1,110 @@
+import json
+import time
+
+from services.api.utils import practice_sessions as ps
+
+
+def _use_tmp_store(tmp_path, monkeypatch, legacy=None):
+    store = ps.SessionStore(tmp_path / "sessions.db", legacy_json=legacy)
+    monkeypatch.setattr(ps, "_STORE", store)
+    return store
+
+
+def test_sessions_persist_per_row_and_reload(tmp_path, monkeypatch):
+    store = _use_tmp_store(tmp_path, monkeypatch)
+    sess = ps.start_session("Economics", "1", total=2, mix=(2, 0))
+    assert sess.current() is not None
+    ps.record_answer(sess, sess.current().id, {"type": "mcq", "result": "correct"})
+    ps.advance_session(sess)
+    # Another worker process opening the same database sees the committed state
+    monkeypatch.setattr(ps, "_STORE", ps.SessionStore(store.path))
+    loaded = ps.get_session(sess.session_id)
+    assert loaded is not None and loaded.index == 1 and len(loaded.answers) == 1
+    assert store.get("missing") is None
+
+
+def test_legacy_json_import_and_prune(tmp_path, monkeypatch):
+    now = time.time()
+    legacy = tmp_path / "practice_sessions.json"
+    live = {"session_id": "live", "subject": "Economics", "chapter": "1", "created_at": now, "index": 0, "answers": [], "questions": []}
+    old = dict(live, session_id="old", created_at=now - ps._SESSION_TTL_SECONDS - 10)
+    legacy.write_text(json.dumps({"live": live, "old": old}), encoding="utf-8")
+    store = _use_tmp_store(tmp_path, monkeypatch, legacy=legacy)
+    assert store.get("live") is not None and store.get("old") is None
+    assert store.prune(now + 1) == 1 and store.get("live") is None
+
+
+def test_concurrent_submits_are_not_lost(tmp_path, monkeypatch):
+    import threading
+
+    store = _use_tmp_store(tmp_path, monkeypatch)
+    sess = ps.start_session("Economics", "1", total=1, mix=(1, 0))
+    other_worker = ps.SessionStore(store.path)
+
+    def submit(i):
+        target = store if i % 2 else other_worker
+        target.update(sess.session_id, lambda s: s.answers.append(ps.AnswerRecord(index=i, question_id=str(i), qtype="mcq", result="correct")))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(a.index for a in store.get(sess.session_id).answers) == list(range(40))
+
+
+def test_memory_store_has_same_interface(monkeypatch):
+    monkeypatch.setattr(ps, "_STORE", ps.MemorySessionStore())
+    sess = ps.start_session("Economics", "1", total=2, mix=(2, 0))
+    ps.record_answer(sess, "q", {"result": "correct"})
+    assert ps.advance_session(sess) is not None
+    loaded = ps.get_session(sess.session_id)
+    assert loaded.index == 1 and len(loaded.answers) == 1
+
+
+def test_sessions_store_question_ids_and_compact_answers(tmp_path, monkeypatch):
+    store = _use_tmp_store(tmp_path, monkeypatch)
+    sess = ps.start_session("Economics", "1", total=2, mix=(1, 1))
+    q = sess.current()
+    assert q is not None and q.question
+    payload = {"type": q.qtype, "result": "partial", "score": 55.0, "missingPoints": ["a point"],
+               "rubric": [{"criterion": "x" * 500}], "feedback": "y" * 500, "citations": [{"page_start": 1}]}
+    ps.record_answer(sess, q.id, payload)
+    row = store._db().execute("SELECT payload FROM sessions WHERE session_id = ?", (sess.session_id,)).fetchone()[0]
+    assert q.question not in row and "x" * 50 not in row
+    loaded = ps.get_session(sess.session_id)
+    assert loaded.current().question == q.question
+    rec = loaded.answers[0]
+    assert (rec.result, rec.score, rec.missing) == ("partial", 55.0, ("a point",))
+
+
+def test_legacy_session_payload_resolves_to_refs():
+    legacy = {
+        "session_id": "s", "subject": "Economics", "chapter": "1", "created_at": time.time(), "index": 0,
+        "questions": [{"qtype": "short", "id": "short:123", "question": "What is GDP?", "options": None, "meta": {}}],
+        "answers": [{"index": 0, "question_id": "short:123", "qtype": "short", "answer": {"result": "correct", "score": 90}, "ts": 1.0}],
+    }
+    sess = ps._deserialize_session(legacy)
+    assert sess.questions[0] == ps.QuestionRef("short", ps.short_question_id("What is GDP?"))
+    assert sess.answers[0].result == "correct" and sess.answers[0].score == 90.0
+
+
+def test_sweeper_expires_only_due_sessions(monkeypatch):
+    store = ps.MemorySessionStore()
+    monkeypatch.setattr(ps, "_STORE", store)
+    monkeypatch.setattr(ps, "_EXPIRY_HEAP", [])
+    sess = ps.start_session("Economics", "1", total=1, mix=(1, 0))
+    assert ps.next_expiry() == sess.created_at + ps._SESSION_TTL_SECONDS
+    assert ps.sweep_expired(sess.created_at + 1) == 0 and store.get(sess.session_id) is not None
+    assert ps.sweep_expired(ps.next_expiry()) == 1 and store.get(sess.session_id) is None
+    assert ps.next_expiry() is None
+
+
+def test_sweeper_seeds_sessions_from_store(tmp_path, monkeypatch):
+    store = _use_tmp_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(ps, "_EXPIRY_HEAP", [])
+    sess = ps.start_session("Economics", "1", total=1, mix=(1, 0))
+    monkeypatch.setattr(ps, "_EXPIRY_HEAP", [])  # a freshly started worker
+    assert ps.seed_expiries() == 1
+    assert ps.sweep_expired(sess.created_at + ps._SESSION_TTL_SECONDS) == 1
+    assert store.get(sess.session_id) is None
@@ -35,6 +35,22 @@ def test_mcq_validate_stub_200():
     assert set(["result", "correctIndex", "explanation", "citations"]).issubset(data.keys())
 
 
+def test_mcq_validate_batch_grades_quiz():
+    client = TestClient(app)
+    payload = {"subject": "Economics", "chapter": "1", "answers": [
+        {"questionId": "eco1-m-001", "selectedIndex": 0},
+        {"questionId": "eco1-m-002", "selectedIndex": 3},
+        {"questionId": "eco1-m-002"},
+        {"questionId": "missing", "selectedIndex": 0},
+    ]}
+    r = client.post("/mcq/validate/batch", json=payload)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert [x["result"] for x in data["results"]] == ["correct", "incorrect", "unanswered", "not_found"]
+    assert (data["correct"], data["graded"], data["total"], data["score"]) == (1, 3, 4, 33.3)
+    assert data["results"][1]["correctIndex"] == 0 and data["results"][1]["explanation"]
+
+
 def test_teach_glossary_and_depth_caps():
     client = TestClient(app)
     # Request deep vs basic to observe cap differences
@@ -53,3 +69,108 @@ def test_teach_glossary_and_depth_caps():
     # Deep should allow >= basic count when data available
     if isinstance(ov1.get("bullets"), list) and isinstance(ov2.get("bullets"), list):
         assert len(ov1.get("bullets")) >= len(ov2.get("bullets"))
+
+
+def test_teach_outline_cache_hit_and_invalidation(tmp_path, monkeypatch):
+    from services.api.routes import teach as teach_route
+    from services.api.utils import outline_cache
+
+    monkeypatch.setattr(outline_cache, "_OUTLINE_DIR", tmp_path / "outlines")
+    outline_cache.invalidate_outlines()
+    client = TestClient(app)
+    payload = {"subject": "Economics", "chapter": "1", "topics": ["overview"], "depth": "basic", "retriever": "bm25"}
+    first = client.post("/teach", json=payload).json()
+    assert first["meta"]["outlineCache"] == "miss"
+    assert list((tmp_path / "outlines").rglob("*.json"))
+    # Served from disk even after the in-process LRU is dropped
+    outline_cache._CACHE.clear()
+    second = client.post("/teach", json=payload).json()
+    assert second["meta"]["outlineCache"] == "hit"
+    assert second["outline"] == first["outline"] and second["glossary"] == first["glossary"]
+    # A new curated/index version is a miss
+    monkeypatch.setattr(teach_route, "curated_version", lambda: "changed")
+    assert client.post("/teach", json=payload).json()["meta"]["outlineCache"] == "miss"
+    outline_cache._CACHE.clear()
+
+
+def test_teach_adhoc_topics_stay_in_memory(tmp_path, monkeypatch):
+    from services.api.utils import outline_cache
+
+    monkeypatch.setattr(outline_cache, "_OUTLINE_DIR", tmp_path / "outlines")
+    outline_cache.invalidate_outlines()
+    client = TestClient(app)
+    payload = {"subject": "Economics", "chapter": "1", "topics": ["scarcity", "opportunity cost"], "depth": "basic", "retriever": "bm25"}
+    assert client.post("/teach", json=payload).json()["meta"]["outlineCache"] == "miss"
+    # Free-form topics are cached in the LRU only, never written to disk
+    assert not list((tmp_path / "outlines").rglob("*.json"))
+    assert client.post("/teach", json=payload).json()["meta"]["outlineCache"] == "hit"
+    outline_cache._CACHE.clear()
+
+
+def test_index_version_tracks_chroma_namespaces(tmp_path):
+    import os
+    from services.api.utils.indexer import DiskIndex
+
+    idx = DiskIndex(base_dir=str(tmp_path))
+    ns_dir = tmp_path / idx._ns("Economics", "9")
+    assert idx.index_version("Economics", "9").endswith(":na")
+    ns_dir.mkdir()
+    (ns_dir / "chroma.sqlite3").write_bytes(b"")
+    os.utime(ns_dir / "chroma.sqlite3", (1000, 1000))
+    legacy = idx.index_version("Economics", "9")
+    assert not legacy.endswith(":na")
+    # upsert() touches the version file, which takes precedence over chroma.sqlite3
+    (ns_dir / "chroma.version").write_text("1", encoding="utf-8")
+    assert idx.index_version("Economics", "9") != legacy
+
+
+def test_teach_single_pass_extractor_caps_and_glossary():
+    from services.api.routes.teach import _extract_sections
+
+    hits = [
+        {"text": "National Income: the money value of final goods.\nNational Income: value of goods.\nGDP = C + I + G at 5%\nInflation is a rise in prices."},
+        {"text": "Inflation is a rise in prices. Money means a medium of exchange.\nNet Exports = X - M at 2%"},
+    ]
+    caps = {"ov": 5, "terms": 3, "shorts": 1, "longs": 2, "forms": 5}
+    ex = _extract_sections(hits, caps)
+    assert ex["shorts"] == ["Inflation is a rise in prices"]
+    assert ex["forms"] == ["GDP = C + I + G at 5%", "Net Exports = X - M at 2%"]
+    assert ex["terms"][0] == "National Income" and len(ex["terms"]) <= 3
+    assert ex["glossary"][0] == {"term": "National Income", "definition": "value of goods."}
+
+
+def test_teach_topic_fanout_merges_and_falls_back_to_bm25():
+    import asyncio
+    from services.api.routes.teach import TeachRequest, _retrieve_hits
+
+    class StubIndex:
+        def __init__(self, primary_empty: bool, chroma: bool = True) -> None:
+            self.primary_empty = primary_empty
+            self.chroma = chroma
+            self.calls = []
+
+        def uses_chroma(self, retriever):
+            return self.chroma
+
+        def query(self, *, subject, chapter, query, k, retriever):
+            self.calls.append((query, retriever))
+            if retriever == "bm25":
+                return {"results": [{"text": "bm25 hit", "metadata": {}}]}
+            if self.primary_empty:
+                return {"results": []}
+            return {"results": [{"text": f"{query} {i}", "metadata": {}} for i in range(3)] + [{"text": "shared", "metadata": {}}]}
+
+    req = TeachRequest(subject="Economics", chapter="1", topics=["a", "b"], k=5, retriever="auto")
+    idx = StubIndex(primary_empty=False)
+    hits = asyncio.run(_retrieve_hits(idx, req, ["a", "b"]))
+    # Round-robin across topics, deduplicated, capped at k
+    assert [h["text"] for h in hits] == ["a 0", "b 0", "a 1", "b 1", "a 2"]
+    assert {("a", "auto"), ("b", "auto"), ("a; b", "bm25")} == set(idx.calls)
+
+    hits = asyncio.run(_retrieve_hits(StubIndex(primary_empty=True), req, ["a", "b"]))
+    assert [h["text"] for h in hits] == ["bm25 hit"]
+
+    # The JSON index falls back to BM25 on its own: nothing extra is raced
+    idx = StubIndex(primary_empty=True, chroma=False)
+    assert asyncio.run(_retrieve_hits(idx, req, ["a", "b"])) == []
+    assert {("a", "auto"), ("b", "auto")} == set(idx.calls)